@@ -0,0 +1,42 @@
+"""persisted site maps for crawl reuse
+
+Revision ID: 0003_site_maps
+Revises: 0002_page_states
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_site_maps"
+down_revision: Union[str, None] = "0002_page_states"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "site_maps",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("target_key", sa.String(length=2048), nullable=False),
+        sa.Column("scope_key", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("format_version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("max_depth", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_pages", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("page_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("source_scan_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("scope_key", "version", name="uq_site_map_version"),
+    )
+    op.create_index("ix_site_maps_target_key", "site_maps", ["target_key"])
+    op.create_index("ix_site_maps_scope_key", "site_maps", ["scope_key"])
+
+
+def downgrade() -> None:
+    op.drop_table("site_maps")
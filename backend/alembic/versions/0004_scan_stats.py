@@ -0,0 +1,25 @@
+"""scan statistics column
+
+Revision ID: 0004_scan_stats
+Revises: 0003_site_maps
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_scan_stats"
+down_revision: Union[str, None] = "0003_site_maps"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("scans", sa.Column("stats", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("scans", "stats")
@@ -0,0 +1,28 @@
+"""affected URL list for aggregated findings
+
+Revision ID: 0005_affected_urls
+Revises: 0004_scan_stats
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_affected_urls"
+down_revision: Union[str, None] = "0004_scan_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "vulnerabilities",
+        sa.Column("affected_urls", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("vulnerabilities", "affected_urls")
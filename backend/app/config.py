@@ -54,6 +54,57 @@ class Settings(BaseSettings):
     SCANNER_MAX_PAGES_FULL: int = 100
     SCANNER_REQUEST_DELAY: float = 2.0
     SCANNER_CONCURRENCY: int = 5
+    # HTML parse offloading (0 workers = always parse on the event loop)
+    SCANNER_PARSE_WORKERS: int = 0
+    SCANNER_PARSE_OFFLOAD_BYTES: int = 262_144
+    SCANNER_PARSE_USE_PROCESSES: bool = True
+    # Passive checks in a worker pool, shipped in batches of pages (0 workers = run inline per page)
+    SCANNER_PASSIVE_WORKERS: int = 0
+    SCANNER_PASSIVE_BATCH_SIZE: int = 32
+    SCANNER_PASSIVE_USE_PROCESSES: bool = True
+    # Crawl frontier: "fingerprint" (64-bit hashes) or "bloom" visited set
+    SCANNER_FRONTIER_VISITED: str = "fingerprint"
+    SCANNER_FRONTIER_BLOOM_FP_RATE: float = 0.001
+    # Keep at most this many pending URLs in memory and spill the rest to SQLite (0 = never spill)
+    SCANNER_FRONTIER_SPILL_AFTER: int = 0
+    # Keep pending URLs/pages per host and round-robin across hosts whose request window is open
+    SCANNER_HOST_INTERLEAVING: bool = True
+    # Max pages crawled per URL template, e.g. /product/{int} (0 = unlimited)
+    SCANNER_TEMPLATE_PAGE_QUOTA: int = 5
+    # Run active modules on one representative page per URL template
+    SCANNER_ACTIVE_ONE_PER_TEMPLATE: bool = True
+    # Parameters injected with the same payload per request; groups with a hit are bisected (1 = one at a time)
+    SCANNER_INJECTION_BATCH_SIZE: int = 8
+    # Attack each (method, endpoint, parameter, location) once per module per scan
+    SCANNER_DEDUP_INSERTION_POINTS: bool = True
+    # Merge header findings (security_headers, cookie_security) seen on many pages into one listing the pages
+    SCANNER_AGGREGATE_HEADER_FINDINGS: bool = True
+    SCANNER_AGGREGATE_MAX_URLS: int = 1000
+    # Budget per active module invocation (one module on one page): seconds and requests (0 = unlimited)
+    SCANNER_MODULE_TIMEOUT: float = 120.0
+    SCANNER_MODULE_MAX_REQUESTS: int = 400
+    # Time-based blind probes: sleep in seconds (confirmed at twice this), baseline samples, z-score to flag
+    SCANNER_TIME_PROBE_DELAY: int = 2
+    SCANNER_TIME_BASELINE_SAMPLES: int = 3
+    SCANNER_TIME_Z_THRESHOLD: float = 4.0
+    # Collapse pages whose content SimHash differs by at most this many bits (-1 = off)
+    SCANNER_DUPLICATE_SIMHASH_BITS: int = 3
+    # Seed the crawl from robots.txt / sitemap.xml, capped at this many sitemap URLs (0 = off)
+    SCANNER_SITEMAP_MAX_URLS: int = 50_000
+    SCANNER_SITEMAP_MAX_FILES: int = 50
+    # Crawl order: "best_first" (score links by attack surface) or "breadth_first"
+    SCANNER_CRAWL_STRATEGY: str = "best_first"
+    # Send If-None-Match/If-Modified-Since using page state from the previous scan of a target
+    SCANNER_CONDITIONAL_RECRAWL: bool = True
+    # Largest page body kept (compressed) for reuse on 304; bigger pages are always refetched
+    SCANNER_PAGE_STATE_MAX_BYTES: int = 1_048_576
+    # Compressed page bodies kept in memory before spilling to a temp file (-1 = keep bodies as plain strings)
+    SCANNER_PAGE_STORE_MEMORY_BYTES: int = 33_554_432
+    # Site-map versions kept per target and scope for Scan.config["reuse_crawl_minutes"] (0 = don't persist)
+    SCANNER_SITE_MAP_KEEP: int = 3
+    # Probe well-known OpenAPI/Swagger locations; Scan.config["openapi_spec"/"openapi_url"] always applies
+    SCANNER_OPENAPI_DISCOVERY: bool = True
+    SCANNER_OPENAPI_MAX_OPERATIONS: int = 500
 
 
 settings = Settings()
@@ -3,5 +3,7 @@ from app.models.scan import Scan
 from app.models.result import Vulnerability, Evidence
 from app.models.comparison import ScanComparison
 from app.models.audit import AuditLog
+from app.models.page_state import PageState
+from app.models.site_map import SiteMap
 
-__all__ = ["User", "Scan", "Vulnerability", "Evidence", "ScanComparison", "AuditLog"]
+__all__ = ["User", "Scan", "Vulnerability", "Evidence", "ScanComparison", "AuditLog", "PageState", "SiteMap"]
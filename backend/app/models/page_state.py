@@ -0,0 +1,29 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, TimestampMixin, UUIDMixin
+
+
+class PageState(UUIDMixin, TimestampMixin, Base):
+    """Last-seen state of a crawled page, used for conditional recrawls of the same target."""
+    __tablename__ = "page_states"
+    __table_args__ = (
+        UniqueConstraint("user_id", "target_key", "url", name="uq_page_state_url"),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    target_key: Mapped[str] = mapped_column(String(2048), nullable=False, index=True)
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False, default=200)
+    etag: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    content_hash: Mapped[str] = mapped_column(String(32), nullable=False, default="")
+    headers: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    structure: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    body_z: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    last_scan_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
@@ -11,7 +11,7 @@ from sqlalchemy import (
     Text,
     func,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, UUIDMixin
@@ -35,6 +35,8 @@ class Vulnerability(UUIDMixin, Base):
     cwe_id: Mapped[str] = mapped_column(String(10), nullable=False, default="")
     affected_url: Mapped[str] = mapped_column(String(2048), nullable=False)
     affected_parameter: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Every page an aggregated site-wide finding was seen on; None for single-page findings
+    affected_urls: Mapped[list | None] = mapped_column(JSONB, nullable=True)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     remediation: Mapped[str] = mapped_column(Text, nullable=False, default="")
     confidence: Mapped[str] = mapped_column(String(10), nullable=False, default="firm")
@@ -31,6 +31,8 @@ class Scan(UUIDMixin, TimestampMixin, Base):
         DateTime(timezone=True), nullable=True
     )
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Scan-time statistics, e.g. per-module budget usage
+    stats: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="scans")
     vulnerabilities: Mapped[list["Vulnerability"]] = relationship(
@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, UUIDMixin
+
+
+class SiteMap(UUIDMixin, Base):
+    """Versioned crawl result for a target and scope configuration."""
+    __tablename__ = "site_maps"
+    __table_args__ = (
+        UniqueConstraint("scope_key", "version", name="uq_site_map_version"),
+    )
+
+    target_key: Mapped[str] = mapped_column(String(2048), nullable=False, index=True)
+    scope_key: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    format_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    max_depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_pages: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    page_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    source_scan_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
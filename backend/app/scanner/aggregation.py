@@ -0,0 +1,96 @@
+"""Site-wide passive findings, evaluated once and reported once.
+
+Header checks see the same response headers on most pages of a site. Modules
+reduce the headers they evaluate to a fingerprint, run their checks once per
+fingerprint (``FingerprintMemo``) and tag the findings with it, or with a
+narrower fingerprint of just the header a finding is about. Before
+deduplication, ``aggregate_findings`` folds findings that share module, type,
+parameter and fingerprint into one finding whose ``affected_urls`` lists every
+page it was seen on.
+"""
+import hashlib
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Callable, Iterable
+
+from app.scanner.modules.base import Finding
+
+# Fingerprints whose findings a module keeps for reuse
+FINGERPRINT_MEMO_SIZE = 256
+
+
+def header_fingerprint(items: Iterable[tuple[str, str]]) -> str:
+    """Order-independent digest of (name, value) pairs."""
+    digest = hashlib.blake2b(digest_size=8)
+    for name, value in sorted(items):
+        digest.update(f"{name}\x00{value}\x01".encode())
+    return digest.hexdigest()
+
+
+class FingerprintMemo:
+    """Findings computed per fingerprint, bounded so long-lived worker modules stay small."""
+
+    def __init__(self, max_entries: int = FINGERPRINT_MEMO_SIZE):
+        self.max_entries = max_entries
+        self._findings: OrderedDict[str, list[Finding]] = OrderedDict()
+        self.hits = 0
+
+    def findings_for(self, fingerprint: str, url: str, evaluate: Callable[[], list[Finding]]) -> list[Finding]:
+        """``evaluate()`` once per fingerprint; later pages get copies pointing at ``url``.
+
+        Findings ``evaluate`` leaves untagged get ``fingerprint``; a module can
+        tag a finding with a narrower one (just the header it is about) so it
+        aggregates across pages whose other headers differ.
+        """
+        findings = self._findings.get(fingerprint)
+        if findings is None:
+            findings = [f if f.fingerprint else replace(f, fingerprint=fingerprint) for f in evaluate()]
+            self._findings[fingerprint] = findings
+            while len(self._findings) > self.max_entries:
+                self._findings.popitem(last=False)
+        else:
+            self.hits += 1
+            self._findings.move_to_end(fingerprint)
+        return [replace(f, affected_url=url) for f in findings]
+
+
+def _representative_url(urls: list[str]) -> str:
+    # Shortest URL (usually the site root), so the same finding keeps its URL across scans
+    return min(urls, key=lambda url: (len(url), url))
+
+
+def aggregate_findings(findings: list[Finding], max_urls: int = 1000) -> list[Finding]:
+    """Fold fingerprinted findings into one per (module, type, parameter, fingerprint).
+
+    Findings without a fingerprint pass through unchanged, in order. An
+    aggregated finding keeps the first finding's description and evidence,
+    reports the representative URL as ``affected_url`` and lists up to
+    ``max_urls`` pages in ``affected_urls``.
+    """
+    result: list[Finding] = []
+    groups: dict[tuple, tuple[int, list[str]]] = {}
+    for finding in findings:
+        if finding.fingerprint is None:
+            result.append(finding)
+            continue
+        key = (finding.module_name, finding.vuln_type, finding.affected_parameter, finding.fingerprint)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = (len(result), [finding.affected_url])
+            result.append(finding)
+        else:
+            group[1].append(finding.affected_url)
+
+    for index, urls in groups.values():
+        urls = list(dict.fromkeys(urls))
+        finding = result[index]
+        if len(urls) == 1:
+            continue
+        urls.sort()
+        result[index] = replace(
+            finding,
+            affected_url=_representative_url(urls),
+            affected_urls=urls[:max_urls] if max_urls > 0 else urls,
+            description=f"{finding.description} Seen on {len(urls)} pages.",
+        )
+    return result
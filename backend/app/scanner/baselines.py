@@ -0,0 +1,103 @@
+"""Per-scan reference responses shared by active modules.
+
+Modules that diff injected responses against the unmodified request ask the
+``BaselineService`` instead of fetching the page themselves, so each endpoint
+and query is fetched once per scan and every module compares against the
+same reference. Its ``profile`` is the cached token fingerprint that
+differential checks compare responses against.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.scanner.fingerprint import content_hash, structure_hash
+from app.scanner.http_client import HttpClient
+from app.scanner.similarity import ResponseProfile
+from app.scanner.timing import LatencyBaseline, response_latency
+from app.scanner.urls import canonical_url
+
+# Baselines kept per scan; the oldest are refetched if asked for again
+BASELINE_CACHE_SIZE = 512
+
+
+@dataclass(slots=True)
+class Baseline:
+    url: str
+    status_code: int
+    text: str
+    content_hash: str
+    structure_hash: str
+    latency: LatencyBaseline = field(default_factory=lambda: LatencyBaseline([]))
+    # Body of the second fetch, if any; differential checks learn dynamic regions from it
+    second_text: str | None = None
+    _profile: ResponseProfile | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def length(self) -> int:
+        return len(self.text)
+
+    @property
+    def profile(self) -> ResponseProfile:
+        """Token fingerprint of the response, built on first use and kept for the scan."""
+        if self._profile is None:
+            self._profile = ResponseProfile(self.text)
+        if self.second_text is not None:
+            self._profile.learn(self.second_text)
+        return self._profile
+
+    def describe(self) -> str:
+        return f"HTTP {self.status_code}, {self.length} bytes"
+
+
+class BaselineService:
+    """Fetches each URL's reference response at most once and hands it to every module."""
+
+    def __init__(self, max_entries: int = BASELINE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._baselines: OrderedDict[str, Baseline] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.fetches = 0
+        self.hits = 0
+
+    async def get(self, http_client: HttpClient, url: str, samples: int = 1) -> Baseline | None:
+        """Reference response for ``url`` with at least ``samples`` latency samples (None if unreachable).
+
+        Extra samples are fetched only when a module needs more timing data
+        than the cached baseline has.
+        """
+        key = canonical_url(url).normalized
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            baseline = self._baselines.get(key)
+            if baseline is not None:
+                self.hits += 1
+                self._baselines.move_to_end(key)
+            while baseline is None or len(baseline.latency.samples) < samples:
+                started = time.monotonic()
+                try:
+                    response = await http_client.get(url)
+                except Exception:
+                    break
+                self.fetches += 1
+                latency = response_latency(response, started)
+                if baseline is None:
+                    baseline = Baseline(
+                        url=url,
+                        status_code=response.status_code,
+                        text=response.text,
+                        content_hash=content_hash(response.text),
+                        structure_hash=structure_hash(response.text),
+                    )
+                    self._store(key, baseline)
+                elif baseline.second_text is None:
+                    baseline.second_text = response.text
+                baseline.latency.samples.append(latency)
+        if len(self._locks) > self.max_entries * 2:
+            self._locks = {k: v for k, v in self._locks.items() if v.locked() or k in self._baselines}
+        return baseline
+
+    def _store(self, key: str, baseline: Baseline) -> None:
+        self._baselines[key] = baseline
+        while len(self._baselines) > self.max_entries:
+            self._baselines.popitem(last=False)
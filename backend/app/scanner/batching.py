@@ -0,0 +1,75 @@
+"""Multi-parameter payload batching for injection modules.
+
+Instead of one request per (parameter, payload), a payload is injected into up
+to ``batch_size`` parameters at once. Clean groups, the common case, cost a
+single request; a group that shows a signal is split in half and retried
+until the responsible parameter is isolated.
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+
+# (injected values by parameter) -> (response, request URL)
+Sender = Callable[[dict[str, str]], Awaitable[tuple[httpx.Response, str]]]
+# (response, payload) -> a truthy signal, or None
+Detector = Callable[[httpx.Response, str], object]
+
+
+@dataclass(slots=True)
+class BatchHit:
+    param: str
+    payload: str
+    response: httpx.Response
+    url: str
+    signal: object
+
+
+async def inject_batched(
+    params: list[str],
+    payloads: list[str],
+    send: Sender,
+    detect: Detector,
+    confirm: Detector | None = None,
+    batch_size: int | None = None,
+    first_only: bool = False,
+) -> dict[str, BatchHit]:
+    """First payload (in order) that triggers ``detect`` for each parameter.
+
+    ``confirm`` replaces ``detect`` once a group is down to one parameter, for
+    checks that other injected parameters could upset (e.g. a raw reflection
+    of the payload). A parameter is not probed again after its first hit;
+    with ``first_only`` the search stops at the first hit overall.
+    """
+    batch_size = max(batch_size or settings.SCANNER_INJECTION_BATCH_SIZE, 1)
+    confirm = confirm or detect
+    hits: dict[str, BatchHit] = {}
+
+    async def probe(group: list[str], payload: str) -> list[BatchHit]:
+        try:
+            response, url = await send({name: payload for name in group})
+        except Exception:
+            return []
+        signal = (confirm if len(group) == 1 else detect)(response, payload)
+        if not signal:
+            return []
+        if len(group) == 1:
+            return [BatchHit(group[0], payload, response, url, signal)]
+        mid = len(group) // 2
+        found = await probe(group[:mid], payload)
+        if found and first_only:
+            return found
+        return found + await probe(group[mid:], payload)
+
+    for payload in payloads:
+        pending = [name for name in params if name not in hits]
+        if not pending:
+            break
+        for i in range(0, len(pending), batch_size):
+            for hit in await probe(pending[i:i + batch_size], payload):
+                hits.setdefault(hit.param, hit)
+            if hits and first_only:
+                return hits
+    return hits
@@ -0,0 +1,190 @@
+"""Per-module time and request budgets enforced by the orchestrator.
+
+Each active module invocation gets a ``BudgetedClient``: a view of the
+scan's ``HttpClient`` that counts requests and refuses them past the budget.
+Modules already treat request errors as "skip this probe", so a refused
+request ends the invocation quickly with whatever it has found so far. A
+wall-clock timeout cancels invocations that are slow anyway (e.g. many
+time-based probes against a slow endpoint).
+
+A cut-off invocation may have claimed insertion points it never attacked;
+those claims are released so a later page carrying the same parameter
+tests it, and the count is reported in the summary.
+"""
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable
+
+from app.scanner.http_client import HttpClient
+from app.scanner.insertion_points import InsertionPointRegistry
+
+logger = logging.getLogger(__name__)
+
+# Budget-exhaustion events kept in scan stats; the counters cover the rest
+MAX_RECORDED_EVENTS = 50
+
+
+class BudgetExceeded(Exception):
+    """A module invocation used up its request budget."""
+
+
+class _RawClient:
+    """The ``client`` (raw httpx) attribute of a ``BudgetedClient``; requests count against the budget."""
+
+    def __init__(self, owner: "BudgetedClient"):
+        self._owner = owner
+        self._client = owner._http_client.client
+
+    async def request(self, method: str, url: str, **kwargs):
+        self._owner._spend()
+        return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+class BudgetedClient:
+    """``HttpClient`` view allowing at most ``max_requests`` requests (0 = unlimited)."""
+
+    def __init__(self, http_client: HttpClient, max_requests: int = 0):
+        self._http_client = http_client
+        self.max_requests = max_requests
+        self.requests = 0
+        self.exhausted = False
+        self.client = _RawClient(self)
+
+    def _spend(self) -> None:
+        if self.max_requests and self.requests >= self.max_requests:
+            self.exhausted = True
+            raise BudgetExceeded(f"request budget of {self.max_requests} used up")
+        self.requests += 1
+
+    async def get(self, url: str, **kwargs):
+        self._spend()
+        return await self._http_client.get(url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        self._spend()
+        return await self._http_client.post(url, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs):
+        self._spend()
+        return await self._http_client.request(method, url, **kwargs)
+
+    def stream(self, url: str, method: str = "GET", **kwargs):
+        self._spend()
+        return self._http_client.stream(url, method, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._http_client, name)
+
+
+@dataclass(slots=True)
+class ModuleUsage:
+    invocations: int = 0
+    requests: int = 0
+    seconds: float = 0.0
+    timeouts: int = 0
+    request_budget_exhausted: int = 0
+    insertion_points_released: int = 0
+    errors: int = 0
+
+
+class ModuleBudgets:
+    """Runs active module invocations under the budgets and tallies usage per module."""
+
+    def __init__(
+        self,
+        timeout: float = 0.0,
+        max_requests: int = 0,
+        insertion_points: InsertionPointRegistry | None = None,
+    ):
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self.insertion_points = insertion_points
+        self.usage: dict[str, ModuleUsage] = {}
+        self.events: list[dict] = []
+
+    async def run(
+        self,
+        module_name: str,
+        url: str,
+        http_client: HttpClient,
+        invoke: Callable[[HttpClient], Awaitable[list]],
+    ) -> list:
+        """``invoke(client)`` under the budgets; findings, or ``[]`` if it ran out of time.
+
+        An exception from ``invoke`` is re-raised once its claims are released.
+        """
+        client = BudgetedClient(http_client, self.max_requests)
+        usage = self.usage.setdefault(module_name, ModuleUsage())
+        usage.invocations += 1
+        started = time.monotonic()
+        findings: list = []
+        timed_out = False
+        error: Exception | None = None
+        tracking = self.insertion_points.tracking() if self.insertion_points is not None else nullcontext([])
+        with tracking as claims:
+            try:
+                if self.timeout > 0:
+                    findings = await asyncio.wait_for(invoke(client), self.timeout)
+                else:
+                    findings = await invoke(client)
+            except asyncio.TimeoutError:
+                timed_out = True
+            except Exception as e:
+                error = e
+            finally:
+                usage.seconds += time.monotonic() - started
+                usage.requests += client.requests
+
+        released = 0
+        if (timed_out or client.exhausted or error is not None) and claims:
+            # Points claimed but possibly never attacked go back to the pool for later pages
+            self.insertion_points.release(claims)
+            released = len(claims)
+            usage.insertion_points_released += released
+        if timed_out:
+            usage.timeouts += 1
+            self._record(module_name, url, "timeout", released)
+            logger.warning(f"Module {module_name} timed out after {self.timeout:.0f}s on {url}")
+        if client.exhausted:
+            usage.request_budget_exhausted += 1
+            self._record(module_name, url, "requests", 0 if timed_out else released)
+            logger.warning(f"Module {module_name} used its {self.max_requests}-request budget on {url}")
+        if error is not None:
+            usage.errors += 1
+            if not client.exhausted:
+                self._record(module_name, url, "error", released)
+            raise error
+        return findings
+
+    def _record(self, module_name: str, url: str, reason: str, released: int = 0) -> None:
+        if len(self.events) < MAX_RECORDED_EVENTS:
+            self.events.append({
+                "module": module_name, "url": url, "reason": reason, "insertion_points_released": released,
+            })
+
+    def summary(self) -> dict:
+        """JSON-ready usage per module plus the recorded exhaustion events."""
+        modules = {}
+        for name, usage in sorted(self.usage.items()):
+            entry = asdict(usage)
+            entry["seconds"] = round(usage.seconds, 2)
+            modules[name] = entry
+        return {
+            "timeout_seconds": self.timeout,
+            "max_requests": self.max_requests,
+            "insertion_points_released": sum(u.insertion_points_released for u in self.usage.values()),
+            "modules": modules,
+            "exhausted": self.events,
+        }
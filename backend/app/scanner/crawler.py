@@ -1,14 +1,18 @@
 import asyncio
 import logging
-import re
-from collections import deque
-from dataclasses import dataclass, field
-from urllib.parse import urljoin, urlparse, urlunparse, parse_qs, urlencode
-
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
 
+from app.scanner.fingerprint import content_hash, simhash
+from app.scanner.frontier import DEFAULT_PRIORITY, UrlFrontier
 from app.scanner.http_client import HttpClient
+from app.scanner.link_scoring import LinkContext, LinkScorer, default_link_score
+from app.scanner.page_analysis import FormData, HtmlParsePool, PageAnalysis
+from app.scanner.page_state import PageSnapshot, PageStateCache
+from app.scanner.page_store import PageStore
 from app.scanner.scope import ScopeValidator
+from app.scanner.sitemap import SitemapSeeder
+from app.scanner.url_templates import TemplateQuota, url_template
+from app.scanner.urls import canonical_url
 
 logger = logging.getLogger(__name__)
 
@@ -26,26 +30,102 @@ COMMON_SEED_PATHS_FULL = [
     "/manager", "/administrator", "/backend", "/portal", "/app",
 ]
 
-
-@dataclass
-class FormData:
-    action: str
-    method: str
-    inputs: list[dict] = field(default_factory=list)
+# Sitemap URLs are treated as one hop from the start page
+SITEMAP_DEPTH = 1
+# Above any link score, so the start page is always fetched first
+START_PRIORITY = 10.0
 
 
-@dataclass
 class CrawledPage:
-    url: str
-    status_code: int
-    headers: dict
-    body: str
-    forms: list[FormData] = field(default_factory=list)
-    links: list[str] = field(default_factory=list)
+    """Compact record of a crawled page.
+
+    Once ``offload`` has moved the body into a ``PageStore``, the record keeps
+    only metadata, forms and links; the body is reloaded on first access and
+    dropped again by ``release``. ``discard`` removes it from the store once
+    nothing will read it again.
+    """
+
+    __slots__ = (
+        "url", "status_code", "headers", "forms", "links", "template", "content_hash",
+        "simhash", "aliases", "not_modified", "synthetic", "_body", "_store", "_handle", "_analysis",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: dict,
+        body: str,
+        forms: list[FormData] | None = None,
+        links: list[str] | None = None,
+        template: str = "",
+        content_hash: str = "",
+        simhash: int = 0,
+        aliases: list[str] | None = None,
+        not_modified: bool = False,  # served from the previous scan's page state after a 304
+        synthetic: bool = False,  # built from an API spec rather than fetched; active tests only
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.forms = forms if forms is not None else []
+        self.links = links if links is not None else []
+        self.template = template
+        self.content_hash = content_hash
+        self.simhash = simhash
+        self.aliases = aliases if aliases is not None else []
+        self.not_modified = not_modified
+        self.synthetic = synthetic
+        self._body: str | None = body
+        self._store: PageStore | None = None
+        self._handle: int | None = None
+        self._analysis: PageAnalysis | None = None
+
+    def __repr__(self) -> str:
+        return f"CrawledPage(url={self.url!r}, status_code={self.status_code})"
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            self._body = self._store.get(self._handle) if self._store is not None else ""
+        return self._body
+
+    @property
+    def analysis(self) -> PageAnalysis:
+        """Shared parse-once view of this page (soup, links, lowered body/headers)."""
+        if self._analysis is None:
+            self._analysis = PageAnalysis(self.url, self.body, self.headers)
+        return self._analysis
+
+    def offload(self, store: PageStore) -> None:
+        """Move the body into ``store`` and drop the in-memory copy and parse tree."""
+        if self._store is None:
+            self._store = store
+            self._handle = store.put(self.body)
+        self.release()
+
+    def release(self) -> None:
+        """Drop the loaded body and parse tree; a no-op for pages without a store."""
+        if self._store is not None:
+            self._body = None
+            self._analysis = None
+
+    def discard(self) -> None:
+        """Drop the body for good, including its stored copy; ``body`` is empty afterwards."""
+        if self._store is not None:
+            self._store.discard(self._handle)
+            self._store = None
+            self._handle = None
+        self._body = None
+        self._analysis = None
 
 
 class AsyncCrawler:
-    """BFS web crawler with dedup, depth control, form extraction, and optional seed paths."""
+    """Web crawler with dedup, depth control, form extraction, and optional seed paths.
+
+    A fixed pool of worker tasks pulls from a shared frontier queue, so a slow
+    page only occupies its own slot while the others keep fetching.
+    """
 
     def __init__(
         self,
@@ -55,164 +135,195 @@ class AsyncCrawler:
         max_pages: int = 20,
         concurrency: int = 5,
         extra_seed_urls: list[str] | None = None,
+        parse_pool: HtmlParsePool | None = None,
+        frontier: UrlFrontier | None = None,
+        template_quota: TemplateQuota | None = None,
+        sitemap_seeder: SitemapSeeder | None = None,
+        page_state: PageStateCache | None = None,
+        link_scorer: LinkScorer | None = None,
+        page_store: PageStore | None = None,
     ):
         self.http = http_client
         self.scope = scope
         self.max_depth = max_depth
         self.max_pages = max_pages
-        self.semaphore = asyncio.Semaphore(concurrency)
-        self.visited: set[str] = set()
+        self.concurrency = max(concurrency, 1)
+        self.frontier = frontier if frontier is not None else UrlFrontier()
+        self.template_quota = template_quota
         self.pages: list[CrawledPage] = []
         self.extra_seed_urls = extra_seed_urls or []
+        self.parse_pool = parse_pool
+        self.sitemap_seeder = sitemap_seeder
+        self.page_state = page_state
+        self.link_scorer = link_scorer or default_link_score
+        self.page_store = page_store
+        self._enqueued_templates: set[str] = set()
 
     async def crawl(self, start_url: str) -> list[CrawledPage]:
-        queue: deque[tuple[str, int]] = deque()
         base = urljoin(start_url, "/")
-        queue.append((self._normalize(start_url), 0))
+        self._enqueue(self._normalize(start_url), 0, priority=START_PRIORITY)
         for seed in self.extra_seed_urls:
-            u = urljoin(base, seed)
-            norm = self._normalize(u)
-            if norm not in self.visited and self.scope.is_in_scope(u):
-                queue.append((norm, 0))
-
-        while queue and len(self.pages) < self.max_pages:
-            batch: list[tuple[str, int]] = []
-            while queue and len(batch) < self.semaphore._value:
-                url, depth = queue.popleft()
-                normalized = self._normalize(url)
-                if normalized in self.visited:
-                    continue
-                if depth > self.max_depth:
-                    continue
-                if not self.scope.is_in_scope(url):
-                    continue
-                self.visited.add(normalized)
-                batch.append((url, depth))
-
-            if not batch:
-                break
-
-            tasks = [self._fetch_page(url, depth) for url, depth in batch]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.warning(f"Crawl error: {result}")
-                    continue
-                if result is None:
-                    continue
-
-                page, depth = result
-                self.pages.append(page)
+            self._enqueue(self._normalize(urljoin(base, seed)), 0)
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        if self.sitemap_seeder is not None:
+            # Seeding runs alongside the workers; join() waits for it to finish
+            self.frontier.add_producer()
+            workers.append(asyncio.create_task(self._seed_from_sitemaps(base)))
+        try:
+            # Resolves once every queued URL has been processed or skipped; workers
+            # drain the remainder without fetching once max_pages is reached.
+            await self.frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.frontier.close()
+
+        return self.pages
 
+    async def _seed_from_sitemaps(self, base: str) -> None:
+        try:
+            async for entry in self.sitemap_seeder.entries(base):
                 if len(self.pages) >= self.max_pages:
                     break
+                self._enqueue(entry.url, SITEMAP_DEPTH, hint=entry.priority)
+        except Exception as e:
+            logger.warning(f"Sitemap seeding failed: {e}")
+        finally:
+            self.frontier.task_done()
 
-                # Enqueue discovered links
-                for link in page.links:
-                    norm = self._normalize(link)
-                    if norm not in self.visited and self.scope.is_in_scope(link):
-                        queue.append((link, depth + 1))
-
-        return self.pages
-
-    async def _fetch_page(self, url: str, depth: int) -> tuple[CrawledPage, int] | None:
-        async with self.semaphore:
+    def _enqueue(
+        self,
+        url: str,
+        depth: int,
+        priority: float | None = None,
+        hint: float = DEFAULT_PRIORITY,
+        source: CrawledPage | None = None,
+        form_actions: frozenset[str] = frozenset(),
+    ) -> bool:
+        """Dedup at enqueue time so the frontier never holds the same URL twice.
+
+        Unless ``priority`` is given, the URL is ranked by ``link_scorer``.
+        """
+        if depth > self.max_depth or not self.scope.is_in_scope(url):
+            return False
+        key = self._normalize(url)
+        if key in self.frontier.seen:
+            return False
+        template = url_template(url)
+        new_template = template not in self._enqueued_templates
+        # Structurally identical URLs (/product/123, /product/124) share a page quota
+        if self.template_quota is not None and not self.template_quota.allow(url):
+            return False
+        if priority is None:
+            priority = self.link_scorer(LinkContext(
+                url=url,
+                depth=depth,
+                hint=hint,
+                new_template=new_template,
+                from_form=url in form_actions,
+                source_has_forms=bool(source and source.forms),
+            ))
+        if not self.frontier.push(url, depth, key=key, priority=priority):
+            # Rejected URLs must not use up the template's quota
+            if self.template_quota is not None:
+                self.template_quota.release(url)
+            return False
+        self._enqueued_templates.add(template)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            url, depth = await self.frontier.get()
             try:
-                response = await self.http.get(url)
-                content_type = response.headers.get("content-type", "")
-                if "text/html" not in content_type and "application/xhtml" not in content_type:
-                    return None
-
-                body = response.text
-                links = self._extract_links(url, body)
-                forms = self._extract_forms(url, body)
-
-                page = CrawledPage(
-                    url=url,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    body=body,
-                    forms=forms,
-                    links=links,
-                )
-                return page, depth
+                await self._visit(url, depth)
             except Exception as e:
-                logger.warning(f"Failed to fetch {url}: {e}")
-                return None
+                logger.warning(f"Crawl error: {e}")
+            finally:
+                self.frontier.task_done()
 
-    def _extract_links(self, base_url: str, html: str) -> list[str]:
-        soup = BeautifulSoup(html, "lxml")
-        seen: set[str] = set()
-        links: list[str] = []
-
-        def add(href: str) -> None:
-            if not href or href.strip().startswith(("#", "javascript:", "mailto:", "tel:", "data:")):
-                return
-            absolute = urljoin(base_url, href.strip())
-            if absolute not in seen and self.scope.is_in_scope(absolute):
-                seen.add(absolute)
-                links.append(absolute)
-
-        for tag in soup.find_all(["a", "link"], href=True):
-            add(tag["href"])
-        for tag in soup.find_all(["script", "img", "iframe", "source", "video", "audio"], src=True):
-            add(tag["src"])
-        for tag in soup.find_all("area", href=True):
-            add(tag["href"])
-        for tag in soup.find_all(attrs={"data-href": True}):
-            add(tag["data-href"])
-        for tag in soup.find_all(attrs={"data-src": True}):
-            add(tag["data-src"])
-        for tag in soup.find_all(srcset=True):
-            for part in tag["srcset"].split(","):
-                part = part.strip().split()[0] if part.strip() else ""
-                add(part)
-        for tag in soup.find_all("meta", attrs={"http-equiv": re.compile(r"refresh", re.I)}):
-            content = tag.get("content", "")
-            m = re.search(r"url\s*=\s*(.+)", content, re.I)
-            if m:
-                add(m.group(1).strip())
-        for form in soup.find_all("form", action=True):
-            add(form["action"])
-        return links
-
-    def _extract_forms(self, base_url: str, html: str) -> list[FormData]:
-        soup = BeautifulSoup(html, "lxml")
-        forms: list[FormData] = []
-        for form in soup.find_all("form"):
-            action = urljoin(base_url, form.get("action", ""))
-            method = (form.get("method", "GET")).upper()
-            inputs = []
-            for inp in form.find_all(["input", "textarea", "select"]):
-                inputs.append({
-                    "name": inp.get("name", ""),
-                    "type": inp.get("type", "text"),
-                    "value": inp.get("value", ""),
-                })
-            forms.append(FormData(action=action, method=method, inputs=inputs))
-        return forms
+    async def _visit(self, url: str, depth: int) -> None:
+        if len(self.pages) >= self.max_pages:
+            return
 
-    @staticmethod
-    def _normalize(url: str) -> str:
-        parsed = urlparse(url)
-        scheme = parsed.scheme.lower()
-        host = (parsed.hostname or "").lower()
-        port = parsed.port
+        result = await self._fetch_page(url, depth)
+        if result is None or len(self.pages) >= self.max_pages:
+            return
 
-        # Remove default ports
-        if (scheme == "http" and port == 80) or (scheme == "https" and port == 443):
-            port = None
+        page, depth = result
+        self.pages.append(page)
 
-        netloc = host
-        if port:
-            netloc = f"{host}:{port}"
+        # Enqueue discovered links, ranked by the link scorer
+        form_actions = frozenset(form.action for form in page.forms)
+        for link in page.links:
+            self._enqueue(link, depth + 1, source=page, form_actions=form_actions)
 
-        # Sort query params
-        query_params = parse_qs(parsed.query, keep_blank_values=True)
-        sorted_query = urlencode(sorted(query_params.items()), doseq=True)
+        if self.page_store is not None:
+            page.offload(self.page_store)
 
-        # Remove fragment, strip trailing slash
-        path = parsed.path.rstrip("/") or "/"
+    async def _fetch_page(self, url: str, depth: int) -> tuple[CrawledPage, int] | None:
+        try:
+            key = self._normalize(url)
+            conditional = self.page_state.conditional_headers(key) if self.page_state is not None else {}
+            if conditional:
+                response = await self.http.get(url, headers=conditional)
+                if response.status_code == 304:
+                    snapshot = self.page_state.refresh(key, dict(response.headers))
+                    return await self._page_from_snapshot(url, snapshot), depth
+            else:
+                response = await self.http.get(url)
+            content_type = response.headers.get("content-type", "")
+            if "text/html" not in content_type and "application/xhtml" not in content_type:
+                return None
 
-        return urlunparse((scheme, netloc, path, "", sorted_query, ""))
+            structure = None
+            if self.parse_pool and self.parse_pool.should_offload(len(response.content)):
+                # Large pages are parsed and fingerprinted in the pool, off the event loop
+                structure, page_hash, page_simhash = await self.parse_pool.parse_page(
+                    url, response.text, len(response.content),
+                )
+            else:
+                page_hash, page_simhash = content_hash(response.text), simhash(response.text)
+            page = CrawledPage(
+                url=url,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                body=response.text,
+                template=url_template(url),
+                content_hash=page_hash,
+                simhash=page_simhash,
+            )
+            if structure is not None:
+                page.analysis.prime(structure)
+            page.forms = page.analysis.forms
+            page.links = [link for link in page.analysis.links if self.scope.is_in_scope(link)]
+            if self.page_state is not None:
+                self.page_state.record(key, page, page.analysis.structure())
+            return page, depth
+        except Exception as e:
+            logger.warning(f"Failed to fetch {url}: {e}")
+            return None
+
+    async def _page_from_snapshot(self, url: str, snapshot: PageSnapshot) -> CrawledPage:
+        """Rebuild an unchanged page from stored state, reusing its stored parse."""
+        body = snapshot.body
+        page_simhash = await self.parse_pool.simhash(body) if self.parse_pool else simhash(body)
+        page = CrawledPage(
+            url=url,
+            status_code=snapshot.status_code,
+            headers=dict(snapshot.headers),
+            body=body,
+            template=url_template(url),
+            content_hash=snapshot.content_hash,
+            simhash=page_simhash,
+            not_modified=True,
+        )
+        page.analysis.prime(snapshot.page_structure())
+        page.forms = page.analysis.forms
+        page.links = [link for link in page.analysis.links if self.scope.is_in_scope(link)]
+        return page
+
+    @staticmethod
+    def _normalize(url: str) -> str:
+        return canonical_url(url).normalized
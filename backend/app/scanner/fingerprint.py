@@ -0,0 +1,111 @@
+"""Content fingerprints for exact and near-duplicate page detection."""
+import hashlib
+import re
+from collections import Counter, defaultdict
+from urllib.parse import parse_qsl, urlsplit
+
+# Tag names, attribute names and values, and text words of the raw HTML
+TOKEN = re.compile(r"[A-Za-z0-9_]{2,}")
+SIMHASH_BITS = 64
+# Opening and closing tag names, in document order
+TAG_NAME = re.compile(r"<\s*(/?[A-Za-z][A-Za-z0-9-]*)")
+
+
+def content_hash(body: str) -> str:
+    return hashlib.blake2b(body.encode("utf-8", errors="replace"), digest_size=16).hexdigest()
+
+
+def structure_hash(body: str) -> str:
+    """Hash of the tag skeleton: equal for pages rendered from the same markup with different text."""
+    skeleton = " ".join(TAG_NAME.findall(body)).lower()
+    return hashlib.blake2b(skeleton.encode(), digest_size=8).hexdigest()
+
+
+def simhash(body: str) -> int:
+    """64-bit SimHash over the tokenized DOM, weighted by token frequency."""
+    weights = [0] * SIMHASH_BITS
+    for token, count in Counter(TOKEN.findall(body.lower())).items():
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class DuplicateIndex:
+    """Finds an earlier page with the same exact hash or a SimHash within ``threshold`` bits.
+
+    SimHashes are split into ``threshold + 1`` bands; by pigeonhole any two
+    hashes within the threshold share at least one band, so only pages in
+    matching band buckets are compared.
+    """
+
+    def __init__(self, threshold: int = 3):
+        self.threshold = threshold
+        self.bands = max(threshold + 1, 1)
+        self.band_width = SIMHASH_BITS // self.bands
+        self._exact: dict[str, int] = {}
+        self._buckets: dict[tuple[int, int], list[tuple[int, int]]] = defaultdict(list)
+
+    def _band_keys(self, value: int):
+        mask = (1 << self.band_width) - 1
+        for band in range(self.bands):
+            yield band, (value >> (band * self.band_width)) & mask
+
+    def find(self, exact: str, sim: int) -> int | None:
+        if exact in self._exact:
+            return self._exact[exact]
+        for key in self._band_keys(sim):
+            for other, idx in self._buckets.get(key, ()):
+                if hamming(sim, other) <= self.threshold:
+                    return idx
+        return None
+
+    def add(self, exact: str, sim: int, idx: int) -> None:
+        self._exact.setdefault(exact, idx)
+        for key in self._band_keys(sim):
+            self._buckets[key].append((sim, idx))
+
+
+def insertion_signature(page) -> str:
+    """Digest of what a page offers to attack: its query parameter names and forms (action, method, fields)."""
+    params = sorted({name for name, _ in parse_qsl(urlsplit(page.url).query, keep_blank_values=True)})
+    forms = sorted(
+        (form.action, form.method.upper(), tuple(sorted(str(i.get("name") or "") for i in form.inputs)))
+        for form in page.forms
+    )
+    return hashlib.blake2b(repr((params, forms)).encode(), digest_size=8).hexdigest()
+
+
+def collapse_duplicates(pages: list, threshold: int = 3) -> list:
+    """Collapse duplicate pages into their first occurrence.
+
+    Only pages with the same ``insertion_signature`` are compared, so a page
+    whose body matches another's but carries a different form or query
+    parameters is kept for the active scan. Returns the primary pages; each
+    primary's ``aliases`` lists the URLs of the pages folded into it.
+    """
+    indexes: dict[str, DuplicateIndex] = {}
+    primaries: list = []
+    for page in pages:
+        if not page.content_hash:
+            primaries.append(page)
+            continue
+        signature = insertion_signature(page)
+        index = indexes.get(signature)
+        if index is None:
+            index = indexes[signature] = DuplicateIndex(threshold)
+        match = index.find(page.content_hash, page.simhash)
+        if match is not None:
+            primaries[match].aliases.append(page.url)
+            continue
+        index.add(page.content_hash, page.simhash, len(primaries))
+        primaries.append(page)
+    return primaries
@@ -0,0 +1,366 @@
+"""Crawl frontier: enqueue-time dedup, compact visited tracking, priorities, host interleaving and disk spill."""
+import asyncio
+import hashlib
+import heapq
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from collections import deque
+from typing import Callable
+
+from app.scanner.rate_limiter import PerDomainThrottle
+from app.scanner.urls import canonical_url
+
+FrontierItem = tuple[str, int]  # (url, depth)
+
+# Priority given to ordinary link discoveries; higher values are crawled first
+DEFAULT_PRIORITY = 0.5
+
+
+def url_fingerprint(key: str) -> int:
+    """64-bit fingerprint of a normalized URL."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class FingerprintSet:
+    """Visited set holding 64-bit hashes instead of full URL strings.
+
+    Collisions are possible but negligible below billions of URLs.
+    """
+
+    def __init__(self):
+        self._hashes: set[int] = set()
+
+    def add(self, key: str) -> bool:
+        """Record ``key``; returns False if it was already present."""
+        fp = url_fingerprint(key)
+        if fp in self._hashes:
+            return False
+        self._hashes.add(fp)
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return url_fingerprint(key) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` keys at ``fp_rate``.
+
+    A false positive makes the crawler skip a URL it has not actually seen;
+    there are never false negatives, so nothing is fetched twice.
+    """
+
+    def __init__(self, capacity: int = 100_000, fp_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        fp_rate = min(max(fp_rate, 1e-9), 0.5)
+        self.size = max(int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> bool:
+        """Record ``key``; returns False if it was (probably) already present."""
+        added = False
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self._count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class MemoryQueue:
+    """In-memory priority queue of pending frontier items (FIFO among equal priorities)."""
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._seq = 0
+
+    def push(self, item: FrontierItem, priority: float = DEFAULT_PRIORITY) -> None:
+        url, depth = item
+        heapq.heappush(self._heap, (-priority, self._seq, url, depth))
+        self._seq += 1
+
+    def pop(self) -> FrontierItem:
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def ready_in(self) -> float:
+        """Seconds until ``pop`` has an item worth dispatching; plain queues are always ready."""
+        return 0.0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def close(self) -> None:
+        self._heap.clear()
+
+
+class SqliteSpillQueue:
+    """Priority queue that keeps at most ``memory_limit`` items in memory.
+
+    When the heap overflows, its lowest-ranked half is spilled to a SQLite
+    table; spilled items are paged back in, best first, whenever the best
+    item on disk outranks the best item in memory.
+    """
+
+    def __init__(self, memory_limit: int = 10_000, chunk_size: int = 1_000, path: str | None = None):
+        self.memory_limit = max(memory_limit, 1)
+        self.chunk_size = max(chunk_size, 1)
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._seq = 0
+        self._on_disk = 0
+        self._disk_best: tuple[float, int] | None = None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="scanctum-frontier-", suffix=".db")
+            os.close(fd)
+            self._owns_file = True
+        else:
+            self._owns_file = False
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pending (rank REAL, seq INTEGER, url TEXT, depth INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_pending_order ON pending (rank, seq)")
+
+    def push(self, item: FrontierItem, priority: float = DEFAULT_PRIORITY) -> None:
+        url, depth = item
+        heapq.heappush(self._heap, (-priority, self._seq, url, depth))
+        self._seq += 1
+        if len(self._heap) > self.memory_limit:
+            self._spill()
+
+    def pop(self) -> FrontierItem:
+        if self._on_disk and (not self._heap or self._disk_best < self._heap[0][:2]):
+            self._load_chunk()
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def ready_in(self) -> float:
+        return 0.0
+
+    def __len__(self) -> int:
+        return len(self._heap) + self._on_disk
+
+    def _spill(self) -> None:
+        self._heap.sort()
+        keep = len(self._heap) // 2
+        spilled = self._heap[keep:]
+        del self._heap[keep:]  # a sorted list is already a valid heap
+        with self._db:
+            self._db.executemany("INSERT INTO pending (rank, seq, url, depth) VALUES (?, ?, ?, ?)", spilled)
+        self._on_disk += len(spilled)
+        best = spilled[0][:2]
+        self._disk_best = best if self._disk_best is None else min(self._disk_best, best)
+
+    def _load_chunk(self) -> None:
+        rows = self._db.execute(
+            "SELECT rowid, rank, seq, url, depth FROM pending ORDER BY rank, seq LIMIT ?", (self.chunk_size,)
+        ).fetchall()
+        with self._db:
+            self._db.executemany("DELETE FROM pending WHERE rowid = ?", [(r[0],) for r in rows])
+        self._on_disk -= len(rows)
+        for _, rank, seq, url, depth in rows:
+            heapq.heappush(self._heap, (rank, seq, url, depth))
+        row = self._db.execute("SELECT rank, seq FROM pending ORDER BY rank, seq LIMIT 1").fetchone()
+        self._disk_best = tuple(row) if row else None
+
+    def close(self) -> None:
+        self._db.close()
+        if self._owns_file:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+class HostInterleavedQueue:
+    """Pending store with one ready queue per host, served round-robin.
+
+    ``pop`` takes the next host in rotation whose throttle window is open, so a
+    host sitting out its request delay does not hold up workers that could be
+    fetching from other hosts. Within a host, items keep the order of the
+    per-host store built by ``store_factory``.
+    """
+
+    def __init__(
+        self,
+        throttle: PerDomainThrottle | None = None,
+        store_factory: Callable[[], "MemoryQueue | SqliteSpillQueue"] = MemoryQueue,
+    ):
+        self.throttle = throttle
+        self.store_factory = store_factory
+        self._queues: dict[str, MemoryQueue | SqliteSpillQueue] = {}
+        self._rotation: deque[str] = deque()
+        self._next_open: dict[str, float] = {}  # host -> earliest time of the next dispatch
+        self._size = 0
+
+    def push(self, item: FrontierItem, priority: float = DEFAULT_PRIORITY) -> None:
+        host = canonical_url(item[0]).hostname
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = self.store_factory()
+            self._rotation.append(host)
+        queue.push(item, priority)
+        self._size += 1
+
+    def pop(self, exclude: set[str] | frozenset[str] = frozenset()) -> FrontierItem | None:
+        """Next item from the first open host in rotation, or from the soonest-open one.
+
+        Hosts in ``exclude`` are passed over; returns None if no other host has work.
+        """
+        now = time.monotonic()
+        chosen, soonest = None, math.inf
+        for i, host in enumerate(self._rotation):
+            if host in exclude:
+                continue
+            wait = self._host_ready_in(host, now)
+            if wait < soonest:
+                chosen, soonest = i, wait
+            if wait <= 0:
+                break
+        if chosen is None:
+            return None
+
+        host = self._rotation[chosen]
+        del self._rotation[chosen]
+        queue = self._queues[host]
+        item = queue.pop()
+        self._size -= 1
+        if len(queue):
+            self._rotation.append(host)
+        else:
+            queue.close()
+            del self._queues[host]
+        if self.throttle is not None:
+            # Reserve the host's window until the request we just handed out has gone
+            self._next_open[host] = now + soonest + self.throttle.delay
+        return item
+
+    def ready_in(self) -> float:
+        """Seconds until some host's throttle window opens (0 if one is open now)."""
+        now = time.monotonic()
+        return min((self._host_ready_in(host, now) for host in self._rotation), default=0.0)
+
+    def _host_ready_in(self, host: str, now: float) -> float:
+        if self.throttle is None:
+            return 0.0
+        return max(self._next_open.get(host, 0.0) - now, self.throttle.ready_in(host), 0.0)
+
+    @property
+    def hosts(self) -> int:
+        return len(self._queues)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        for queue in self._queues.values():
+            queue.close()
+        self._queues.clear()
+        self._rotation.clear()
+        self._size = 0
+
+
+class UrlFrontier:
+    """Async crawl frontier with enqueue-time dedup.
+
+    Exposes the ``get``/``task_done``/``join`` protocol of ``asyncio.Queue`` on
+    top of a pluggable visited structure and pending store. Items are popped
+    highest priority first, FIFO among equals.
+    """
+
+    def __init__(self, seen: FingerprintSet | BloomFilter | None = None, store=None):
+        self.seen = seen if seen is not None else FingerprintSet()
+        self.store = store if store is not None else MemoryQueue()
+        self._unfinished = 0
+        self._not_empty = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def push(self, url: str, depth: int, key: str | None = None, priority: float = DEFAULT_PRIORITY) -> bool:
+        """Queue ``url`` unless its dedup ``key`` was already seen. Returns True if queued."""
+        if not self.seen.add(key or url):
+            return False
+        self.store.push((url, depth), priority)
+        self._unfinished += 1
+        self._finished.clear()
+        self._not_empty.set()
+        return True
+
+    async def get(self) -> FrontierItem:
+        """Next item, waiting while the store is empty or none of its items is ready to dispatch."""
+        while True:
+            wait = self.store.ready_in() if len(self.store) else None
+            if wait is not None and wait <= 0:
+                return self.store.pop()
+            self._not_empty.clear()
+            try:
+                # A push may bring work for an idle host, so wake up on it too
+                await asyncio.wait_for(self._not_empty.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def add_producer(self) -> None:
+        """Keep ``join`` pending while a background producer (e.g. sitemap seeding) runs."""
+        self._unfinished += 1
+        self._finished.clear()
+
+    def task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._finished.set()
+
+    async def join(self) -> None:
+        await self._finished.wait()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def make_frontier(
+    visited: str = "fingerprint",
+    expected_urls: int = 100_000,
+    fp_rate: float = 0.001,
+    spill_after: int = 0,
+    throttle: PerDomainThrottle | None = None,
+) -> UrlFrontier:
+    """Build a frontier from scanner settings.
+
+    ``visited`` is ``"fingerprint"`` or ``"bloom"``; ``spill_after`` > 0 keeps
+    at most that many pending URLs in memory (per host when interleaving) and
+    spills the rest to SQLite. With a ``throttle``, pending URLs are kept per
+    host and dispatched round-robin across hosts whose window is open.
+    """
+    seen = BloomFilter(expected_urls, fp_rate) if visited == "bloom" else FingerprintSet()
+
+    def new_store() -> MemoryQueue | SqliteSpillQueue:
+        return SqliteSpillQueue(memory_limit=spill_after) if spill_after > 0 else MemoryQueue()
+
+    store = HostInterleavedQueue(throttle, store_factory=new_store) if throttle is not None else new_store()
+    return UrlFrontier(seen=seen, store=store)
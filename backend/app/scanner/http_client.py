@@ -1,6 +1,10 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 import httpx
 
 from app.scanner.rate_limiter import CircuitBreaker, PerDomainThrottle
+from app.scanner.urls import request_hostname
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -36,15 +40,34 @@ class HttpClient:
             verify=False,  # Scan targets may have self-signed certs
         )
 
-    async def get(self, url: str) -> httpx.Response:
-        return await self._request("GET", url)
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self._request("GET", url, **kwargs)
 
     async def post(self, url: str, **kwargs) -> httpx.Response:
         return await self._request("POST", url, **kwargs)
 
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self._request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, url: str, method: str = "GET", **kwargs) -> AsyncIterator[httpx.Response]:
+        """Open a streamed response (no retries) so large bodies can be consumed incrementally."""
+        domain = request_hostname(url)
+
+        if self.circuit_breaker.is_open(domain):
+            raise ConnectionError(f"Circuit breaker open for {domain}")
+
+        await self.throttle.wait(url)
+        try:
+            async with self.client.stream(method, url, **kwargs) as response:
+                self.circuit_breaker.record_success(domain)
+                yield response
+        except (httpx.TransportError, httpx.TimeoutException):
+            self.circuit_breaker.record_failure(domain)
+            raise
+
     async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
-        from urllib.parse import urlparse
-        domain = urlparse(url).hostname or ""
+        domain = request_hostname(url)
 
         if self.circuit_breaker.is_open(domain):
             raise ConnectionError(f"Circuit breaker open for {domain}")
@@ -0,0 +1,94 @@
+"""Per-scan registry of attacked insertion points.
+
+Site-wide forms (search boxes, login and newsletter forms) appear on every
+page. An insertion point is identified by method, endpoint, parameter name
+and location, so each module attacks it once per scan however many pages
+carry it. A GET form and a link with the same query parameter share a key.
+
+Claims made inside ``tracking()`` are collected so that an invocation cut
+off by its budget can ``release`` the points it never got to attack.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from app.scanner.page_analysis import FormData
+from app.scanner.urls import CanonicalUrl, canonical_url
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+# Claims collected for the module invocation running in the current task
+_tracked_claims: ContextVar[list | None] = ContextVar("tracked_insertion_point_claims", default=None)
+
+
+@dataclass(frozen=True, slots=True)
+class InsertionPoint:
+    method: str
+    endpoint: str  # normalized URL without query or fragment
+    name: str
+    location: str  # "query", "body", "json" or "path"
+
+
+def endpoint_key(url: CanonicalUrl) -> str:
+    normalized = url.normalized
+    return normalized.split("?", 1)[0]
+
+
+def query_point(url: CanonicalUrl, name: str) -> InsertionPoint:
+    return InsertionPoint("GET", endpoint_key(url), name, "query")
+
+
+def form_point(form: FormData, name: str) -> InsertionPoint:
+    method = form.method.upper()
+    location = next((i.get("in") for i in form.inputs if i.get("name") == name), None)
+    if location is None:
+        if method not in BODY_METHODS:
+            location = "query"
+        else:
+            location = "json" if form.enctype == "application/json" else "body"
+    elif location == "body" and form.enctype == "application/json":
+        location = "json"
+    if method not in BODY_METHODS:
+        method = "GET"  # submit_form sends every other method as a GET
+    return InsertionPoint(method, endpoint_key(canonical_url(form.action)), name, location)
+
+
+class InsertionPointRegistry:
+    """Insertion points each module has already attacked during one scan."""
+
+    def __init__(self):
+        self._claimed: set[tuple[str, InsertionPoint]] = set()
+        self.skipped = 0
+        self.released = 0
+
+    def claim(self, module: str, point: InsertionPoint) -> bool:
+        """True the first time ``module`` asks for ``point``; False (a repeat) afterwards."""
+        key = (module, point)
+        if key in self._claimed:
+            self.skipped += 1
+            return False
+        self._claimed.add(key)
+        tracked = _tracked_claims.get()
+        if tracked is not None:
+            tracked.append(key)
+        return True
+
+    @contextmanager
+    def tracking(self) -> Iterator[list]:
+        """Collect the claims made in this task (and tasks it starts) until the block exits."""
+        claims: list[tuple[str, InsertionPoint]] = []
+        token = _tracked_claims.set(claims)
+        try:
+            yield claims
+        finally:
+            _tracked_claims.reset(token)
+
+    def release(self, claims: list) -> None:
+        """Forget ``claims`` so a later page attacks those points again."""
+        for key in claims:
+            self._claimed.discard(key)
+        self.released += len(claims)
+
+    def __len__(self) -> int:
+        return len(self._claimed)
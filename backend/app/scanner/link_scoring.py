@@ -0,0 +1,71 @@
+"""Link scoring for the best-first crawl frontier: higher scores are fetched first."""
+import re
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import parse_qsl
+
+from app.scanner.frontier import DEFAULT_PRIORITY
+from app.scanner.urls import canonical_url
+
+API_PATH = re.compile(r"(?:^|/)(?:api|graphql|rest|rpc|ajax|v\d+)(?:/|$)|\.json$", re.I)
+DESTRUCTIVE_PATH = re.compile(
+    r"log[-_]?out|sign[-_]?out|log[-_]?off|delete|remove|destroy|unsubscribe|deactivate|revoke", re.I
+)
+
+QUERY_BONUS = 0.2
+PER_PARAM_BONUS = 0.05
+MAX_SCORED_PARAMS = 4
+FORM_ACTION_BONUS = 0.25
+FORM_PAGE_BONUS = 0.05
+API_BONUS = 0.2
+NEW_TEMPLATE_BONUS = 0.15
+DEPTH_PENALTY = 0.05
+DESTRUCTIVE_PENALTY = 1.0
+
+
+@dataclass(slots=True)
+class LinkContext:
+    """What the crawler knows about a URL when it is enqueued."""
+    url: str
+    depth: int
+    hint: float = DEFAULT_PRIORITY  # e.g. a sitemap <priority>
+    new_template: bool = False
+    from_form: bool = False  # URL is a form action on the source page
+    source_has_forms: bool = False
+
+
+LinkScorer = Callable[[LinkContext], float]
+
+
+def default_link_score(ctx: LinkContext) -> float:
+    """Favour URLs with attack surface (parameters, forms, APIs, unseen templates)."""
+    parsed = canonical_url(ctx.url)
+    path = parsed.path
+    score = ctx.hint
+
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    if params:
+        score += QUERY_BONUS + PER_PARAM_BONUS * min(len(params), MAX_SCORED_PARAMS)
+    if ctx.from_form:
+        score += FORM_ACTION_BONUS
+    if ctx.source_has_forms:
+        score += FORM_PAGE_BONUS
+    if API_PATH.search(path):
+        score += API_BONUS
+    if ctx.new_template:
+        score += NEW_TEMPLATE_BONUS
+    score -= DEPTH_PENALTY * ctx.depth
+    if DESTRUCTIVE_PATH.search(path) or DESTRUCTIVE_PATH.search(parsed.query):
+        score -= DESTRUCTIVE_PENALTY
+    return score
+
+
+def breadth_first_score(ctx: LinkContext) -> float:
+    """Constant score: the frontier falls back to FIFO (breadth-first) order."""
+    return ctx.hint
+
+
+LINK_SCORERS: dict[str, LinkScorer] = {
+    "best_first": default_link_score,
+    "breadth_first": breadth_first_score,
+}
@@ -1,8 +1,17 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from urllib.parse import quote, urlencode
 
+import httpx
+
+from app.scanner.baselines import Baseline, BaselineService
+from app.scanner.batching import Sender
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
+from app.scanner.insertion_points import InsertionPointRegistry, form_point, query_point
+from app.scanner.page_analysis import FormData
+from app.scanner.similarity import mask_reflections, similar, tokenize
+from app.scanner.urls import CanonicalUrl
 
 
 @dataclass
@@ -20,6 +29,10 @@ class Finding:
     remediation: str
     confidence: str = "firm"
     evidence: list[dict] = field(default_factory=list)
+    # Set by site-wide header checks: findings sharing module, type, parameter and
+    # fingerprint are merged into one listing every page in affected_urls
+    fingerprint: str | None = None
+    affected_urls: list[str] = field(default_factory=list)
 
 
 class BaseModule(ABC):
@@ -29,6 +42,10 @@ class BaseModule(ABC):
     description: str = ""
     scan_modes: list[str] = ["quick", "full"]  # Which scan modes include this module
     is_active: bool = False  # Whether this module sends crafted requests
+    # Set by the orchestrator for the scan; None means every insertion point is tested
+    insertion_points: InsertionPointRegistry | None = None
+    # Shared reference responses for the scan; None means each call fetches its own
+    baselines: BaselineService | None = None
 
     def detect(self, page: CrawledPage) -> list[Finding]:
         """Passive analysis of already-fetched page. Override in passive modules."""
@@ -45,3 +62,103 @@ class BaseModule(ABC):
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         """Async wrapper for active_test."""
         return self.active_test(page, http_client)
+
+    async def submit_form(
+        self, http_client: HttpClient, form: FormData, data: dict
+    ) -> tuple[httpx.Response, str]:
+        """Send ``data`` through ``form``; returns the response and the request URL.
+
+        Inputs tagged ``"in": "path"`` fill ``{name}`` placeholders in the
+        action, ``"query"`` inputs go in the query string and the rest form the
+        body (JSON when the form's enctype says so). Plain HTML forms keep the
+        usual behaviour: POST sends a urlencoded body, anything else a GET.
+        """
+        locations = {i["name"]: i.get("in") for i in form.inputs if i.get("name")}
+        url = form.action
+        query: dict = {}
+        body: dict = {}
+        for name, value in data.items():
+            location = locations.get(name)
+            if location == "path":
+                url = url.replace(f"{{{name}}}", quote(str(value), safe=""))
+            elif location == "query" or (location is None and form.method not in ("POST", "PUT", "PATCH")):
+                query[name] = value
+            else:
+                body[name] = value
+        if query:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(query)}"
+
+        if form.method not in ("POST", "PUT", "PATCH"):
+            return await http_client.get(url), url
+        payload = {"json": body} if form.enctype == "application/json" else {"data": body}
+        if form.method == "POST":
+            return await http_client.post(url, **payload), url
+        return await http_client.request(form.method, url, **payload), url
+
+    async def baseline(self, http_client: HttpClient, url: str, samples: int = 1) -> Baseline | None:
+        """Reference response for ``url``, shared with the other modules during a scan."""
+        service = self.baselines if self.baselines is not None else BaselineService()
+        return await service.get(http_client, url, samples)
+
+    async def responses_differ(
+        self, http_client: HttpClient, url: str, body: str, other: str | None = None,
+        reflected: tuple[str, ...] = (),
+    ) -> bool:
+        """Whether ``body`` differs from ``other`` (default: ``url``'s baseline) outside dynamic regions.
+
+        Responses of ``url``'s endpoint are compared as masked token sequences,
+        with the injected ``reflected`` values masked wherever the page echoes
+        them. Dynamic regions are learned from a second fetch of ``url``, which
+        is made only if the responses already look different without them.
+        """
+        baseline = await self.baseline(http_client, url)
+        if baseline is None:
+            return not similar(
+                tokenize(mask_reflections(other or "", reflected)), tokenize(mask_reflections(body, reflected)),
+            )
+        if baseline.profile.similar(body, other, reflected):
+            return False
+        if baseline.profile.learned:
+            return True
+        baseline = await self.baseline(http_client, url, samples=2)
+        if baseline is None or baseline.second_text is None:
+            return True
+        return not baseline.profile.similar(body, other, reflected)
+
+    def untested_params(self, parsed: CanonicalUrl, names: list[str] | None = None) -> list[str]:
+        """Query parameters of ``parsed`` (or just ``names``) this module hasn't attacked yet.
+
+        The returned parameters are recorded as attacked for the rest of the scan.
+        """
+        names = list(parsed.query_params) if names is None else names
+        if self.insertion_points is None:
+            return names
+        return [name for name in names if self.insertion_points.claim(self.name, query_point(parsed, name))]
+
+    def untested_fields(self, form: FormData, names: list[str] | None = None) -> list[str]:
+        """Named inputs of ``form`` (or just ``names``) this module hasn't attacked yet."""
+        if names is None:
+            names = [i["name"] for i in form.inputs if i.get("name")]
+        if self.insertion_points is None:
+            return names
+        return [name for name in names if self.insertion_points.claim(self.name, form_point(form, name))]
+
+    def url_sender(self, http_client: HttpClient, parsed: CanonicalUrl, prefix: str = "") -> Sender:
+        """Sender for ``inject_batched`` that overrides query parameters of ``parsed``."""
+        template = parsed.query_template
+
+        async def send(injected: dict[str, str]) -> tuple[httpx.Response, str]:
+            test_url = template.render({k: f"{prefix}{v}" for k, v in injected.items()} if prefix else injected)
+            return await http_client.get(test_url), test_url
+
+        return send
+
+    def form_sender(self, http_client: HttpClient, form: FormData, prefix: str = "") -> Sender:
+        """Sender for ``inject_batched`` that submits ``form`` with some fields overridden."""
+        base = {i["name"]: i.get("value", "test") for i in form.inputs if i.get("name")}
+
+        async def send(injected: dict[str, str]) -> tuple[httpx.Response, str]:
+            data = {**base, **{k: f"{prefix}{v}" for k, v in injected.items()}}
+            return await self.submit_form(http_client, form, data)
+
+        return send
@@ -1,3 +1,4 @@
+from app.scanner.aggregation import FingerprintMemo, header_fingerprint
 from app.scanner.crawler import CrawledPage
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
@@ -10,18 +11,22 @@ class CookieSecurityModule(BaseModule):
     scan_modes = ["quick", "full"]
     is_active = False
 
+    def __init__(self):
+        self._memo = FingerprintMemo()
+
     def detect(self, page: CrawledPage) -> list[Finding]:
-        findings: list[Finding] = []
-        set_cookies = []
+        cookies = page.analysis.set_cookies
+        # Cookie values change per response (session ids); only names and attributes are evaluated
+        shape = [(_cookie_name(c), _cookie_flags(c)) for c in cookies]
+        return self._memo.findings_for(header_fingerprint(shape), page.url, lambda: self._evaluate(page.url, cookies))
 
-        for key, value in page.headers.items():
-            if key.lower() == "set-cookie":
-                set_cookies.append(value)
+    def _evaluate(self, url: str, cookies: list[str]) -> list[Finding]:
+        findings: list[Finding] = []
 
-        for cookie_str in set_cookies:
-            parts = cookie_str.split(";")
-            cookie_name = parts[0].split("=")[0].strip() if parts else "unknown"
-            flags = cookie_str.lower()
+        for cookie_str in cookies:
+            cookie_name = _cookie_name(cookie_str)
+            flags = _cookie_flags(cookie_str)
+            fingerprint = header_fingerprint([(cookie_name, flags)])
 
             if "httponly" not in flags:
                 findings.append(Finding(
@@ -32,12 +37,13 @@ class CookieSecurityModule(BaseModule):
                     cvss_vector="CVSS:3.1/AV:N/AC:H/PR:N/UI:R/S:U/C:L/I:N/A:N",
                     owasp_category="A05",
                     cwe_id="CWE-1004",
-                    affected_url=page.url,
+                    affected_url=url,
                     affected_parameter=cookie_name,
                     description=f"Cookie '{cookie_name}' is missing the HttpOnly flag, making it accessible to JavaScript.",
                     remediation="Add the HttpOnly flag to prevent client-side script access.",
                     confidence="confirmed",
                     evidence=[{"type": "response", "title": "Set-Cookie Header", "content": cookie_str}],
+                    fingerprint=fingerprint,
                 ))
 
             if "secure" not in flags:
@@ -49,12 +55,13 @@ class CookieSecurityModule(BaseModule):
                     cvss_vector="CVSS:3.1/AV:N/AC:H/PR:N/UI:R/S:U/C:L/I:N/A:N",
                     owasp_category="A05",
                     cwe_id="CWE-614",
-                    affected_url=page.url,
+                    affected_url=url,
                     affected_parameter=cookie_name,
                     description=f"Cookie '{cookie_name}' is missing the Secure flag, allowing transmission over HTTP.",
                     remediation="Add the Secure flag so the cookie is only sent over HTTPS.",
                     confidence="confirmed",
                     evidence=[{"type": "response", "title": "Set-Cookie Header", "content": cookie_str}],
+                    fingerprint=fingerprint,
                 ))
 
             if "samesite" not in flags:
@@ -66,12 +73,22 @@ class CookieSecurityModule(BaseModule):
                     cvss_vector="CVSS:3.1/AV:N/AC:H/PR:N/UI:R/S:U/C:N/I:L/A:N",
                     owasp_category="A05",
                     cwe_id="CWE-1275",
-                    affected_url=page.url,
+                    affected_url=url,
                     affected_parameter=cookie_name,
                     description=f"Cookie '{cookie_name}' is missing the SameSite attribute.",
                     remediation="Add 'SameSite=Lax' or 'SameSite=Strict' attribute.",
                     confidence="confirmed",
                     evidence=[{"type": "response", "title": "Set-Cookie Header", "content": cookie_str}],
+                    fingerprint=fingerprint,
                 ))
 
         return findings
+
+
+def _cookie_name(cookie_str: str) -> str:
+    return cookie_str.split(";", 1)[0].split("=", 1)[0].strip() or "unknown"
+
+
+def _cookie_flags(cookie_str: str) -> str:
+    """Lowercased attributes of a Set-Cookie value, without the cookie's own value."""
+    return ";".join(part.strip() for part in cookie_str.lower().split(";")[1:])
@@ -1,15 +1,14 @@
 """CORS misconfiguration scanner module — includes subdomain and protocol tests."""
-from urllib.parse import urlparse
-
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 
 def _build_subdomain_origins(target_url: str) -> list[str]:
     """Generate attacker-controlled subdomain variants of the target's domain."""
-    parsed = urlparse(target_url)
+    parsed = canonical_url(target_url)
     host = parsed.hostname or ""
     scheme = parsed.scheme
 
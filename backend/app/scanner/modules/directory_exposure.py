@@ -4,13 +4,14 @@ from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.signatures import SignatureSet
 
-DIRECTORY_INDICATORS = [
+DIRECTORY_INDICATORS = SignatureSet.from_literals([
     "Index of /",
     "Directory listing for",
     "<title>Directory listing",
     "Parent Directory</a>",
-]
+])
 
 COMMON_DIRS = [
     "/backup/", "/backups/", "/tmp/", "/temp/",
@@ -29,25 +30,24 @@ class DirectoryExposureModule(BaseModule):
 
     def detect(self, page: CrawledPage) -> list[Finding]:
         findings: list[Finding] = []
-        for indicator in DIRECTORY_INDICATORS:
-            if indicator.lower() in page.body.lower():
-                findings.append(Finding(
-                    module_name=self.name,
-                    vuln_type="Directory Listing Enabled",
-                    severity="medium",
-                    cvss_score=5.3,
-                    cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:N/A:N",
-                    owasp_category="A05",
-                    cwe_id="CWE-548",
-                    affected_url=page.url,
-                    affected_parameter=None,
-                    description="Directory listing is enabled, exposing file structure to attackers.",
-                    remediation="Disable directory listing in web server configuration.",
-                    confidence="confirmed",
-                    evidence=[{"type": "response", "title": "Directory Listing Indicator",
-                               "content": indicator}],
-                ))
-                break
+        match = DIRECTORY_INDICATORS.search(page.body, lowered=page.analysis.body_lower)
+        if match:
+            findings.append(Finding(
+                module_name=self.name,
+                vuln_type="Directory Listing Enabled",
+                severity="medium",
+                cvss_score=5.3,
+                cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:L/I:N/A:N",
+                owasp_category="A05",
+                cwe_id="CWE-548",
+                affected_url=page.url,
+                affected_parameter=None,
+                description="Directory listing is enabled, exposing file structure to attackers.",
+                remediation="Disable directory listing in web server configuration.",
+                confidence="confirmed",
+                evidence=[{"type": "response", "title": "Directory Listing Indicator",
+                           "content": match.label}],
+            ))
         return findings
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
@@ -62,8 +62,7 @@ class DirectoryExposureModule(BaseModule):
                 continue
 
             if response.status_code == 200:
-                body = response.text.lower()
-                if any(ind.lower() in body for ind in DIRECTORY_INDICATORS):
+                if DIRECTORY_INDICATORS.search(response.text):
                     findings.append(Finding(
                         module_name=self.name,
                         vuln_type="Exposed Directory",
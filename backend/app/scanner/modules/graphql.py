@@ -1,12 +1,13 @@
 """GraphQL misconfiguration and introspection scanner module."""
 import json
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urljoin
 
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 # Common GraphQL endpoint paths to probe
 GRAPHQL_PATHS = [
@@ -45,7 +46,7 @@ class GraphQLModule(BaseModule):
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
+        parsed = canonical_url(page.url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
 
         probed: set[str] = set()
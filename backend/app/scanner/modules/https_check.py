@@ -1,8 +1,7 @@
-from urllib.parse import urlparse
-
 from app.scanner.crawler import CrawledPage
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 
 @ModuleRegistry.register
@@ -14,7 +13,7 @@ class HttpsCheckModule(BaseModule):
 
     def detect(self, page: CrawledPage) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
+        parsed = canonical_url(page.url)
 
         if parsed.scheme == "http":
             findings.append(Finding(
@@ -34,17 +33,7 @@ class HttpsCheckModule(BaseModule):
 
         # Check for mixed content
         if parsed.scheme == "https":
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(page.body, "lxml")
-            mixed = []
-            for tag in soup.find_all(["script", "link", "img", "iframe"], src=True):
-                src = tag.get("src", "")
-                if src.startswith("http://"):
-                    mixed.append(src)
-            for tag in soup.find_all("link", href=True):
-                href = tag.get("href", "")
-                if href.startswith("http://"):
-                    mixed.append(href)
+            mixed = [src for src in page.analysis.subresources if src.startswith("http://")]
 
             if mixed:
                 findings.append(Finding(
@@ -1,7 +1,7 @@
 import re
-from urllib.parse import urlparse
 
 from app.scanner.crawler import CrawledPage
+from app.scanner.fingerprint import content_hash
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
@@ -26,6 +26,7 @@ class IdorModule(BaseModule):
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
         url = page.url
+        original = None
 
         for pattern in ID_PATTERNS:
             match = pattern.search(url)
@@ -40,17 +41,22 @@ class IdorModule(BaseModule):
 
             test_url = url[:match.start(1)] + test_id + url[match.end(1):]
 
+            # The original page is the shared baseline, fetched once however many patterns match
+            original = original or await self.baseline(http_client, url)
+            if original is None:
+                break
             try:
-                original_resp = await http_client.get(url)
                 test_resp = await http_client.get(test_url)
             except Exception:
                 continue
 
-            # If incrementing ID returns 200 with different content, possible IDOR
+            # If incrementing ID returns 200 with different content (beyond timestamps,
+            # tokens and other dynamic regions), possible IDOR
             if (test_resp.status_code == 200
-                    and original_resp.status_code == 200
+                    and original.status_code == 200
                     and len(test_resp.text) > 100
-                    and test_resp.text != original_resp.text):
+                    and content_hash(test_resp.text) != original.content_hash
+                    and await self.responses_differ(http_client, url, test_resp.text)):
                 findings.append(Finding(
                     module_name=self.name,
                     vuln_type="Potential IDOR",
@@ -68,7 +74,9 @@ class IdorModule(BaseModule):
                         {"type": "request", "title": "Original URL", "content": url},
                         {"type": "request", "title": "Manipulated URL", "content": test_url},
                         {"type": "log", "title": "Response Sizes",
-                         "content": f"Original: {len(original_resp.text)} bytes\nModified: {len(test_resp.text)} bytes"},
+                         "content": f"Original: {original.length} bytes\nModified: {len(test_resp.text)} bytes"},
+                        {"type": "log", "title": "Token Similarity",
+                         "content": f"{original.profile.similarity(test_resp.text):.2f}"},
                     ],
                 ))
                 break
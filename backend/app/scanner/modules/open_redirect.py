@@ -1,9 +1,8 @@
-from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
-
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 REDIRECT_PARAMS = ["url", "redirect", "next", "return", "returnTo", "goto", "target", "redir", "destination", "continue"]
 REDIRECT_PAYLOADS = [
@@ -22,21 +21,16 @@ class OpenRedirectModule(BaseModule):
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
-        query_params = parse_qs(parsed.query)
+        parsed = canonical_url(page.url)
+        query_params = parsed.query_params
 
         # Test URL query parameters
-        for param_name in query_params:
-            if param_name.lower() not in [p.lower() for p in REDIRECT_PARAMS]:
-                continue
-
+        redirect_names = {p.lower() for p in REDIRECT_PARAMS}
+        for param_name in self.untested_params(parsed, [p for p in query_params if p.lower() in redirect_names]):
             for payload in REDIRECT_PAYLOADS:
                 test_params = {**{k: v[0] for k, v in query_params.items()}}
                 test_params[param_name] = payload
-                test_url = urlunparse((
-                    parsed.scheme, parsed.netloc, parsed.path,
-                    "", urlencode(test_params), "",
-                ))
+                test_url = parsed.with_query(test_params)
 
                 try:
                     response = await http_client.client.request(
@@ -47,7 +41,7 @@ class OpenRedirectModule(BaseModule):
 
                 location = response.headers.get("location", "")
                 if response.status_code in (301, 302, 303, 307, 308):
-                    loc_host = urlparse(location).hostname or ""
+                    loc_host = canonical_url(location).hostname
                     if "evil.com" in loc_host:
                         findings.append(Finding(
                             module_name=self.name,
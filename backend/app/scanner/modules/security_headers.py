@@ -1,3 +1,4 @@
+from app.scanner.aggregation import FingerprintMemo, header_fingerprint
 from app.scanner.crawler import CrawledPage
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
@@ -56,6 +57,9 @@ RECOMMENDED_HEADERS = {
 
 INFO_DISCLOSURE_HEADERS = ["Server", "X-Powered-By", "X-AspNet-Version"]
 
+# Every header this module looks at; the rest of the response headers don't affect its findings
+EVALUATED_HEADERS = [name.lower() for name in [*RECOMMENDED_HEADERS, *INFO_DISCLOSURE_HEADERS]]
+
 
 @ModuleRegistry.register
 class SecurityHeadersModule(BaseModule):
@@ -64,9 +68,19 @@ class SecurityHeadersModule(BaseModule):
     scan_modes = ["quick", "full"]
     is_active = False
 
+    def __init__(self):
+        self._memo = FingerprintMemo()
+
     def detect(self, page: CrawledPage) -> list[Finding]:
+        headers_lower = page.analysis.headers_lower
+        evaluated = {name: headers_lower[name] for name in EVALUATED_HEADERS if name in headers_lower}
+        return self._memo.findings_for(
+            header_fingerprint(evaluated.items()), page.url, lambda: self._evaluate(page.url, evaluated),
+        )
+
+    def _evaluate(self, url: str, headers_lower: dict[str, str]) -> list[Finding]:
         findings: list[Finding] = []
-        headers_lower = {k.lower(): v for k, v in page.headers.items()}
+        header_dump = "\n".join(f"{k}: {v}" for k, v in headers_lower.items()) or "(none of the checked headers)"
 
         # Check missing recommended headers
         for header_name, info in RECOMMENDED_HEADERS.items():
@@ -79,15 +93,16 @@ class SecurityHeadersModule(BaseModule):
                     cvss_vector=info["cvss_vector"],
                     owasp_category="A05",
                     cwe_id=info["cwe_id"],
-                    affected_url=page.url,
+                    affected_url=url,
                     affected_parameter=None,
                     description=f"The HTTP response is missing the '{header_name}' security header.",
                     remediation=info["remediation"],
                     confidence="confirmed",
+                    fingerprint=header_fingerprint([(header_name.lower(), "")]),
                     evidence=[{
                         "type": "response",
-                        "title": "Response Headers",
-                        "content": "\n".join(f"{k}: {v}" for k, v in page.headers.items()),
+                        "title": "Security-Relevant Response Headers",
+                        "content": header_dump,
                     }],
                 ))
 
@@ -102,11 +117,12 @@ class SecurityHeadersModule(BaseModule):
                     cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:N/I:N/A:N",
                     owasp_category="A05",
                     cwe_id="CWE-200",
-                    affected_url=page.url,
+                    affected_url=url,
                     affected_parameter=None,
                     description=f"The '{header_name}' header discloses server information: {headers_lower[header_name.lower()]}",
                     remediation=f"Remove or suppress the '{header_name}' header in production.",
                     confidence="confirmed",
+                    fingerprint=header_fingerprint([(header_name.lower(), headers_lower[header_name.lower()])]),
                     evidence=[{
                         "type": "response",
                         "title": f"{header_name} Value",
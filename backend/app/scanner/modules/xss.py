@@ -1,12 +1,13 @@
 """XSS scanner module — 40+ payloads with context-aware detection."""
 import html
 import re
-from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
 
+from app.scanner.batching import Sender
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.urls import canonical_url
 
 # Unique canary strings for unambiguous reflection detection
 XSS_CANARY = "scntm7x5s"
@@ -44,7 +45,7 @@ JS_CONTEXT_PAYLOADS = [
     f'";{XSS_CANARY}()//',
     f"`);{XSS_CANARY}()//",
     f"</script><script>{XSS_CANARY}()</script>",
-    f"'};{XSS_CANARY}()//",
+    f"'}};{XSS_CANARY}()//",
 ]
 
 # Group 4: URL context (href/src attributes)
@@ -110,23 +111,66 @@ def _is_reflection_unencoded(body: str, payload: str, canary: str) -> bool:
     return True
 
 
-def _detect_context(page_html: str, param_value: str) -> str:
-    """Guess which context the parameter value is reflected in."""
-    if not param_value:
-        return "html"
-    idx = page_html.find(param_value)
-    if idx == -1:
-        return "html"
-    before = page_html[max(0, idx - 200):idx]
-    if re.search(r'<script[^>]*>', before, re.I) and not re.search(r'</script>', before, re.I):
-        return "js"
-    attr_match = re.search(r'<\w+[^>]*\s[\w-]+=["\']$', before)
-    if attr_match:
+# ── Reflection pre-flight ────────────────────────────────────────────────────
+# Harmless per-parameter canary ("scntmrf3x"); letters and digits survive any filter
+REFLECTION_CANARY = "scntmrf"
+
+# Markup tokens a reflection can land in; anything outside them is HTML text
+MARKUP_TOKEN = re.compile(
+    r"<!--.*?(?:-->|$)"
+    r"|<(script|style|textarea|title)\b[^>]*>.*?(?:</\1\s*>|$)"
+    r"|<[a-zA-Z][^>]*>?",
+    re.I | re.S,
+)
+TAG_NAME = re.compile(r"<[^\s>/]*")
+TAG_ATTR = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+))?""")
+URL_ATTRS = {"href", "src", "action", "formaction", "data", "poster", "srcdoc"}
+RAWTEXT_ELEMENTS = {"style", "textarea", "title"}
+
+
+def _tag_context(tag: str, canary: str) -> str:
+    """Context of a canary inside an opening tag."""
+    for match in TAG_ATTR.finditer(tag, TAG_NAME.match(tag).end()):
+        if canary not in match.group(0):
+            continue
+        name, _, value = match.group(0).partition("=")
+        name = name.strip().lower()
+        if not value or canary in name:
+            return "attr"  # reflected as an attribute name: same breakout as a value
+        value = value.strip().strip("\"'")
+        if name.startswith("on"):
+            return "js"
+        if name in URL_ATTRS and value.startswith(canary):
+            return "url"
         return "attr"
-    href_match = re.search(r'href=|src=|action=', before[-50:], re.I)
-    if href_match:
-        return "url"
-    return "html"
+    return "html"  # canary in the tag name
+
+
+def reflection_contexts(body: str, canary: str) -> list[str]:
+    """Contexts ``canary`` is reflected in, in document order (empty if not reflected).
+
+    One pass of a regex tokenizer over comments, raw-text elements and tags.
+    For ``<style>``, ``<textarea>`` and ``<title>`` the context is the element
+    name, since a payload has to close that element first.
+    """
+    contexts: list[str] = []
+    tokens = MARKUP_TOKEN.finditer(body)
+    token = next(tokens, None)
+    pos = body.find(canary)
+    while pos != -1:
+        while token and token.end() <= pos:
+            token = next(tokens, None)
+        if token is None or token.start() > pos:
+            contexts.append("html")
+        elif token.group(0).startswith("<!--"):
+            contexts.append("comment")
+        elif token.group(1):
+            element = token.group(1).lower()
+            contexts.append("js" if element == "script" else element)
+        else:
+            contexts.append(_tag_context(token.group(0), canary))
+        pos = body.find(canary, pos + len(canary))
+    return list(dict.fromkeys(contexts))
 
 
 @ModuleRegistry.register
@@ -138,69 +182,40 @@ class XssModule(BaseModule):
 
     async def active_test_async(self, page: CrawledPage, http_client: HttpClient) -> list[Finding]:
         findings: list[Finding] = []
-        parsed = urlparse(page.url)
-        query_params = parse_qs(parsed.query)
+        parsed = canonical_url(page.url)
         is_full = True  # orchestrator decides mode; treat as full unless overridden
 
-        # Fetch baseline to detect reflected params
-        try:
-            baseline = await http_client.get(page.url)
-            baseline_text = baseline.text
-        except Exception:
-            baseline_text = ""
+        # Baseline for the DOM-sink heuristic
+        baseline = await self.baseline(http_client, page.url)
+        baseline_text = baseline.text if baseline is not None else ""
 
         # ── Test query parameters ─────────────────────────────────────────────
-        for param_name, param_values in query_params.items():
-            original_value = param_values[0]
-            # Determine injection context
-            ctx = _detect_context(baseline_text, original_value)
-            payloads = self._select_payloads(ctx, is_full)
-
-            for payload in payloads:
-                test_params = {k: v[0] for k, v in query_params.items()}
-                test_params[param_name] = payload
-                test_url = urlunparse((
-                    parsed.scheme, parsed.netloc, parsed.path, "", urlencode(test_params), "",
+        send = self.url_sender(http_client, parsed)
+        for index, param_name in enumerate(self.untested_params(parsed)):
+            hit = await self._test_reflected(send, param_name, index, is_full)
+            if hit:
+                ctx, payload, response, test_url = hit
+                findings.append(self._make_finding(
+                    vuln_type=f"Reflected XSS ({ctx.upper()} context)",
+                    url=page.url,
+                    param=param_name,
+                    payload=payload,
+                    test_url=test_url,
+                    body=response.text,
                 ))
-                try:
-                    response = await http_client.get(test_url)
-                except Exception:
-                    continue
-
-                if _is_reflection_unencoded(response.text, payload, XSS_CANARY):
-                    findings.append(self._make_finding(
-                        vuln_type=f"Reflected XSS ({ctx.upper()} context)",
-                        url=page.url,
-                        param=param_name,
-                        payload=payload,
-                        test_url=test_url,
-                        body=response.text,
-                    ))
-                    break  # One confirmed finding per parameter is sufficient
 
         # ── Test form inputs ──────────────────────────────────────────────────
         for form in page.forms:
-            for inp in form.inputs:
-                if not inp.get("name"):
-                    continue
-                payload = HTML_CONTEXT_PAYLOADS[0]
-                data = {i["name"]: i.get("value", "test") for i in form.inputs if i.get("name")}
-                data[inp["name"]] = payload
-
-                try:
-                    if form.method == "POST":
-                        response = await http_client.post(form.action, data=data)
-                    else:
-                        test_url = f"{form.action}?{urlencode(data)}"
-                        response = await http_client.get(test_url)
-                except Exception:
-                    continue
-
-                if _is_reflection_unencoded(response.text, payload, XSS_CANARY):
+            send = self.form_sender(http_client, form)
+            names = self.untested_fields(form)
+            for index, name in enumerate(names):
+                hit = await self._test_reflected(send, name, index, is_full)
+                if hit:
+                    _, payload, response, _ = hit
                     findings.append(self._make_finding(
                         vuln_type="Reflected XSS (Form input)",
                         url=form.action,
-                        param=inp["name"],
+                        param=name,
                         payload=payload,
                         test_url=form.action,
                         body=response.text,
@@ -214,16 +229,41 @@ class XssModule(BaseModule):
 
         return findings
 
+    async def _test_reflected(self, send: Sender, param: str, index: int, is_full: bool):
+        """(context, payload, response, url) of the first payload that lands unencoded, or None.
+
+        A harmless canary goes first: a parameter that isn't reflected costs one
+        request, and a reflected one only gets the payloads for its contexts.
+        """
+        canary = f"{REFLECTION_CANARY}{index}x"
+        try:
+            response, _ = await send({param: canary})
+        except Exception:
+            return None
+        for ctx in reflection_contexts(response.text, canary):
+            for payload in self._select_payloads(ctx, is_full):
+                try:
+                    response, test_url = await send({param: payload})
+                except Exception:
+                    continue
+                if _is_reflection_unencoded(response.text, payload, XSS_CANARY):
+                    return ctx, payload, response, test_url
+        return None
+
     def _select_payloads(self, context: str, is_full: bool) -> list[str]:
         if not is_full:
             return QUICK_PAYLOADS
         if context == "js":
-            return JS_CONTEXT_PAYLOADS + HTML_CONTEXT_PAYLOADS[:3] + WAF_BYPASS_PAYLOADS[:3]
+            return JS_CONTEXT_PAYLOADS + TEMPLATE_PAYLOADS
         if context == "attr":
-            return ATTR_CONTEXT_PAYLOADS + HTML_CONTEXT_PAYLOADS[:3] + WAF_BYPASS_PAYLOADS[:3]
+            return ATTR_CONTEXT_PAYLOADS
         if context == "url":
-            return URL_CONTEXT_PAYLOADS + HTML_CONTEXT_PAYLOADS[:3]
-        return HTML_CONTEXT_PAYLOADS + ATTR_CONTEXT_PAYLOADS[:3] + WAF_BYPASS_PAYLOADS[:4]
+            return URL_CONTEXT_PAYLOADS + ATTR_CONTEXT_PAYLOADS[:2]
+        if context == "comment":
+            return [f"-->{p}" for p in HTML_CONTEXT_PAYLOADS[:3]]
+        if context in RAWTEXT_ELEMENTS:
+            return [f"</{context}>{p}" for p in HTML_CONTEXT_PAYLOADS[:3]]
+        return HTML_CONTEXT_PAYLOADS + WAF_BYPASS_PAYLOADS[:4]
 
     def _make_finding(self, vuln_type, url, param, payload, test_url, body) -> Finding:
         return Finding(
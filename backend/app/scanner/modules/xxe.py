@@ -1,11 +1,10 @@
 """XML External Entity (XXE) injection scanner module."""
-import re
-from urllib.parse import urlparse
-
 from app.scanner.crawler import CrawledPage
 from app.scanner.http_client import HttpClient
 from app.scanner.modules.base import BaseModule, Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.signatures import Signature, SignatureSet
+from app.scanner.urls import canonical_url
 
 # XXE payloads targeting common sensitive files
 XXE_PAYLOADS = [
@@ -39,13 +38,13 @@ XXE_PAYLOADS = [
     ),
 ]
 
-XXE_INDICATORS = [
-    re.compile(r"root:.*:/bin/", re.I),
-    re.compile(r"\[extensions\]"),
-    re.compile(r"for 16-bit app support"),
-    re.compile(r"127\.0\.0\.1\s+localhost"),
-    re.compile(r"daemon:.*:/usr/sbin", re.I),
-]
+XXE_INDICATORS = SignatureSet([
+    Signature(r"root:.*:/bin/"),
+    Signature(r"\[extensions\]", flags=0),
+    Signature(r"for 16-bit app support", flags=0),
+    Signature(r"127\.0\.0\.1\s+localhost", flags=0),
+    Signature(r"daemon:.*:/usr/sbin"),
+])
 
 XML_CONTENT_TYPES = ["application/xml", "text/xml", "application/json+xml"]
 
@@ -71,7 +70,7 @@ class XxeModule(BaseModule):
                 break
 
         # Test JSON API endpoints that might also accept XML (content-type confusion)
-        parsed = urlparse(page.url)
+        parsed = canonical_url(page.url)
         if any(seg in parsed.path.lower() for seg in ["/api/", "/soap/", "/xml/", "/upload", "/import", "/parse"]):
             finding = await self._test_endpoint_xxe(page.url, http_client)
             if finding:
@@ -100,30 +99,30 @@ class XxeModule(BaseModule):
             except Exception:
                 continue
 
-            for indicator in XXE_INDICATORS:
-                if indicator.search(response.text):
-                    return Finding(
-                        module_name=self.name,
-                        vuln_type="XML External Entity (XXE) Injection",
-                        severity="critical",
-                        cvss_score=9.1,
-                        cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:L/A:L",
-                        owasp_category="A05",
-                        cwe_id="CWE-611",
-                        affected_url=form.action,
-                        affected_parameter=None,
-                        description=f"XXE injection via {label}. The server parsed external XML entities and disclosed file contents.",
-                        remediation=(
-                            "Disable external entity processing in the XML parser. "
-                            "Use SAX parsers with FEATURE_EXTERNAL_GENERAL_ENTITIES=false. "
-                            "Never parse untrusted XML with a permissive parser."
-                        ),
-                        confidence="confirmed",
-                        evidence=[
-                            {"type": "payload", "title": "XXE Payload", "content": payload[:200]},
-                            {"type": "response", "title": "File Content Disclosed", "content": self._extract_match(response.text, indicator)},
-                        ],
-                    )
+            match = XXE_INDICATORS.search(response.text)
+            if match:
+                return Finding(
+                    module_name=self.name,
+                    vuln_type="XML External Entity (XXE) Injection",
+                    severity="critical",
+                    cvss_score=9.1,
+                    cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:L/A:L",
+                    owasp_category="A05",
+                    cwe_id="CWE-611",
+                    affected_url=form.action,
+                    affected_parameter=None,
+                    description=f"XXE injection via {label}. The server parsed external XML entities and disclosed file contents.",
+                    remediation=(
+                        "Disable external entity processing in the XML parser. "
+                        "Use SAX parsers with FEATURE_EXTERNAL_GENERAL_ENTITIES=false. "
+                        "Never parse untrusted XML with a permissive parser."
+                    ),
+                    confidence="confirmed",
+                    evidence=[
+                        {"type": "payload", "title": "XXE Payload", "content": payload[:200]},
+                        {"type": "response", "title": "File Content Disclosed", "content": match.excerpt(response.text, 120)},
+                    ],
+                )
         return None
 
     async def _test_endpoint_xxe(self, url: str, http_client: HttpClient) -> Finding | None:
@@ -137,33 +136,24 @@ class XxeModule(BaseModule):
             except Exception:
                 continue
 
-            for indicator in XXE_INDICATORS:
-                if indicator.search(response.text):
-                    return Finding(
-                        module_name=self.name,
-                        vuln_type="XML External Entity (XXE) Injection",
-                        severity="critical",
-                        cvss_score=9.1,
-                        cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:L/A:L",
-                        owasp_category="A05",
-                        cwe_id="CWE-611",
-                        affected_url=url,
-                        affected_parameter=None,
-                        description=f"XXE injection via {label} at XML-accepting endpoint.",
-                        remediation="Disable external entity processing. Validate and sanitize all XML input.",
-                        confidence="confirmed",
-                        evidence=[
-                            {"type": "payload", "title": "XXE Payload", "content": payload[:200]},
-                            {"type": "response", "title": "File Content Disclosed", "content": self._extract_match(response.text, indicator)},
-                        ],
-                    )
+            match = XXE_INDICATORS.search(response.text)
+            if match:
+                return Finding(
+                    module_name=self.name,
+                    vuln_type="XML External Entity (XXE) Injection",
+                    severity="critical",
+                    cvss_score=9.1,
+                    cvss_vector="CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:L/A:L",
+                    owasp_category="A05",
+                    cwe_id="CWE-611",
+                    affected_url=url,
+                    affected_parameter=None,
+                    description=f"XXE injection via {label} at XML-accepting endpoint.",
+                    remediation="Disable external entity processing. Validate and sanitize all XML input.",
+                    confidence="confirmed",
+                    evidence=[
+                        {"type": "payload", "title": "XXE Payload", "content": payload[:200]},
+                        {"type": "response", "title": "File Content Disclosed", "content": match.excerpt(response.text, 120)},
+                    ],
+                )
         return None
-
-    @staticmethod
-    def _extract_match(text: str, pattern: re.Pattern, context: int = 120) -> str:
-        m = pattern.search(text)
-        if not m:
-            return ""
-        start = max(0, m.start() - context)
-        end = min(len(text), m.end() + context)
-        return f"...{text[start:end]}..."
@@ -0,0 +1,277 @@
+"""OpenAPI 2/3 ingestion: turn a discovered or uploaded spec into testable insertion points."""
+import json
+import logging
+from dataclasses import dataclass, field
+from urllib.parse import quote, urlencode, urljoin
+
+from app.scanner.crawler import CrawledPage
+from app.scanner.http_client import HttpClient
+from app.scanner.page_analysis import FormData
+from app.scanner.scope import ScopeValidator
+from app.scanner.url_templates import url_template
+
+logger = logging.getLogger(__name__)
+
+# Well-known spec locations, probed in order until one parses
+SPEC_PATHS_QUICK = ["/openapi.json", "/swagger.json", "/v3/api-docs", "/v2/api-docs"]
+SPEC_PATHS_FULL = SPEC_PATHS_QUICK + [
+    "/api/openapi.json", "/api/swagger.json", "/swagger/v1/swagger.json", "/api-docs",
+    "/openapi.yaml", "/swagger.yaml", "/api/v1/openapi.json", "/docs/openapi.json",
+]
+# DELETE operations are never synthesized: injecting into them can destroy data
+HTTP_METHODS = ("get", "post", "put", "patch")
+MAX_REF_DEPTH = 8
+JSON_CONTENT_TYPE = "application/json"
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+EXAMPLE_BY_FORMAT = {
+    "uuid": "00000000-0000-4000-8000-000000000001",
+    "date": "2024-01-01",
+    "date-time": "2024-01-01T00:00:00Z",
+    "email": "test@example.com",
+    "uri": "https://example.com/",
+    "url": "https://example.com/",
+}
+EXAMPLE_BY_TYPE = {"integer": 1, "number": 1, "boolean": True, "string": "test"}
+
+
+@dataclass
+class ApiOperation:
+    method: str
+    path: str  # server-relative template, e.g. /users/{id}
+    base_url: str
+    path_params: list[dict] = field(default_factory=list)
+    query_params: list[dict] = field(default_factory=list)
+    body_fields: list[dict] = field(default_factory=list)
+    body_type: str = JSON_CONTENT_TYPE
+
+
+def load_spec(text: str) -> dict | None:
+    """Parse a JSON or YAML document; returns None unless it looks like an OpenAPI/Swagger spec."""
+    try:
+        spec = json.loads(text)
+    except ValueError:
+        try:
+            import yaml
+        except ImportError:
+            logger.info("PyYAML not installed; YAML OpenAPI specs are skipped")
+            return None
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError:
+            return None
+    if not isinstance(spec, dict) or not isinstance(spec.get("paths"), dict):
+        return None
+    if "openapi" not in spec and "swagger" not in spec:
+        return None
+    return spec
+
+
+def _as_list(value) -> list:
+    """``value`` if it is a list; malformed specs get an empty one instead."""
+    return value if isinstance(value, list) else []
+
+
+def _as_dict(value) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _resolve(spec: dict, node, depth: int = 0):
+    """Follow local ``$ref`` pointers (``#/components/...``, ``#/definitions/...``)."""
+    while isinstance(node, dict) and "$ref" in node and depth < MAX_REF_DEPTH:
+        ref = node["$ref"]
+        if not isinstance(ref, str) or not ref.startswith("#/"):
+            return {}
+        target = spec
+        for part in ref[2:].split("/"):
+            target = target.get(part.replace("~1", "/").replace("~0", "~"), {}) if isinstance(target, dict) else {}
+        node = target
+        depth += 1
+    return node if isinstance(node, dict) else {}
+
+
+def example_value(spec: dict, schema: dict):
+    schema = _resolve(spec, schema)
+    for key in ("example", "default"):
+        if key in schema and not isinstance(schema[key], (dict, list)):
+            return schema[key]
+    enum = _as_list(schema.get("enum"))
+    if enum and not isinstance(enum[0], (dict, list)):
+        return enum[0]
+    schema_format = schema.get("format")
+    if isinstance(schema_format, str) and schema_format in EXAMPLE_BY_FORMAT:
+        return EXAMPLE_BY_FORMAT[schema_format]
+    schema_type = schema.get("type", "string")
+    return EXAMPLE_BY_TYPE.get(schema_type, "test") if isinstance(schema_type, str) else "test"
+
+
+def _schema_fields(spec: dict, schema: dict) -> list[dict]:
+    """Top-level scalar properties of an object schema as insertion points."""
+    schema = _resolve(spec, schema)
+    fields = []
+    for name, prop in _as_dict(schema.get("properties")).items():
+        prop = _resolve(spec, prop)
+        prop_type = prop.get("type", "string")
+        if not isinstance(prop_type, str) or prop_type in ("object", "array") or prop.get("readOnly"):
+            continue
+        fields.append({"name": str(name), "type": prop_type, "value": example_value(spec, prop)})
+    return fields
+
+
+def _param_entry(spec: dict, param: dict) -> dict:
+    # v3 nests the schema; v2 inlines type/format
+    schema = _resolve(spec, param["schema"]) if isinstance(param.get("schema"), dict) else param
+    schema_type = schema.get("type", "string")
+    return {
+        "name": param["name"],
+        "type": schema_type if isinstance(schema_type, str) else "string",
+        "value": example_value(spec, schema),
+    }
+
+
+def _base_urls(spec: dict, spec_url: str) -> list[str]:
+    if "swagger" in spec:
+        host = spec.get("host")
+        base_path = spec.get("basePath", "/")
+        if not isinstance(base_path, str):
+            base_path = "/"
+        if isinstance(host, str) and host:
+            schemes = [scheme for scheme in _as_list(spec.get("schemes")) if isinstance(scheme, str)]
+            return [f"{scheme}://{host}{base_path}" for scheme in (schemes or [spec_url.split(":", 1)[0]])[:1]]
+        return [urljoin(spec_url, base_path)]
+    servers = [s.get("url") for s in _as_list(spec.get("servers")) if isinstance(s, dict)]
+    return [urljoin(spec_url, url) for url in [url for url in servers if isinstance(url, str)] or ["/"]]
+
+
+def parse_operations(spec: dict, spec_url: str) -> list[ApiOperation]:
+    """Operations of ``spec``; malformed nodes (as in a hostile discovered spec) are skipped."""
+    operations: list[ApiOperation] = []
+    base_url = _base_urls(spec, spec_url)[0]
+    for path, item in spec["paths"].items():
+        if not isinstance(path, str):
+            continue
+        item = _resolve(spec, item)
+        shared = _as_list(item.get("parameters"))
+        for method in HTTP_METHODS:
+            op = item.get(method)
+            if not isinstance(op, dict):
+                continue
+            operation = ApiOperation(method=method.upper(), path=path, base_url=base_url)
+            for param in shared + _as_list(op.get("parameters")):
+                param = _resolve(spec, param)
+                if not isinstance(param.get("name"), str) or not param["name"]:
+                    continue
+                location = param.get("in")
+                if location == "path":
+                    operation.path_params.append(_param_entry(spec, param))
+                elif location == "query":
+                    operation.query_params.append(_param_entry(spec, param))
+                elif location == "body":  # Swagger 2
+                    operation.body_fields.extend(_schema_fields(spec, param.get("schema")))
+                elif location == "formData":  # Swagger 2
+                    operation.body_fields.append(_param_entry(spec, param))
+                    operation.body_type = FORM_CONTENT_TYPE
+            content = _as_dict(_resolve(spec, op.get("requestBody")).get("content"))
+            for content_type in (JSON_CONTENT_TYPE, FORM_CONTENT_TYPE):
+                if isinstance(content.get(content_type), dict):
+                    operation.body_fields.extend(_schema_fields(spec, content[content_type].get("schema")))
+                    operation.body_type = content_type
+                    break
+            operations.append(operation)
+    return operations
+
+
+def operation_pages(operations: list[ApiOperation], scope: ScopeValidator) -> list[CrawledPage]:
+    """Synthetic pages whose URL and form carry the operation's insertion points.
+
+    Query parameters of GET operations go in the page URL, where the URL-based
+    module tests pick them up. Path parameters and body fields become inputs
+    of a form whose action is the URL template.
+    """
+    pages: list[CrawledPage] = []
+    for op in operations:
+        action = op.base_url.rstrip("/") + "/" + op.path.lstrip("/")
+        concrete = action
+        for param in op.path_params:
+            concrete = concrete.replace(f"{{{param['name']}}}", quote(str(param["value"]), safe=""))
+        query = urlencode({p["name"]: p["value"] for p in op.query_params})
+        url = f"{concrete}?{query}" if query and op.method == "GET" else concrete
+        if not scope.is_in_scope(concrete):
+            continue
+
+        inputs = [{**p, "in": "path"} for p in op.path_params]
+        if op.method != "GET":
+            inputs += [{**p, "in": "query"} for p in op.query_params]
+        inputs += [{**f, "in": "body"} for f in op.body_fields]
+        forms = [FormData(action=action, method=op.method, inputs=inputs, enctype=op.body_type)] if inputs else []
+
+        pages.append(CrawledPage(
+            url=url,
+            status_code=0,
+            headers={},
+            body="",
+            forms=forms,
+            template=f"{op.method} {url_template(url)}",
+            synthetic=True,
+        ))
+    return pages
+
+
+async def discover_spec(
+    http_client: HttpClient, base_url: str, paths: list[str]
+) -> tuple[dict, str] | None:
+    """Probe well-known locations; returns the first parsable spec and its URL."""
+    for path in paths:
+        spec_url = urljoin(base_url, path)
+        try:
+            response = await http_client.get(spec_url)
+        except Exception:
+            continue
+        if response.status_code != 200:
+            continue
+        spec = load_spec(response.text)
+        if spec is not None:
+            return spec, spec_url
+    return None
+
+
+async def ingest_openapi(
+    http_client: HttpClient,
+    scope: ScopeValidator,
+    target_url: str,
+    config: dict | None,
+    discover_paths: list[str],
+    max_operations: int = 500,
+) -> list[CrawledPage]:
+    """Synthetic pages for every in-scope API operation.
+
+    ``config["openapi_spec"]`` (a dict or JSON/YAML text) or
+    ``config["openapi_url"]`` takes precedence over probing ``discover_paths``.
+    """
+    config = config or {}
+    base_url = urljoin(target_url, "/")
+    found: tuple[dict, str] | None = None
+
+    uploaded = config.get("openapi_spec")
+    if isinstance(uploaded, dict):
+        found = (uploaded, target_url) if isinstance(uploaded.get("paths"), dict) else None
+    elif isinstance(uploaded, str):
+        spec = load_spec(uploaded)
+        found = (spec, target_url) if spec is not None else None
+    elif config.get("openapi_url"):
+        found = await discover_spec(http_client, base_url, [config["openapi_url"]])
+    elif discover_paths:
+        found = await discover_spec(http_client, base_url, discover_paths)
+
+    if found is None:
+        return []
+    spec, spec_url = found
+    try:
+        operations = parse_operations(spec, spec_url)[:max_operations]
+        pages = operation_pages(operations, scope)
+    except Exception as e:
+        # A spec served by the target is untrusted input; a bad one must not fail the scan
+        logger.warning(f"Skipping unusable OpenAPI spec at {spec_url}: {e}")
+        return []
+    logger.info(f"OpenAPI spec at {spec_url}: {len(operations)} operation(s), {len(pages)} in scope")
+    return pages
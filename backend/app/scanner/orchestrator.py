@@ -1,24 +1,49 @@
 import json
 import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.models.page_state import PageState
 from app.models.result import Evidence, Vulnerability
 from app.models.scan import Scan
+from app.models.site_map import SiteMap
+from app.scanner.aggregation import aggregate_findings
+from app.scanner.baselines import BaselineService
+from app.scanner.budget import ModuleBudgets
 from app.scanner.crawler import (
     COMMON_SEED_PATHS_FULL,
     COMMON_SEED_PATHS_QUICK,
     AsyncCrawler,
     CrawledPage,
 )
+from app.scanner.fingerprint import collapse_duplicates
+from app.scanner.frontier import make_frontier
 from app.scanner.http_client import HttpClient
+from app.scanner.insertion_points import InsertionPointRegistry
+from app.scanner.link_scoring import LINK_SCORERS, default_link_score
 from app.scanner.modules.base import Finding
 from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.openapi import SPEC_PATHS_FULL, SPEC_PATHS_QUICK, ingest_openapi
+from app.scanner.page_analysis import HtmlParsePool
+from app.scanner.page_state import PageSnapshot, PageStateCache
+from app.scanner.passive import PassiveAnalysisStage, passive_module_names
+from app.scanner.page_store import PageStore
 from app.scanner.rate_limiter import CircuitBreaker, PerDomainThrottle
+from app.scanner.scheduler import HostScheduler
 from app.scanner.scope import ScopeValidator
+from app.scanner.site_map import (
+    SITE_MAP_FORMAT,
+    decode_site_map,
+    encode_site_map,
+    site_map_scope_key,
+    site_map_target_key,
+)
+from app.scanner.sitemap import SitemapSeeder
+from app.scanner.url_templates import TemplateQuota
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +68,7 @@ class ScanOrchestrator:
         self.scan_id = uuid.UUID(scan_id)
         self.db = db_session
         self.scan: Scan | None = None
+        self._page_state_rows: dict[str, PageState] = {}
 
     def run(self) -> None:
         """Main entry point for running a scan (called from Celery)."""
@@ -82,37 +108,130 @@ class ScanOrchestrator:
                 include_subdomains=(self.scan.config or {}).get("include_subdomains", False),
                 exclude_patterns=(self.scan.config or {}).get("exclude_patterns"),
             )
-            seed_paths = COMMON_SEED_PATHS_FULL if is_full else COMMON_SEED_PATHS_QUICK
-            crawler = AsyncCrawler(
-                http_client=http_client,
-                scope=scope,
-                max_depth=max_depth,
-                max_pages=max_pages,
-                concurrency=settings.SCANNER_CONCURRENCY,
-                extra_seed_urls=seed_paths,
+            page_store = (
+                PageStore(memory_limit=settings.SCANNER_PAGE_STORE_MEMORY_BYTES)
+                if settings.SCANNER_PAGE_STORE_MEMORY_BYTES >= 0 else None
             )
 
-            # Phase 1: Crawl
-            pages = await crawler.crawl(self.scan.target_url)
+            # Phase 1: Crawl, or reuse a recent site map of the same target and scope
+            reuse_minutes = int((self.scan.config or {}).get("reuse_crawl_minutes") or 0)
+            pages = self._load_site_map(reuse_minutes, max_depth, max_pages) if reuse_minutes > 0 else None
+            if pages is None:
+                pages = await self._crawl(http_client, throttle, scope, is_full, max_depth, max_pages, page_store)
+                if settings.SCANNER_SITE_MAP_KEEP > 0:
+                    self._save_site_map(pages, max_depth, max_pages)
+            elif page_store is not None:
+                for page in pages:
+                    page.offload(page_store)
+            if settings.SCANNER_DUPLICATE_SIMHASH_BITS >= 0:
+                primaries = collapse_duplicates(pages, settings.SCANNER_DUPLICATE_SIMHASH_BITS)
+                kept = {id(page) for page in primaries}
+                for page in pages:
+                    if id(page) not in kept:
+                        page.discard()  # folded into its primary; never scanned
+                pages = primaries
+
+            # API operations from an uploaded or discovered OpenAPI spec
+            spec_paths = (SPEC_PATHS_FULL if is_full else SPEC_PATHS_QUICK) if settings.SCANNER_OPENAPI_DISCOVERY else []
+            pages.extend(await ingest_openapi(
+                http_client, scope, self.scan.target_url, self.scan.config,
+                spec_paths, settings.SCANNER_OPENAPI_MAX_OPERATIONS,
+            ))
             self.scan.pages_found = len(pages)
             self._update_status("scanning", 30)
 
             # Phase 2: Run modules
             modules = ModuleRegistry.get_for_mode(self.scan.scan_mode)
+            # Each module attacks a site-wide form or parameter once, not once per page
+            insertion_points = InsertionPointRegistry() if settings.SCANNER_DEDUP_INSERTION_POINTS else None
+            # Reference responses are fetched once and shared by every module that diffs against them
+            baselines = BaselineService()
+            for module in modules:
+                module.insertion_points = insertion_points
+                module.baselines = baselines
+            # Wall-clock and request budgets per module invocation
+            budgets = ModuleBudgets(
+                timeout=settings.SCANNER_MODULE_TIMEOUT, max_requests=settings.SCANNER_MODULE_MAX_REQUESTS,
+                insertion_points=insertion_points,
+            )
+            # Passive checks run in a worker pool, off the event loop, when workers are configured
+            passive_stage = (
+                PassiveAnalysisStage(
+                    passive_module_names(modules),
+                    workers=settings.SCANNER_PASSIVE_WORKERS,
+                    batch_size=settings.SCANNER_PASSIVE_BATCH_SIZE,
+                    use_processes=settings.SCANNER_PASSIVE_USE_PROCESSES,
+                )
+                if settings.SCANNER_PASSIVE_WORKERS > 0 else None
+            )
             all_findings: list[Finding] = []
+            tested_templates: set[str] = set()
+
+            cancelled = False
 
-            for i, page in enumerate(pages):
-                if self._is_cancelled():
+            async def scan_one(page: CrawledPage) -> None:
+                nonlocal cancelled
+                if cancelled or self._is_cancelled():
+                    cancelled = True
                     return
 
-                page_findings = await self._scan_page(page, modules, http_client)
+                # Active probes run once per URL template; passive checks run on every page
+                run_active = True
+                if settings.SCANNER_ACTIVE_ONE_PER_TEMPLATE and page.template:
+                    run_active = page.template not in tested_templates
+                    tested_templates.add(page.template)
+
+                if passive_stage is not None:
+                    await passive_stage.submit(page)
+                page_findings = await self._scan_page(
+                    page, modules, http_client,
+                    run_active=run_active, run_passive=passive_stage is None, budgets=budgets,
+                )
                 all_findings.extend(page_findings)
+                # Every module and the passive stage (which copied it) are done with the page
+                page.discard()
 
-                self.scan.pages_scanned = i + 1
-                progress = 30 + int((i + 1) / max(len(pages), 1) * 60)
+                self.scan.pages_scanned += 1
+                progress = 30 + int(self.scan.pages_scanned / max(len(pages), 1) * 60)
                 self._update_status("scanning", min(progress, 90))
 
+            # Pages of different hosts are scanned in parallel, one page at a time per host
+            self.scan.pages_scanned = 0
+            scheduler = HostScheduler(
+                throttle if settings.SCANNER_HOST_INTERLEAVING else None,
+                concurrency=settings.SCANNER_CONCURRENCY if settings.SCANNER_HOST_INTERLEAVING else 1,
+            )
+            try:
+                await scheduler.run([(page.url, page) for page in pages], scan_one)
+                if passive_stage is not None:
+                    all_findings.extend(await passive_stage.drain())
+                    logger.info(
+                        f"Scan {self.scan_id}: passive checks on {passive_stage.pages} page(s) "
+                        f"in {passive_stage.batches} batch(es)"
+                    )
+            finally:
+                if passive_stage is not None:
+                    passive_stage.close()
+
+            if page_store is not None:
+                page_store.close()
+            logger.info(
+                f"Scan {self.scan_id}: {baselines.fetches} baseline request(s), {baselines.hits} reused"
+            )
+            self.scan.stats = {**(self.scan.stats or {}), "module_budgets": budgets.summary()}
+            if insertion_points is not None:
+                logger.info(
+                    f"Scan {self.scan_id}: {len(insertion_points)} insertion point(s) attacked, "
+                    f"{insertion_points.skipped} repeat(s) skipped, "
+                    f"{insertion_points.released} released by cut-off invocations"
+                )
+            if cancelled:
+                return
+
             # Phase 3: Deduplicate and persist
+            if settings.SCANNER_AGGREGATE_HEADER_FINDINGS:
+                # One finding per site-wide header problem, listing the pages it was seen on
+                all_findings = aggregate_findings(all_findings, settings.SCANNER_AGGREGATE_MAX_URLS)
             unique_findings = self._deduplicate(all_findings)
             self._persist_findings(unique_findings)
             self._update_status("completed", 100)
@@ -137,26 +256,189 @@ class ScanOrchestrator:
                 "error": str(e),
             })
 
+    async def _crawl(
+        self,
+        http_client: HttpClient,
+        throttle: PerDomainThrottle,
+        scope: ScopeValidator,
+        is_full: bool,
+        max_depth: int,
+        max_pages: int,
+        page_store: PageStore | None,
+    ) -> list[CrawledPage]:
+        seed_paths = COMMON_SEED_PATHS_FULL if is_full else COMMON_SEED_PATHS_QUICK
+        page_state = self._load_page_state() if settings.SCANNER_CONDITIONAL_RECRAWL else None
+        parse_pool = HtmlParsePool(
+            workers=settings.SCANNER_PARSE_WORKERS,
+            offload_threshold=settings.SCANNER_PARSE_OFFLOAD_BYTES,
+            use_processes=settings.SCANNER_PARSE_USE_PROCESSES,
+        )
+        crawler = AsyncCrawler(
+            http_client=http_client,
+            scope=scope,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            concurrency=settings.SCANNER_CONCURRENCY,
+            extra_seed_urls=seed_paths,
+            parse_pool=parse_pool,
+            frontier=make_frontier(
+                visited=settings.SCANNER_FRONTIER_VISITED,
+                expected_urls=max(max_pages * 50, 100_000),
+                fp_rate=settings.SCANNER_FRONTIER_BLOOM_FP_RATE,
+                spill_after=settings.SCANNER_FRONTIER_SPILL_AFTER,
+                throttle=throttle if settings.SCANNER_HOST_INTERLEAVING else None,
+            ),
+            template_quota=(
+                TemplateQuota(settings.SCANNER_TEMPLATE_PAGE_QUOTA)
+                if settings.SCANNER_TEMPLATE_PAGE_QUOTA > 0 else None
+            ),
+            sitemap_seeder=(
+                SitemapSeeder(
+                    http_client,
+                    scope,
+                    max_urls=settings.SCANNER_SITEMAP_MAX_URLS,
+                    max_sitemaps=settings.SCANNER_SITEMAP_MAX_FILES,
+                )
+                if settings.SCANNER_SITEMAP_MAX_URLS > 0 else None
+            ),
+            page_state=page_state,
+            link_scorer=LINK_SCORERS.get(settings.SCANNER_CRAWL_STRATEGY, default_link_score),
+            page_store=page_store,
+        )
+
+        try:
+            pages = await crawler.crawl(self.scan.target_url)
+        finally:
+            parse_pool.close()
+        if page_state is not None:
+            self._save_page_state(page_state)
+        return pages
+
     async def _scan_page(
-        self, page: CrawledPage, modules: list, http_client: HttpClient
+        self,
+        page: CrawledPage,
+        modules: list,
+        http_client: HttpClient,
+        run_active: bool = True,
+        run_passive: bool = True,
+        budgets: ModuleBudgets | None = None,
     ) -> list[Finding]:
         findings: list[Finding] = []
 
         for module in modules:
             try:
-                # Passive detection
-                passive_findings = await module.detect_async(page)
-                findings.extend(passive_findings)
+                # Passive detection (synthetic API pages have no response to inspect)
+                if run_passive and not page.synthetic:
+                    passive_findings = await module.detect_async(page)
+                    findings.extend(passive_findings)
 
                 # Active testing
-                if module.is_active:
-                    active_findings = await module.active_test_async(page, http_client)
+                if module.is_active and run_active:
+                    if budgets is not None:
+                        active_findings = await budgets.run(
+                            module.name, page.url, http_client,
+                            lambda client: module.active_test_async(page, client),
+                        )
+                    else:
+                        active_findings = await module.active_test_async(page, http_client)
                     findings.extend(active_findings)
             except Exception as e:
                 logger.warning(f"Module {module.name} error on {page.url}: {e}")
 
         return findings
 
+    def _target_key(self) -> str:
+        return site_map_target_key(self.scan.target_url)
+
+    def _load_page_state(self) -> PageStateCache:
+        """Page states stored by earlier scans of this target by the same user."""
+        rows = self.db.execute(
+            select(PageState).where(
+                PageState.user_id == self.scan.user_id,
+                PageState.target_key == self._target_key(),
+            )
+        ).scalars()
+        self._page_state_rows = {row.url: row for row in rows}
+        snapshots = [
+            PageSnapshot(
+                url=row.url,
+                status_code=row.status_code,
+                etag=row.etag,
+                last_modified=row.last_modified,
+                content_hash=row.content_hash,
+                headers=row.headers or {},
+                structure=row.structure or {},
+                body_z=row.body_z,
+            )
+            for row in self._page_state_rows.values()
+        ]
+        return PageStateCache(snapshots, max_body_bytes=settings.SCANNER_PAGE_STATE_MAX_BYTES)
+
+    def _save_page_state(self, cache: PageStateCache) -> None:
+        for snapshot in cache.changed():
+            row = self._page_state_rows.get(snapshot.url)
+            if row is None:
+                row = PageState(user_id=self.scan.user_id, target_key=self._target_key(), url=snapshot.url)
+                self.db.add(row)
+            row.status_code = snapshot.status_code
+            row.etag = snapshot.etag
+            row.last_modified = snapshot.last_modified
+            row.content_hash = snapshot.content_hash
+            row.headers = snapshot.headers
+            row.structure = snapshot.structure
+            row.body_z = snapshot.body_z
+            row.last_scan_id = self.scan_id
+        self.db.commit()
+        logger.info(f"Scan {self.scan_id}: {cache.not_modified} page(s) unchanged since the last scan")
+
+    def _load_site_map(self, max_age_minutes: int, max_depth: int, max_pages: int) -> list[CrawledPage] | None:
+        """Pages of the newest site map for this target and scope, if recent and deep enough."""
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=max_age_minutes)
+        site_map = self.db.execute(
+            select(SiteMap)
+            .where(
+                SiteMap.scope_key == site_map_scope_key(self.scan.target_url, self.scan.config),
+                SiteMap.format_version == SITE_MAP_FORMAT,
+                SiteMap.created_at >= cutoff,
+                SiteMap.max_depth >= max_depth,
+                SiteMap.max_pages >= max_pages,
+            )
+            .order_by(SiteMap.version.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if site_map is None:
+            return None
+        pages = decode_site_map(site_map.payload)
+        if pages is None:
+            return None
+        logger.info(f"Scan {self.scan_id}: reusing site map v{site_map.version} ({len(pages)} pages)")
+        return pages[:max_pages]
+
+    def _save_site_map(self, pages: list[CrawledPage], max_depth: int, max_pages: int) -> None:
+        scope_key = site_map_scope_key(self.scan.target_url, self.scan.config)
+        latest = self.db.execute(
+            select(func.max(SiteMap.version)).where(SiteMap.scope_key == scope_key)
+        ).scalar() or 0
+        self.db.add(SiteMap(
+            target_key=site_map_target_key(self.scan.target_url),
+            scope_key=scope_key,
+            version=latest + 1,
+            format_version=SITE_MAP_FORMAT,
+            max_depth=max_depth,
+            max_pages=max_pages,
+            page_count=len(pages),
+            payload=encode_site_map(pages),
+            source_scan_id=self.scan_id,
+        ))
+        # Keep only the newest versions per scope
+        self.db.execute(
+            delete(SiteMap).where(
+                SiteMap.scope_key == scope_key,
+                SiteMap.version <= latest + 1 - settings.SCANNER_SITE_MAP_KEEP,
+            )
+        )
+        self.db.commit()
+
     def _deduplicate(self, findings: list[Finding]) -> list[Finding]:
         seen: set[str] = set()
         unique: list[Finding] = []
@@ -180,6 +462,7 @@ class ScanOrchestrator:
                 cwe_id=f.cwe_id,
                 affected_url=f.affected_url,
                 affected_parameter=f.affected_parameter,
+                affected_urls=f.affected_urls or None,
                 description=f.description,
                 remediation=f.remediation,
                 confidence=f.confidence,
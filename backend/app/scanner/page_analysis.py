@@ -0,0 +1,269 @@
+"""Parse-once page analysis shared by the crawler and detection modules."""
+import asyncio
+import logging
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, TypeVar
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from app.scanner.fingerprint import content_hash, simhash
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_LINK_PREFIXES = ("#", "javascript:", "mailto:", "tel:", "data:")
+LINK_SRC_TAGS = frozenset({"script", "img", "iframe", "source", "video", "audio"})
+LINK_HREF_TAGS = frozenset({"a", "link", "area"})
+SUBRESOURCE_TAGS = frozenset({"script", "link", "img", "iframe"})
+META_REFRESH_URL = re.compile(r"url\s*=\s*(.+)", re.I)
+
+T = TypeVar("T")
+
+
+@dataclass
+class FormData:
+    action: str
+    method: str
+    # Each input is {"name", "type", "value"}; synthesized API inputs add "in": path/query/body
+    inputs: list[dict] = field(default_factory=list)
+    enctype: str = "application/x-www-form-urlencoded"
+
+
+@dataclass(slots=True)
+class PageStructure:
+    """Compact, picklable result of parsing a page outside the event loop."""
+    links: list[str]
+    forms: list[tuple[str, str, list[tuple[str, str, str]]]]
+    scripts: list[str]
+    inline_scripts: list[str]
+    subresources: list[str]
+
+
+class PageAnalysis:
+    """Lazily-evaluated views over a fetched page.
+
+    The body is parsed with lxml at most once; links, forms, scripts and the
+    normalized header/body views are computed on first access and cached.
+    """
+
+    def __init__(self, url: str, body: str, headers: dict):
+        self.url = url
+        self.body = body
+        self.headers = headers
+
+    def prime(self, structure: PageStructure) -> None:
+        """Seed the cached views from a structure parsed elsewhere, skipping the local parse."""
+        self.__dict__["_tag_index"] = {
+            "links": structure.links,
+            "scripts": structure.scripts,
+            "inline_scripts": structure.inline_scripts,
+            "subresources": structure.subresources,
+        }
+        self.__dict__["forms"] = [
+            FormData(
+                action=action,
+                method=method,
+                inputs=[{"name": n, "type": t, "value": v} for n, t, v in inputs],
+            )
+            for action, method, inputs in structure.forms
+        ]
+
+    def structure(self) -> PageStructure:
+        """Compact, picklable snapshot of the parsed views."""
+        return PageStructure(
+            links=self.links,
+            forms=[
+                (f.action, f.method, [(i["name"], i["type"], i["value"]) for i in f.inputs])
+                for f in self.forms
+            ],
+            scripts=self.scripts,
+            inline_scripts=self.inline_scripts,
+            subresources=self.subresources,
+        )
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return BeautifulSoup(self.body, "lxml")
+
+    @cached_property
+    def body_lower(self) -> str:
+        return self.body.lower()
+
+    @cached_property
+    def headers_lower(self) -> dict[str, str]:
+        return {k.lower(): v for k, v in self.headers.items()}
+
+    @cached_property
+    def set_cookies(self) -> list[str]:
+        return [v for k, v in self.headers.items() if k.lower() == "set-cookie"]
+
+    @cached_property
+    def links(self) -> list[str]:
+        """Absolute URLs referenced by the page, deduplicated, in document order."""
+        return self._tag_index["links"]
+
+    @cached_property
+    def scripts(self) -> list[str]:
+        """Raw ``src`` values of external scripts."""
+        return self._tag_index["scripts"]
+
+    @cached_property
+    def inline_scripts(self) -> list[str]:
+        return self._tag_index["inline_scripts"]
+
+    @cached_property
+    def subresources(self) -> list[str]:
+        """Raw ``src``/``href`` values of script, link, img and iframe tags."""
+        return self._tag_index["subresources"]
+
+    @cached_property
+    def forms(self) -> list[FormData]:
+        forms: list[FormData] = []
+        for form in self.soup.find_all("form"):
+            action = urljoin(self.url, form.get("action", ""))
+            method = (form.get("method", "GET")).upper()
+            inputs = []
+            for inp in form.find_all(["input", "textarea", "select"]):
+                inputs.append({
+                    "name": inp.get("name", ""),
+                    "type": inp.get("type", "text"),
+                    "value": inp.get("value", ""),
+                })
+            forms.append(FormData(action=action, method=method, inputs=inputs))
+        return forms
+
+    @cached_property
+    def _tag_index(self) -> dict[str, list[str]]:
+        """Single walk over the tree collecting every tag-derived list."""
+        seen: set[str] = set()
+        links: list[str] = []
+        scripts: list[str] = []
+        inline_scripts: list[str] = []
+        subresources: list[str] = []
+
+        def add(href: str) -> None:
+            if not href or href.strip().startswith(SKIPPED_LINK_PREFIXES):
+                return
+            absolute = urljoin(self.url, href.strip())
+            if absolute not in seen:
+                seen.add(absolute)
+                links.append(absolute)
+
+        for tag in self.soup.find_all(True):
+            name = tag.name
+            attrs = tag.attrs
+            href = attrs.get("href")
+            src = attrs.get("src")
+
+            if href and name in LINK_HREF_TAGS:
+                add(href)
+            if src and name in LINK_SRC_TAGS:
+                add(src)
+            if attrs.get("data-href"):
+                add(attrs["data-href"])
+            if attrs.get("data-src"):
+                add(attrs["data-src"])
+            if attrs.get("srcset"):
+                for part in attrs["srcset"].split(","):
+                    add(part.strip().split()[0] if part.strip() else "")
+            if name == "meta" and "refresh" in attrs.get("http-equiv", "").lower():
+                m = META_REFRESH_URL.search(attrs.get("content", ""))
+                if m:
+                    add(m.group(1).strip())
+            if name == "form" and attrs.get("action"):
+                add(attrs["action"])
+
+            if name == "script":
+                if src:
+                    scripts.append(src)
+                elif tag.string:
+                    inline_scripts.append(str(tag.string))
+            if name in SUBRESOURCE_TAGS and src:
+                subresources.append(src)
+            if name == "link" and href:
+                subresources.append(href)
+
+        return {
+            "links": links,
+            "scripts": scripts,
+            "inline_scripts": inline_scripts,
+            "subresources": subresources,
+        }
+
+
+def extract_structure(url: str, raw: bytes, encoding: str | None = None) -> PageStructure:
+    """Parse raw HTML into a PageStructure. Top-level so it can run in a worker process."""
+    body = raw.decode(encoding or "utf-8", errors="replace")
+    return PageAnalysis(url, body, {}).structure()
+
+
+def extract_page(url: str, body: str) -> tuple[PageStructure, str, int]:
+    """Structure, content hash and SimHash of an already decoded body, in one worker job.
+
+    Takes the text the HTTP client decoded, so an offloaded page gets the
+    same hashes as one fingerprinted inline.
+    """
+    return PageAnalysis(url, body, {}).structure(), content_hash(body), simhash(body)
+
+
+class HtmlParsePool:
+    """Offloads parsing of large pages to a worker pool so the event loop stays responsive.
+
+    Pages smaller than ``offload_threshold`` bytes are parsed inline; with
+    ``workers=0`` every page is. Falls back to threads when the process pool
+    cannot be used (e.g. inside daemonic Celery prefork children).
+    """
+
+    def __init__(self, workers: int = 0, offload_threshold: int = 262_144, use_processes: bool = True):
+        self.workers = workers
+        self.offload_threshold = offload_threshold
+        self._executor: Executor | None = None
+        if workers > 0:
+            self._executor = (
+                ProcessPoolExecutor(max_workers=workers) if use_processes
+                else ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-parse")
+            )
+
+    def should_offload(self, size: int) -> bool:
+        return self._executor is not None and size >= self.offload_threshold
+
+    async def parse(self, url: str, raw: bytes, encoding: str | None = None) -> PageStructure:
+        if not self.should_offload(len(raw)):
+            return extract_structure(url, raw, encoding)
+        return await self._run(extract_structure, url, raw, encoding)
+
+    async def parse_page(self, url: str, body: str, size: int | None = None) -> tuple[PageStructure, str, int]:
+        """Structure, content hash and SimHash of a page, computed in the pool for large pages.
+
+        ``size`` is the response size in bytes (default: the length of ``body``).
+        """
+        if not self.should_offload(len(body) if size is None else size):
+            return extract_page(url, body)
+        return await self._run(extract_page, url, body)
+
+    async def simhash(self, body: str) -> int:
+        """SimHash of ``body``, computed in the pool for large pages."""
+        if not self.should_offload(len(body)):
+            return simhash(body)
+        return await self._run(simhash, body)
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        except (BrokenProcessPool, AssertionError, OSError) as e:
+            if not isinstance(self._executor, ProcessPoolExecutor):
+                raise
+            logger.warning(f"Process parse pool unavailable ({e}), falling back to threads")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="html-parse")
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,111 @@
+"""Per-target page state from the previous scan, used for conditional (304) recrawls."""
+import zlib
+from dataclasses import dataclass, field
+
+from app.scanner.page_analysis import PageStructure
+
+# Headers a 304 may carry that describe the (empty) 304 body rather than the stored one
+NOT_MODIFIED_SKIP_HEADERS = frozenset({"content-length", "content-encoding", "transfer-encoding"})
+
+
+@dataclass(slots=True)
+class PageSnapshot:
+    url: str
+    status_code: int
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+    headers: dict
+    structure: dict
+    body_z: bytes | None = None
+    changed: bool = field(default=False, compare=False)
+
+    @property
+    def body(self) -> str:
+        return zlib.decompress(self.body_z).decode("utf-8", errors="replace") if self.body_z else ""
+
+    def page_structure(self) -> PageStructure:
+        return PageStructure(
+            links=self.structure.get("links", []),
+            forms=[(a, m, [tuple(i) for i in inputs]) for a, m, inputs in self.structure.get("forms", [])],
+            scripts=self.structure.get("scripts", []),
+            inline_scripts=self.structure.get("inline_scripts", []),
+            subresources=self.structure.get("subresources", []),
+        )
+
+
+def structure_to_dict(structure: PageStructure) -> dict:
+    return {
+        "links": structure.links,
+        "forms": [[a, m, [list(i) for i in inputs]] for a, m, inputs in structure.forms],
+        "scripts": structure.scripts,
+        "inline_scripts": structure.inline_scripts,
+        "subresources": structure.subresources,
+    }
+
+
+class PageStateCache:
+    """In-memory page states keyed by normalized URL.
+
+    The orchestrator loads the previous scan's rows into it and writes back
+    the snapshots marked ``changed`` once the crawl finishes. Bodies larger
+    than ``max_body_bytes`` are not stored, so those pages are always refetched.
+    """
+
+    def __init__(self, snapshots: list[PageSnapshot] | None = None, max_body_bytes: int = 1_048_576):
+        self.max_body_bytes = max_body_bytes
+        self._snapshots: dict[str, PageSnapshot] = {s.url: s for s in snapshots or []}
+        self.not_modified = 0
+
+    def get(self, key: str) -> PageSnapshot | None:
+        return self._snapshots.get(key)
+
+    def conditional_headers(self, key: str) -> dict[str, str]:
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or snapshot.body_z is None:
+            return {}
+        headers: dict[str, str] = {}
+        if snapshot.etag:
+            headers["If-None-Match"] = snapshot.etag
+        if snapshot.last_modified:
+            headers["If-Modified-Since"] = snapshot.last_modified
+        return headers
+
+    def refresh(self, key: str, response_headers: dict) -> PageSnapshot:
+        """Apply a 304's headers to the stored snapshot and return it."""
+        snapshot = self._snapshots[key]
+        updates = {k: v for k, v in response_headers.items() if k.lower() not in NOT_MODIFIED_SKIP_HEADERS}
+        snapshot.headers = {**snapshot.headers, **updates}
+        snapshot.etag = _header(updates, "etag") or snapshot.etag
+        snapshot.last_modified = _header(updates, "last-modified") or snapshot.last_modified
+        snapshot.changed = True
+        self.not_modified += 1
+        return snapshot
+
+    def record(self, key: str, page, structure: PageStructure) -> None:
+        """Store the state of a freshly downloaded page."""
+        raw = page.body.encode("utf-8", errors="replace")
+        self._snapshots[key] = PageSnapshot(
+            url=key,
+            status_code=page.status_code,
+            etag=_header(page.headers, "etag"),
+            last_modified=_header(page.headers, "last-modified"),
+            content_hash=page.content_hash,
+            headers=page.headers,
+            structure=structure_to_dict(structure),
+            body_z=zlib.compress(raw, 6) if len(raw) <= self.max_body_bytes else None,
+            changed=True,
+        )
+
+    def changed(self) -> list[PageSnapshot]:
+        return [s for s in self._snapshots.values() if s.changed]
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+def _header(headers: dict, name: str) -> str | None:
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
@@ -0,0 +1,69 @@
+"""Bounded-memory storage for crawled page bodies."""
+import os
+import tempfile
+import zlib
+
+
+class PageStore:
+    """Keeps page bodies zlib-compressed, spilling to a temp file past ``memory_limit``.
+
+    ``put`` returns an integer handle; ``get`` decompresses the body on demand.
+    Only compressed bytes are kept, so the decoded body exists in memory only
+    while a page is being processed.
+    """
+
+    def __init__(self, memory_limit: int = 32 * 1024 * 1024, compress_level: int = 6):
+        self.memory_limit = memory_limit
+        self.compress_level = compress_level
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        self._memory: dict[int, bytes] = {}
+        self._spilled: dict[int, tuple[int, int]] = {}  # handle -> (offset, length)
+        self._file = None
+        self._next_handle = 0
+
+    def put(self, body: str) -> int:
+        data = zlib.compress(body.encode("utf-8", errors="surrogatepass"), self.compress_level)
+        handle = self._next_handle
+        self._next_handle += 1
+        if self.memory_bytes + len(data) <= self.memory_limit:
+            self._memory[handle] = data
+            self.memory_bytes += len(data)
+        else:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix="scanctum-pages-")
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(data)
+            self._spilled[handle] = (offset, len(data))
+            self.spilled_bytes += len(data)
+        return handle
+
+    def get(self, handle: int) -> str:
+        data = self._memory.get(handle)
+        if data is None:
+            offset, length = self._spilled[handle]
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return zlib.decompress(data).decode("utf-8", errors="surrogatepass")
+
+    def discard(self, handle: int) -> None:
+        """Forget a body; the spill file is emptied once none of its bodies are left."""
+        data = self._memory.pop(handle, None)
+        if data is not None:
+            self.memory_bytes -= len(data)
+        spilled = self._spilled.pop(handle, None)
+        if spilled is not None:
+            self.spilled_bytes -= spilled[1]
+            if not self._spilled:
+                self._file.truncate(0)
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._spilled)
+
+    def close(self) -> None:
+        self._memory.clear()
+        self._spilled.clear()
+        self.memory_bytes = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
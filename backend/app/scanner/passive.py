@@ -0,0 +1,149 @@
+"""Passive analysis off the event loop.
+
+Passive ``detect`` checks are pure CPU. With ``SCANNER_PASSIVE_WORKERS`` set,
+the orchestrator hands every scanned page to a ``PassiveAnalysisStage`` as a
+compact ``PageRecord``; records are shipped to a worker pool in batches and
+the findings are merged back before deduplication, so analysing large pages
+never holds up active request scheduling.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+from app.scanner.crawler import CrawledPage
+from app.scanner.modules.base import BaseModule, Finding
+from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.page_analysis import FormData
+
+logger = logging.getLogger(__name__)
+
+# Batches queued or running per worker before ``submit`` waits
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass(slots=True)
+class PageRecord:
+    """The parts of a page passive checks read; picklable for worker processes."""
+    url: str
+    status_code: int
+    headers: dict
+    body: str
+    forms: list[FormData] = field(default_factory=list)
+
+    @classmethod
+    def from_page(cls, page: CrawledPage) -> "PageRecord":
+        return cls(page.url, page.status_code, dict(page.headers), page.body, list(page.forms))
+
+    def to_page(self) -> CrawledPage:
+        return CrawledPage(self.url, self.status_code, self.headers, self.body, forms=self.forms)
+
+
+def passive_module_names(modules: list[BaseModule]) -> list[str]:
+    """Modules with a passive check, i.e. those overriding ``BaseModule.detect``."""
+    return [module.name for module in modules if type(module).detect is not BaseModule.detect]
+
+
+# Module instances of this worker, created on first use
+_worker_modules: dict[str, BaseModule] = {}
+
+
+def _worker_module(name: str) -> BaseModule:
+    module = _worker_modules.get(name)
+    if module is None:
+        module = _worker_modules[name] = ModuleRegistry.get_all()[name]()
+    return module
+
+
+def analyze_batch(module_names: tuple[str, ...], records: list[PageRecord]) -> list[Finding]:
+    """Run the named modules' ``detect`` over ``records``. Top-level so it can run in a worker process."""
+    findings: list[Finding] = []
+    for record in records:
+        page = record.to_page()
+        for name in module_names:
+            try:
+                findings.extend(_worker_module(name).detect(page))
+            except Exception as e:
+                logger.warning(f"Module {name} error on {record.url}: {e}")
+    return findings
+
+
+class PassiveAnalysisStage:
+    """Batches page records for a worker pool and collects the passive findings.
+
+    ``submit`` returns as soon as the page is queued (waiting only when
+    enough batches are already in flight); ``drain`` flushes the last batch
+    and returns every finding. Falls back to threads when the process pool
+    cannot be used (e.g. inside daemonic Celery prefork children).
+    """
+
+    def __init__(
+        self,
+        module_names: list[str],
+        workers: int,
+        batch_size: int = 32,
+        use_processes: bool = True,
+    ):
+        self.module_names = tuple(module_names)
+        self.workers = max(workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=self.workers) if use_processes
+            else ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="passive")
+        )
+        self._batch: list[PageRecord] = []
+        self._running: set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(self.workers * BATCHES_IN_FLIGHT_PER_WORKER)
+        self.findings: list[Finding] = []
+        self.pages = 0
+        self.batches = 0
+
+    async def submit(self, page: CrawledPage) -> None:
+        # Synthetic API pages have no response to inspect
+        if not self.module_names or page.synthetic:
+            return
+        self._batch.append(PageRecord.from_page(page))
+        self.pages += 1
+        if len(self._batch) >= self.batch_size:
+            await self._dispatch()
+
+    async def drain(self) -> list[Finding]:
+        if self._batch:
+            await self._dispatch()
+        if self._running:
+            await asyncio.gather(*self._running)
+        return self.findings
+
+    async def _dispatch(self) -> None:
+        batch, self._batch = self._batch, []
+        await self._slots.acquire()
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[PageRecord]) -> None:
+        try:
+            self.findings.extend(await self._analyze(batch))
+            self.batches += 1
+        except Exception as e:
+            logger.warning(f"Passive analysis of {len(batch)} page(s) failed: {e}")
+        finally:
+            self._slots.release()
+
+    async def _analyze(self, batch: list[PageRecord]) -> list[Finding]:
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, analyze_batch, self.module_names, batch)
+        except (BrokenProcessPool, AssertionError, OSError) as e:
+            if not isinstance(executor, ProcessPoolExecutor):
+                raise
+            if self._executor is executor:
+                logger.warning(f"Process passive pool unavailable ({e}), falling back to threads")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="passive")
+            return await loop.run_in_executor(self._executor, analyze_batch, self.module_names, batch)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
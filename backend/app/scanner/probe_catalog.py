@@ -0,0 +1,194 @@
+"""Declarative probe catalogs and the engine that runs them.
+
+A catalog is a YAML (or JSON) file in ``app/scanner/probes/``::
+
+    name: path_traversal
+    params: [file, path]          # parameters worth probing; omit for all
+    probes:
+      - id: unix-passwd
+        title: Path Traversal     # optional finding metadata
+        confidence: confirmed
+        contexts: [query, form]   # where the probe is sent (default: both)
+        form_payloads: 4          # cap on variants sent to form fields
+        payloads: ["../../../../etc/passwd"]
+        encodings: [raw, url]     # variants generated from each payload
+        matchers:
+          - regex: "root:.*:/bin/"
+            label: /etc/passwd
+          - literal: ami-id
+            confidence: confirmed # overrides the probe's confidence
+
+Other top-level keys are ignored, so YAML anchors can hold shared matchers.
+Catalogs are compiled once per process (matchers into a ``SignatureSet``),
+and a probe's encoded variants are generated the first time it runs.
+"""
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+
+from app.scanner.batching import BatchHit, Sender, inject_batched
+from app.scanner.signatures import Signature, SignatureMatch, SignatureSet
+
+CATALOG_DIR = Path(__file__).parent / "probes"
+CONTEXTS = ("query", "form")
+
+
+def _dot_url(payload: str) -> str:
+    return payload.replace(".", "%2e").replace("/", "%2f")
+
+
+ENCODINGS = {
+    "raw": lambda payload: payload,
+    "url": lambda payload: quote(payload, safe=""),
+    "double_url": lambda payload: quote(quote(payload, safe=""), safe=""),
+    "dot_url": _dot_url,  # dots and slashes only, for traversal filters
+}
+
+
+class CatalogError(ValueError):
+    """A probe catalog file is malformed."""
+
+
+class Probe:
+    __slots__ = (
+        "id", "title", "severity", "cvss_score", "cvss_vector", "confidence",
+        "contexts", "form_payloads", "payloads", "encodings", "matchers", "_confidence_by_pattern", "_variants",
+    )
+
+    def __init__(self, spec: dict):
+        try:
+            self.id = spec["id"]
+            self.payloads = list(spec["payloads"])
+            matchers = spec["matchers"]
+        except KeyError as e:
+            raise CatalogError(f"probe is missing {e.args[0]!r}") from None
+        self.title = spec.get("title", "")
+        self.severity = spec.get("severity")
+        self.cvss_score = spec.get("cvss_score")
+        self.cvss_vector = spec.get("cvss_vector")
+        self.confidence = spec.get("confidence", "firm")
+        self.contexts = tuple(spec.get("contexts", CONTEXTS))
+        self.form_payloads = spec.get("form_payloads")
+        self.encodings = tuple(spec.get("encodings", ["raw"]))
+        unknown = [name for name in self.encodings if name not in ENCODINGS]
+        if unknown:
+            raise CatalogError(f"probe {self.id!r}: unknown encoding(s) {unknown}")
+        signatures = []
+        self._confidence_by_pattern: dict[str, str] = {}
+        for matcher in matchers:
+            signature = _compile_matcher(self.id, matcher)
+            signatures.append(signature)
+            if "confidence" in matcher:
+                self._confidence_by_pattern[signature.pattern] = matcher["confidence"]
+        try:
+            self.matchers = SignatureSet(signatures)
+        except (re.error, ValueError) as e:
+            raise CatalogError(f"probe {self.id!r}: bad matcher: {e}") from None
+        self._variants: list[str] | None = None
+
+    @property
+    def variants(self) -> list[str]:
+        """Every payload under every encoding, in order, without repeats (built on first use)."""
+        if self._variants is None:
+            self._variants = list(dict.fromkeys(
+                ENCODINGS[encoding](payload) for payload in self.payloads for encoding in self.encodings
+            ))
+        return self._variants
+
+    def variants_for(self, context: str) -> list[str]:
+        if context == "form" and self.form_payloads:
+            return self.variants[:self.form_payloads]
+        return self.variants
+
+    def detect(self, response, payload: str) -> SignatureMatch | None:
+        return self.matchers.search(response.text)
+
+    def confidence_of(self, match: SignatureMatch) -> str:
+        return self._confidence_by_pattern.get(match.signature.pattern, self.confidence)
+
+
+def _compile_matcher(probe_id: str, matcher: dict) -> Signature:
+    flags = 0 if matcher.get("case_sensitive") else re.I
+    if "literal" in matcher:
+        literal = matcher["literal"]
+        return Signature(re.escape(literal), matcher.get("label", literal), literal=literal, flags=flags)
+    if "regex" in matcher:
+        return Signature(matcher["regex"], matcher.get("label", ""), literal=matcher.get("required"), flags=flags)
+    raise CatalogError(f"probe {probe_id!r}: matcher needs 'regex' or 'literal'")
+
+
+@dataclass(slots=True)
+class ProbeHit:
+    probe: Probe
+    hit: BatchHit
+
+    @property
+    def match(self) -> SignatureMatch:
+        return self.hit.signal
+
+    @property
+    def confidence(self) -> str:
+        return self.probe.confidence_of(self.match)
+
+
+class ProbeCatalog:
+    def __init__(self, spec: dict):
+        self.name = spec.get("name", "")
+        params = spec.get("params")
+        self.params = frozenset(p.lower() for p in params) if params else None
+        self.probes = [Probe(probe) for probe in spec.get("probes", [])]
+
+    def select(self, names) -> list[str]:
+        """``names`` this catalog wants to probe (all of them without a ``params`` list)."""
+        if self.params is None:
+            return list(names)
+        return [name for name in names if name.lower() in self.params]
+
+    async def run(
+        self, send: Sender, params: list[str], context: str = "query", first_only: bool = False,
+    ) -> dict[str, ProbeHit]:
+        """First hit per parameter, trying probes in catalog order.
+
+        A parameter stops being probed once a probe hits it; with ``first_only``
+        the run stops at the first hit overall.
+        """
+        found: dict[str, ProbeHit] = {}
+        for probe in self.probes:
+            pending = [name for name in params if name not in found]
+            if not pending:
+                break
+            if context not in probe.contexts:
+                continue
+            hits = await inject_batched(
+                pending, probe.variants_for(context), send, probe.detect, first_only=first_only,
+            )
+            for name in pending:
+                if name in hits:
+                    found[name] = ProbeHit(probe, hits[name])
+            if found and first_only:
+                break
+        return found
+
+
+def parse_catalog(text: str, fmt: str = "yaml") -> ProbeCatalog:
+    if fmt == "json":
+        spec = json.loads(text)
+    else:
+        import yaml
+        spec = yaml.safe_load(text)
+    if not isinstance(spec, dict):
+        raise CatalogError("catalog must be a mapping")
+    return ProbeCatalog(spec)
+
+
+@lru_cache(maxsize=None)
+def load_catalog(name: str) -> ProbeCatalog:
+    """The catalog ``probes/<name>.yaml`` (or ``.json``), compiled once per process."""
+    for suffix, fmt in ((".yaml", "yaml"), (".yml", "yaml"), (".json", "json")):
+        path = CATALOG_DIR / f"{name}{suffix}"
+        if path.exists():
+            return parse_catalog(path.read_text(encoding="utf-8"), fmt)
+    raise FileNotFoundError(f"No probe catalog named {name!r} in {CATALOG_DIR}")
@@ -1,7 +1,8 @@
 import asyncio
 import time
 from collections import defaultdict
-from urllib.parse import urlparse
+
+from app.scanner.urls import request_hostname
 
 
 class PerDomainThrottle:
@@ -15,7 +16,7 @@ class PerDomainThrottle:
         self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
     async def wait(self, url: str) -> None:
-        domain = urlparse(url).hostname or ""
+        domain = request_hostname(url)
         async with self._locks[domain]:
             now = time.monotonic()
             elapsed = now - self._last_request[domain]
@@ -23,6 +24,13 @@ class PerDomainThrottle:
                 await asyncio.sleep(self.delay - elapsed)
             self._last_request[domain] = time.monotonic()
 
+    def ready_in(self, domain: str) -> float:
+        """Seconds until a request to ``domain`` would pass ``wait`` without sleeping."""
+        lock = self._locks.get(domain)
+        if lock is not None and lock.locked():
+            return self.delay  # another request is already waiting for this window
+        return max(self._last_request.get(domain, 0.0) + self.delay - time.monotonic(), 0.0)
+
 
 class CircuitBreaker:
     """Trips after consecutive failures; auto-resets after cooldown."""
@@ -0,0 +1,49 @@
+"""Host-interleaved job scheduling for the module phase of a scan."""
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from app.scanner.frontier import HostInterleavedQueue
+from app.scanner.rate_limiter import PerDomainThrottle
+from app.scanner.urls import canonical_url
+
+T = TypeVar("T")
+
+
+class HostScheduler:
+    """Runs per-URL jobs concurrently across hosts, one at a time per host.
+
+    A page scan is a burst of requests to its own host, which the throttle
+    serializes anyway; so jobs stay sequential per host while different hosts
+    proceed in parallel, picked round-robin with open throttle windows first.
+    Jobs for a single host run in their original order.
+    """
+
+    def __init__(self, throttle: PerDomainThrottle | None = None, concurrency: int = 5):
+        self.throttle = throttle
+        self.concurrency = max(concurrency, 1)
+
+    async def run(self, jobs: list[tuple[str, T]], handler: Callable[[T], Awaitable[None]]) -> None:
+        queue = HostInterleavedQueue(self.throttle)
+        for url, job in jobs:
+            queue.push((url, job))
+        busy: set[str] = set()
+
+        async def worker() -> None:
+            while True:
+                item = queue.pop(exclude=busy)
+                if item is None:
+                    # Whatever is left belongs to hosts another worker is serving
+                    return
+                url, job = item
+                host = canonical_url(url).hostname
+                busy.add(host)
+                try:
+                    await handler(job)
+                finally:
+                    busy.discard(host)
+
+        try:
+            workers = min(self.concurrency, queue.hosts) or 1
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            queue.close()
@@ -1,16 +1,44 @@
+import logging
 import re
-from urllib.parse import urlparse
 
+from app.scanner.urls import CanonicalUrl, canonical_url, next_scope_token
+
+logger = logging.getLogger(__name__)
 
 STATIC_EXTENSIONS = frozenset({
     ".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico",
     ".woff", ".woff2", ".ttf", ".eot", ".mp4", ".mp3", ".avi",
     ".zip", ".gz", ".tar", ".pdf", ".doc", ".docx", ".xls", ".xlsx",
 })
+STATIC_EXTENSION_SUFFIXES = tuple(STATIC_EXTENSIONS)
+
+
+def compile_exclude_patterns(patterns: list[str]) -> list[re.Pattern]:
+    """Compile exclude patterns, combining the group-free ones into a single alternation.
+
+    Patterns with capture groups are kept as their own regex, since joining
+    them would renumber the groups their backreferences (``\\1``) point at.
+    Falls back to one regex per pattern when the rest cannot be combined
+    (e.g. mid-pattern global flags).
+    """
+    compiled = [re.compile(p) for p in patterns]
+    plain = [regex for regex in compiled if not regex.groups]
+    separate = [regex for regex in compiled if regex.groups]
+    if len(plain) < 2:
+        return plain + separate
+    try:
+        return [re.compile("|".join(f"(?:{regex.pattern})" for regex in plain))] + separate
+    except re.error:
+        logger.debug("Exclude patterns cannot be combined; matching them one by one")
+        return plain + separate
 
 
 class ScopeValidator:
-    """Validates that URLs stay within the defined scan scope."""
+    """Validates that URLs stay within the defined scan scope.
+
+    Verdicts are cached on the interned ``CanonicalUrl``, so each URL is
+    evaluated once per validator.
+    """
 
     def __init__(
         self,
@@ -18,38 +46,42 @@ class ScopeValidator:
         include_subdomains: bool = False,
         exclude_patterns: list[str] | None = None,
     ):
-        parsed = urlparse(target_url)
-        self.target_domain = parsed.hostname or ""
-        self.target_scheme = parsed.scheme
+        target = canonical_url(target_url)
+        self.target_domain = target.hostname
+        self.target_scheme = target.scheme
         self.include_subdomains = include_subdomains
-        self.exclude_regexes = [
-            re.compile(p) for p in (exclude_patterns or [])
-        ]
+        self.exclude_regexes = compile_exclude_patterns(exclude_patterns or [])
+        self.token = next_scope_token()
 
-    def is_in_scope(self, url: str) -> bool:
-        parsed = urlparse(url)
-        hostname = parsed.hostname or ""
+    def host_in_scope(self, hostname: str) -> bool:
+        if self.include_subdomains:
+            return hostname == self.target_domain or hostname.endswith(f".{self.target_domain}")
+        return hostname == self.target_domain
 
+    def is_in_scope(self, url: str | CanonicalUrl) -> bool:
+        parsed = url if isinstance(url, CanonicalUrl) else canonical_url(url)
+        verdict = parsed.scope_verdict(self.token)
+        if verdict is None:
+            verdict = self._evaluate(parsed)
+            parsed.set_scope_verdict(self.token, verdict)
+        return verdict
+
+    def _evaluate(self, parsed: CanonicalUrl) -> bool:
         # Must be http or https
         if parsed.scheme not in ("http", "https"):
             return False
 
         # Domain check
-        if self.include_subdomains:
-            if not (hostname == self.target_domain or hostname.endswith(f".{self.target_domain}")):
-                return False
-        else:
-            if hostname != self.target_domain:
-                return False
+        if not self.host_in_scope(parsed.hostname):
+            return False
 
         # Static resource filter
-        path_lower = parsed.path.lower()
-        if any(path_lower.endswith(ext) for ext in STATIC_EXTENSIONS):
+        if parsed.path.lower().endswith(STATIC_EXTENSION_SUFFIXES):
             return False
 
         # Exclusion patterns
         for regex in self.exclude_regexes:
-            if regex.search(url):
+            if regex.search(parsed.raw):
                 return False
 
         return True
@@ -0,0 +1,200 @@
+"""Multi-pattern response matching shared by detection modules.
+
+A ``SignatureSet`` compiles a module's signatures once. Each response body is
+scanned a single time for the signatures' required literals (Aho-Corasick when
+``pyahocorasick`` is installed, otherwise one combined lookahead regex), and a
+signature's confirmatory regex then only runs in a bounded window around the
+places its literal occurred. Analysis cost is O(body) per response instead of
+O(body x patterns), and patterns such as ``warning.*mysql`` can no longer
+backtrack across a whole body.
+"""
+import re
+from dataclasses import dataclass
+
+# Characters searched on either side of a literal hit when confirming a signature
+DEFAULT_WINDOW = 1024
+# Literal occurrences remembered per body; a confirmation is tried at each
+MAX_HITS_PER_LITERAL = 16
+MIN_LITERAL_LENGTH = 3
+
+_ESCAPE_CLASSES = set("dDsSwWbBAZ")
+
+
+def required_literal(pattern: str) -> str:
+    """Longest run of literal characters that every match of ``pattern`` contains.
+
+    Patterns with groups or alternation need an explicit literal instead.
+    """
+    runs: list[str] = []
+    current: list[str] = []
+
+    def end_run() -> None:
+        runs.append("".join(current))
+        current.clear()
+
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped in _ESCAPE_CLASSES or escaped.isdigit():
+                end_run()
+            else:
+                current.append(escaped)
+            continue
+        if ch in "(|":
+            raise ValueError(f"signature {pattern!r} needs an explicit literal")
+        if ch in "*?{":
+            # The previous character may be absent (or repeated), so it can't anchor
+            if current:
+                current.pop()
+            end_run()
+            if ch == "{":
+                i = pattern.index("}", i)
+        elif ch == "+":
+            end_run()
+        elif ch == "[":
+            end_run()
+            i = pattern.index("]", i + 2 if pattern[i + 1:i + 2] == "]" else i + 1)
+        elif ch in ".^$":
+            end_run()
+        else:
+            current.append(ch)
+        i += 1
+    end_run()
+
+    literal = max(runs, key=len)
+    if len(literal) < MIN_LITERAL_LENGTH:
+        raise ValueError(f"signature {pattern!r} needs an explicit literal")
+    return literal
+
+
+@dataclass(frozen=True, slots=True)
+class Signature:
+    pattern: str
+    label: str = ""
+    literal: str | None = None  # required substring; derived from ``pattern`` when omitted
+    flags: int = re.I
+
+
+@dataclass(slots=True)
+class SignatureMatch:
+    signature: Signature
+    start: int
+    end: int
+    text: str
+
+    @property
+    def label(self) -> str:
+        return self.signature.label
+
+    def excerpt(self, body: str, context: int = 100) -> str:
+        start = max(0, self.start - context)
+        end = min(len(body), self.end + context)
+        return f"...{body[start:end]}..."
+
+
+class _LiteralScanner:
+    """Finds every occurrence of a fixed set of lowercase literals in one pass."""
+
+    def __init__(self, literals: list[str]):
+        self.literals = literals
+        self._automaton = None
+        try:
+            import ahocorasick
+        except ImportError:
+            ahocorasick = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for index, literal in enumerate(literals):
+                self._automaton.add_word(literal, index)
+            self._automaton.make_automaton()
+        else:
+            # A lookahead tries every position, so overlapping hits are all seen;
+            # at each position only the longest alternative matches, so literals
+            # that are prefixes of it are credited explicitly.
+            ordered = sorted(range(len(literals)), key=lambda i: -len(literals[i]))
+            self._regex = re.compile("(?=(" + "|".join(re.escape(literals[i]) for i in ordered) + "))")
+            self._index = {literal: i for i, literal in enumerate(literals)}
+            self._prefixes = [
+                [j for j, other in enumerate(literals) if j != i and literal.startswith(other)]
+                for i, literal in enumerate(literals)
+            ]
+
+    def scan(self, lowered: str) -> dict[int, list[int]]:
+        """Literal index -> start offsets (at most ``MAX_HITS_PER_LITERAL`` each)."""
+        hits: dict[int, list[int]] = {}
+
+        def add(index: int, start: int) -> None:
+            positions = hits.setdefault(index, [])
+            if len(positions) < MAX_HITS_PER_LITERAL:
+                positions.append(start)
+
+        if self._automaton is not None:
+            for end, index in self._automaton.iter(lowered):
+                add(index, end - len(self.literals[index]) + 1)
+            return hits
+        for m in self._regex.finditer(lowered):
+            index = self._index[m.group(1)]
+            add(index, m.start())
+            for prefix in self._prefixes[index]:
+                add(prefix, m.start())
+        return hits
+
+
+class SignatureSet:
+    """A module's signatures, compiled once and matched together."""
+
+    def __init__(self, signatures: list[Signature], window: int = DEFAULT_WINDOW):
+        self.signatures = list(signatures)
+        self.window = window
+        self._regexes = [re.compile(sig.pattern, sig.flags) for sig in self.signatures]
+        literals: list[str] = []
+        self._literal_of: list[int] = []
+        for sig in self.signatures:
+            literal = (sig.literal or required_literal(sig.pattern)).lower()
+            if literal not in literals:
+                literals.append(literal)
+            self._literal_of.append(literals.index(literal))
+        self._scanner = _LiteralScanner(literals)
+
+    @classmethod
+    def from_literals(cls, literals: list[str], flags: int = re.I) -> "SignatureSet":
+        """Plain substring signatures, labelled with the literal itself."""
+        return cls([Signature(re.escape(literal), literal, literal=literal, flags=flags) for literal in literals])
+
+    def search(self, text: str, lowered: str | None = None) -> SignatureMatch | None:
+        """First signature, in declaration order, that matches ``text``.
+
+        ``lowered`` may pass an already lowercased copy of ``text``.
+        """
+        if not text:
+            return None
+        if lowered is None:
+            lowered = text.lower()
+        hits = self._scanner.scan(lowered)
+        if not hits:
+            return None
+        # Lowercasing a few non-ASCII characters changes the length; offsets are then unusable
+        aligned = len(lowered) == len(text)
+
+        for i, sig in enumerate(self.signatures):
+            positions = hits.get(self._literal_of[i])
+            if not positions:
+                continue
+            regex = self._regexes[i]
+            if not aligned:
+                m = regex.search(text)
+                if m:
+                    return SignatureMatch(sig, m.start(), m.end(), m.group(0))
+                continue
+            literal_len = len(self._scanner.literals[self._literal_of[i]])
+            for start in positions:
+                m = regex.search(text, max(0, start - self.window), start + literal_len + self.window)
+                if m:
+                    return SignatureMatch(sig, m.start(), m.end(), m.group(0))
+        return None
+
+    def __len__(self) -> int:
+        return len(self.signatures)
@@ -0,0 +1,193 @@
+"""Response similarity for differential checks (boolean-blind SQLi, IDOR).
+
+Responses are compared as token sequences (tags and words) rather than by
+length or hash. Values that change on every request (UUIDs, long hex or
+token-like strings, timestamps) are normalized while tokenizing. Anything
+else that changes between two fetches of the same URL, such as rotating
+ads or a rendered clock, is learned as a ``DynamicMask`` and replaced by a
+placeholder before comparing. The second fetch costs one request per
+endpoint and scan, and it is only made when a plain comparison already
+finds a difference. Injected values the page echoes back (a search box
+showing the query) are masked too, so a reflected payload alone never
+makes two responses differ.
+"""
+import html
+import re
+from difflib import SequenceMatcher
+from typing import Iterable
+from urllib.parse import quote, quote_plus
+
+# Tags and whitespace-separated words
+TOKEN = re.compile(r"<[^>]*>|[^<\s]+")
+UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+LONG_HEX = re.compile(r"\b[0-9a-f]{16,}\b", re.I)
+EPOCH = re.compile(r"\b1\d{9}(?:\d{3})?\b")  # Unix time in seconds or milliseconds
+CLOCK = re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b")
+# Candidate nonces/CSRF tokens: long runs of token characters; replaced only if they mix letters and digits
+TOKENISH = re.compile(r"[A-Za-z0-9+/_-]{24,}={0,2}")
+WHITESPACE = re.compile(r"\s+")
+
+DYNAMIC = "\x00dyn"
+REFLECTED = "\x00ref"
+# Shorter values (``1``, ``id``) would also mask unrelated text, so they are left alone
+MIN_REFLECTION_LENGTH = 4
+# Tokens compared per response; the rest of very large pages is ignored
+MAX_TOKENS = 20_000
+# Unchanged tokens anchoring each side of a dynamic region
+CONTEXT_TOKENS = 4
+# Token-sequence similarity at or above which two responses count as the same page
+SIMILARITY_THRESHOLD = 0.98
+
+
+def _tokenish(match: re.Match) -> str:
+    text = match.group(0)
+    if any(c.isdigit() for c in text) and any(c.isalpha() for c in text):
+        return "\x00tok"
+    return text
+
+
+def tokenize(body: str) -> list[str]:
+    """Tag and word tokens of ``body`` with per-request values normalized."""
+    body = UUID.sub("\x00uuid", body)
+    body = LONG_HEX.sub("\x00hex", body)
+    body = EPOCH.sub("\x00epoch", body)
+    body = CLOCK.sub("\x00clock", body)
+    body = TOKENISH.sub(_tokenish, body)
+    tokens = TOKEN.findall(body)[:MAX_TOKENS]
+    return [WHITESPACE.sub(" ", token) if token[0] == "<" else token for token in tokens]
+
+
+def mask_reflections(body: str, values: Iterable[str]) -> str:
+    """Replace ``values`` echoed in ``body`` (raw, URL- or HTML-encoded) with a placeholder token."""
+    forms = set()
+    for value in values:
+        if len(value) >= MIN_REFLECTION_LENGTH:
+            forms.update((value, html.escape(value), html.escape(value, quote=False), quote(value), quote_plus(value)))
+    for form in sorted(forms, key=len, reverse=True):
+        body = body.replace(form, f" {REFLECTED} ")
+    return body
+
+
+def similarity(a: list[str], b: list[str]) -> float:
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def similar(a: list[str], b: list[str], threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    """``similarity(a, b) >= threshold``, rejecting early on the cheap upper bounds."""
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    return (
+        matcher.real_quick_ratio() >= threshold
+        and matcher.quick_ratio() >= threshold
+        and matcher.ratio() >= threshold
+    )
+
+
+def _find(tokens: list[str], needle: tuple[str, ...], start: int) -> int:
+    first = needle[0]
+    while True:
+        try:
+            index = tokens.index(first, start)
+        except ValueError:
+            return -1
+        if tuple(tokens[index:index + len(needle)]) == needle:
+            return index
+        start = index + 1
+
+
+class DynamicMask:
+    """Regions of an endpoint's response that change between identical requests.
+
+    Each region is stored as the unchanged tokens before and after it plus
+    the longest span it had; applying the mask replaces whatever sits
+    between those anchors with one placeholder token.
+    """
+
+    __slots__ = ("markers",)
+
+    def __init__(self, markers: list[tuple[tuple[str, ...], tuple[str, ...], int]]):
+        self.markers = markers
+
+    @classmethod
+    def learn(cls, first: list[str], second: list[str]) -> "DynamicMask":
+        regions: list[list[int]] = []  # [start, end, span] in ``first``
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, first, second).get_opcodes():
+            if tag == "equal":
+                continue
+            span = max(i2 - i1, j2 - j1)
+            # Regions closer than the anchor width share anchors; treat them as one
+            if regions and i1 - regions[-1][1] < CONTEXT_TOKENS:
+                regions[-1][2] += (i1 - regions[-1][1]) + span
+                regions[-1][1] = i2
+            else:
+                regions.append([i1, i2, span])
+        return cls([
+            (tuple(first[max(0, i1 - CONTEXT_TOKENS):i1]), tuple(first[i2:i2 + CONTEXT_TOKENS]), span)
+            for i1, i2, span in regions
+        ])
+
+    def apply(self, tokens: list[str]) -> list[str]:
+        masked: list[str] = []
+        pos = 0
+        for prefix, suffix, span in self.markers:
+            start = _find(tokens, prefix, pos) if prefix else pos
+            if start < 0:
+                continue
+            start += len(prefix)
+            end = _find(tokens, suffix, start) if suffix else len(tokens)
+            # Anchors that matched the wrong place would mask real content
+            if end < 0 or end - start > span * 2 + 16:
+                continue
+            masked.extend(tokens[pos:start])
+            masked.append(DYNAMIC)
+            pos = end
+        masked.extend(tokens[pos:])
+        return masked
+
+
+class ResponseProfile:
+    """Token fingerprint of an endpoint's normal response, cached with its ``Baseline``.
+
+    Until ``learn`` has seen a second fetch, responses are compared with
+    only the per-request values normalized.
+    """
+
+    __slots__ = ("body", "tokens", "mask")
+
+    def __init__(self, body: str):
+        self.body = body
+        self.tokens = tokenize(body)
+        self.mask: DynamicMask | None = None
+
+    @property
+    def learned(self) -> bool:
+        return self.mask is not None
+
+    def learn(self, second_body: str) -> None:
+        """Learn the dynamic regions from a second fetch of the same URL (first one wins)."""
+        if self.mask is None:
+            self.mask = DynamicMask.learn(self.tokens, tokenize(second_body))
+
+    def _masked(self, tokens: list[str]) -> list[str]:
+        return self.mask.apply(tokens) if self.mask is not None else tokens
+
+    def _pair(self, body: str, other: str | None, reflected: tuple[str, ...]) -> tuple[list[str], list[str]]:
+        if reflected:
+            reference = tokenize(mask_reflections(self.body if other is None else other, reflected))
+            body = mask_reflections(body, reflected)
+        else:
+            reference = self.tokens if other is None else tokenize(other)
+        return self._masked(reference), self._masked(tokenize(body))
+
+    def similar(self, body: str, other: str | None = None, reflected: tuple[str, ...] = ()) -> bool:
+        """Whether ``body`` and ``other`` (default: the profiled response) are the same page outside the dynamic regions.
+
+        Occurrences of the ``reflected`` values are masked in both first.
+        """
+        return similar(*self._pair(body, other, reflected))
+
+    def similarity(self, body: str, other: str | None = None, reflected: tuple[str, ...] = ()) -> float:
+        return similarity(*self._pair(body, other, reflected))
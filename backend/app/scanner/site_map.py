@@ -0,0 +1,82 @@
+"""Serialized crawl results (site maps) that later scans of the same target can reuse."""
+import hashlib
+import json
+import zlib
+
+from app.scanner.crawler import CrawledPage
+from app.scanner.page_analysis import FormData
+from app.scanner.urls import canonical_url
+
+# Bump when the payload layout changes; older artifacts are then ignored
+SITE_MAP_FORMAT = 1
+
+
+def site_map_target_key(target_url: str) -> str:
+    target = canonical_url(target_url)
+    return f"{target.scheme}://{target.netloc.lower()}"
+
+
+def site_map_scope_key(target_url: str, config: dict | None) -> str:
+    """Hash of everything that changes what a crawl can see.
+
+    Custom headers (cookies, tokens) are part of the key, so an authenticated
+    crawl is only ever reused by scans sending the same credentials.
+    """
+    config = config or {}
+    material = json.dumps(
+        {
+            "target": canonical_url(target_url).normalized,
+            "include_subdomains": bool(config.get("include_subdomains", False)),
+            "exclude_patterns": sorted(config.get("exclude_patterns") or []),
+            "custom_headers": sorted((config.get("custom_headers") or {}).items()),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def encode_site_map(pages: list[CrawledPage]) -> bytes:
+    """Compressed JSON of the pages: metadata, bodies, forms and the link graph.
+
+    Pages are compressed one at a time, so only one decoded body is held at once.
+    """
+    compressor = zlib.compressobj(6)
+    chunks = [compressor.compress(f'{{"format": {SITE_MAP_FORMAT}, "pages": ['.encode())]
+    for i, p in enumerate(pages):
+        record = json.dumps({
+            "url": p.url,
+            "status_code": p.status_code,
+            "headers": p.headers,
+            "body": p.body,
+            "forms": [[f.action, f.method, f.inputs] for f in p.forms],
+            "links": p.links,
+            "template": p.template,
+            "content_hash": p.content_hash,
+            "simhash": p.simhash,
+        })
+        p.release()  # bodies held in a PageStore go back to it
+        chunks.append(compressor.compress(((", " if i else "") + record).encode()))
+    chunks.append(compressor.compress(b"]}"))
+    chunks.append(compressor.flush())
+    return b"".join(chunks)
+
+
+def decode_site_map(payload: bytes) -> list[CrawledPage] | None:
+    """Pages stored in ``payload``, or None if it was written in another format."""
+    data = json.loads(zlib.decompress(payload))
+    if data.get("format") != SITE_MAP_FORMAT:
+        return None
+    return [
+        CrawledPage(
+            url=r["url"],
+            status_code=r["status_code"],
+            headers=r["headers"],
+            body=r["body"],
+            forms=[FormData(action=a, method=m, inputs=inputs) for a, m, inputs in r["forms"]],
+            links=r["links"],
+            template=r["template"],
+            content_hash=r["content_hash"],
+            simhash=r["simhash"],
+        )
+        for r in data["pages"]
+    ]
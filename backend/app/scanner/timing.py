@@ -0,0 +1,196 @@
+"""Statistical time-based blind detection shared by injection modules.
+
+Latency is measured from ``response.elapsed`` (time on the wire, so throttle
+waits don't count). Each endpoint gets a small baseline sample; a payload is
+only suspicious when a short delay pushes the response both well past the
+baseline's spread (z-score) and by most of the requested delay, and it is
+only reported when doubling the delay roughly doubles the slowdown.
+
+Parameters are probed concurrently, so on a target that serves one request
+at a time a real sleep in one parameter slows its neighbours' probes too.
+Every candidate is therefore confirmed once more on its own, with nothing
+else in flight for the endpoint, before it is reported.
+"""
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from app.config import settings
+from app.scanner.batching import Sender
+
+# Jitter assumed at least this large, so a very steady baseline can't inflate z-scores
+MIN_STDEV = 0.05
+# Share of the requested delay that must show up as extra latency
+DELAY_TOLERANCE = 0.8
+
+
+@dataclass(frozen=True, slots=True)
+class TimePayload:
+    """Payload template: ``{delay}`` is the sleep in seconds, ``{ping}`` the matching ping count."""
+
+    template: str
+    label: str = ""
+
+    def render(self, delay: int) -> str:
+        return self.template.format(delay=delay, ping=delay + 1)
+
+
+@dataclass(slots=True)
+class LatencyBaseline:
+    samples: list[float]
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples) if self.samples else 0.0
+
+    @property
+    def stdev(self) -> float:
+        spread = statistics.pstdev(self.samples) if len(self.samples) > 1 else 0.0
+        return max(spread, MIN_STDEV)
+
+    def z_score(self, latency: float) -> float:
+        return (latency - self.mean) / self.stdev
+
+    def describe(self) -> str:
+        return f"{self.mean:.2f}s ± {self.stdev:.2f}s over {len(self.samples)} request(s)"
+
+
+@dataclass(slots=True)
+class TimingHit:
+    param: str
+    payload: TimePayload
+    url: str
+    baseline: LatencyBaseline
+    delay: int
+    latency: float  # with ``delay``
+    confirm_latency: float  # with ``2 * delay``
+
+    @property
+    def rendered(self) -> str:
+        return self.payload.render(self.delay)
+
+    def evidence(self) -> list[dict]:
+        return [
+            {"type": "payload", "title": "Payload", "content": self.rendered},
+            {"type": "log", "title": "Baseline Latency", "content": self.baseline.describe()},
+            {
+                "type": "log",
+                "title": "Response Time",
+                "content": (
+                    f"{self.latency:.2f}s with {self.delay}s delay (z={self.baseline.z_score(self.latency):.1f}), "
+                    f"{self.confirm_latency:.2f}s with {2 * self.delay}s delay"
+                ),
+            },
+        ]
+
+
+def response_latency(response, started: float) -> float:
+    """``response.elapsed`` when httpx recorded it, else wall time since ``started`` (monotonic)."""
+    elapsed = getattr(response, "elapsed", None)
+    if isinstance(elapsed, timedelta):
+        return elapsed.total_seconds()
+    return time.monotonic() - started
+
+
+async def _timed(send: Sender, injected: dict[str, str]) -> tuple[float, str]:
+    started = time.monotonic()
+    response, url = await send(injected)
+    return response_latency(response, started), url
+
+
+async def sample_baseline(send: Sender, samples: int) -> LatencyBaseline:
+    """Latency of the unmodified request, ``samples`` times."""
+    latencies = []
+    for _ in range(max(samples, 1)):
+        try:
+            latency, _ = await _timed(send, {})
+        except Exception:
+            continue
+        latencies.append(latency)
+    return LatencyBaseline(latencies)
+
+
+def _delayed(baseline: LatencyBaseline, latency: float, delay: float, z_threshold: float) -> bool:
+    return (
+        latency - baseline.mean >= delay * DELAY_TOLERANCE
+        and baseline.z_score(latency) >= z_threshold
+    )
+
+
+async def probe_param(
+    send: Sender,
+    param: str,
+    payloads: list[TimePayload],
+    baseline: LatencyBaseline,
+    delay: int,
+    z_threshold: float,
+) -> TimingHit | None:
+    """First payload whose delay shows up, and scales, on ``param``."""
+    for payload in payloads:
+        try:
+            latency, url = await _timed(send, {param: payload.render(delay)})
+        except Exception:
+            continue
+        if not _delayed(baseline, latency, delay, z_threshold):
+            continue
+        # Confirm: twice the delay must give about twice the slowdown
+        try:
+            confirm_latency, _ = await _timed(send, {param: payload.render(2 * delay)})
+        except Exception:
+            continue
+        if _delayed(baseline, confirm_latency, 2 * delay, z_threshold):
+            return TimingHit(param, payload, url, baseline, delay, latency, confirm_latency)
+    return None
+
+
+async def confirm_isolated(send: Sender, hit: TimingHit, z_threshold: float) -> TimingHit | None:
+    """Re-send ``hit``'s doubled delay alone; ``None`` unless it still shows up."""
+    try:
+        confirm_latency, _ = await _timed(send, {hit.param: hit.payload.render(2 * hit.delay)})
+    except Exception:
+        return None
+    if not _delayed(hit.baseline, confirm_latency, 2 * hit.delay, z_threshold):
+        return None
+    return TimingHit(hit.param, hit.payload, hit.url, hit.baseline, hit.delay, hit.latency, confirm_latency)
+
+
+async def detect_time_based(
+    send: Sender,
+    params: list[str],
+    payloads: list[TimePayload],
+    delay: int | None = None,
+    concurrency: int | None = None,
+    baseline: LatencyBaseline | None = None,
+) -> dict[str, TimingHit]:
+    """Time-based blind hits by parameter.
+
+    One latency baseline is used for the endpoint (sampled here unless
+    ``baseline`` is given); the parameters are then probed concurrently (the
+    HTTP client's throttle still spaces the requests, but one parameter's
+    sleep no longer blocks the others). With more than one parameter, each
+    candidate is re-confirmed sequentially once all probes have finished.
+    """
+    if not params:
+        return {}
+    delay = delay or settings.SCANNER_TIME_PROBE_DELAY
+    if baseline is None:
+        baseline = await sample_baseline(send, settings.SCANNER_TIME_BASELINE_SAMPLES)
+    if not baseline.samples:
+        return {}
+    semaphore = asyncio.Semaphore(max(concurrency or settings.SCANNER_CONCURRENCY, 1))
+
+    async def run(param: str) -> TimingHit | None:
+        async with semaphore:
+            return await probe_param(send, param, payloads, baseline, delay, settings.SCANNER_TIME_Z_THRESHOLD)
+
+    candidates = [hit for hit in await asyncio.gather(*(run(param) for param in params)) if hit is not None]
+    if len(params) == 1:
+        return {hit.param: hit for hit in candidates}
+    hits = {}
+    for candidate in candidates:
+        hit = await confirm_isolated(send, candidate, settings.SCANNER_TIME_Z_THRESHOLD)
+        if hit is not None:
+            hits[hit.param] = hit
+    return hits
@@ -0,0 +1,73 @@
+"""URL template learning: collapse /product/123, /product/124 ... into one pattern."""
+import re
+from collections import defaultdict
+from urllib.parse import parse_qsl
+
+from app.scanner.urls import canonical_url
+
+NUMERIC = re.compile(r"^-?\d+$")
+UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+HEX_ID = re.compile(r"^(?=.*\d)[0-9a-f]{16,}$", re.I)  # hashes, Mongo ObjectIds
+DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+SLUG_WITH_ID = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*-\d+$", re.I)  # blue-shirt-123
+
+
+def classify_segment(segment: str) -> str:
+    """Replace an identifier-like path segment with its class; keep literal segments."""
+    if NUMERIC.match(segment):
+        return "{int}"
+    if UUID.match(segment):
+        return "{uuid}"
+    if HEX_ID.match(segment):
+        return "{hex}"
+    if DATE.match(segment):
+        return "{date}"
+    if SLUG_WITH_ID.match(segment):
+        return "{slug}"
+    return segment
+
+
+def classify_value(value: str) -> str:
+    """Class of a query parameter value. Values never stay literal."""
+    if not value:
+        return "{empty}"
+    segment_class = classify_segment(value)
+    return segment_class if segment_class != value else "{str}"
+
+
+def url_template(url: str) -> str:
+    """Structural template of ``url``: host, classified path and sorted param classes."""
+    parsed = canonical_url(url)
+    host = parsed.hostname
+    path = "/".join(classify_segment(seg) for seg in parsed.path.rstrip("/").split("/")) or "/"
+    params = sorted({(k, classify_value(v)) for k, v in parse_qsl(parsed.query, keep_blank_values=True)})
+    query = "&".join(f"{k}={v}" for k, v in params)
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+class TemplateQuota:
+    """Caps how many URLs of the same template the crawler may enqueue."""
+
+    def __init__(self, per_template: int = 5):
+        self.per_template = per_template
+        self._counts: dict[str, int] = defaultdict(int)
+
+    def is_new(self, url: str) -> bool:
+        return url_template(url) not in self._counts
+
+    def allow(self, url: str) -> bool:
+        """Consume one slot of the URL's template; False once the quota is spent."""
+        template = url_template(url)
+        if self._counts[template] >= self.per_template:
+            return False
+        self._counts[template] += 1
+        return True
+
+    def release(self, url: str) -> None:
+        """Give back a slot ``allow`` took for a URL that was not enqueued after all."""
+        template = url_template(url)
+        if self._counts.get(template, 0) > 0:
+            self._counts[template] -= 1
+
+    def __len__(self) -> int:
+        return len(self._counts)
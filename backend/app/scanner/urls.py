@@ -0,0 +1,136 @@
+"""Interned canonical URLs: each distinct URL string is parsed once per process."""
+import itertools
+from functools import lru_cache
+from urllib.parse import parse_qs, quote_plus, urlencode, urlsplit, urlunparse
+
+# Upper bound on interned URLs; least recently used entries are dropped beyond it
+INTERN_CACHE_SIZE = 131_072
+
+_scope_tokens = itertools.count(1)
+
+
+def next_scope_token() -> int:
+    """Unique id for a scope configuration, used to key cached scope verdicts."""
+    return next(_scope_tokens)
+
+
+class CanonicalUrl:
+    """Parsed view of a URL string with its normalized form and a cached scope verdict.
+
+    Attribute names mirror ``urllib.parse.ParseResult`` so it can stand in for
+    ``urlparse()`` results. Obtain instances through ``canonical_url`` so the
+    same string always maps to the same object.
+    """
+
+    __slots__ = (
+        "raw", "scheme", "netloc", "hostname", "port", "path", "query", "fragment",
+        "_normalized", "_query_params", "_query_template", "_scope_token", "_scope_verdict",
+    )
+
+    def __init__(self, raw: str):
+        parts = urlsplit(raw)
+        self.raw = raw
+        self.scheme = parts.scheme.lower()
+        self.netloc = parts.netloc
+        self.hostname = (parts.hostname or "").lower()
+        try:
+            self.port = parts.port
+        except ValueError:
+            self.port = None
+        self.path = parts.path
+        self.query = parts.query
+        self.fragment = parts.fragment
+        self._normalized: str | None = None
+        self._query_params: dict[str, list[str]] | None = None
+        self._query_template: QueryTemplate | None = None
+        self._scope_token = 0
+        self._scope_verdict = False
+
+    @property
+    def normalized(self) -> str:
+        """Dedup key: lowercase scheme/host, no default port, sorted query, no fragment or trailing slash."""
+        if self._normalized is None:
+            port = self.port
+            if (self.scheme == "http" and port == 80) or (self.scheme == "https" and port == 443):
+                port = None
+            netloc = f"{self.hostname}:{port}" if port else self.hostname
+            query_params = parse_qs(self.query, keep_blank_values=True)
+            sorted_query = urlencode(sorted(query_params.items()), doseq=True)
+            path = self.path.rstrip("/") or "/"
+            self._normalized = urlunparse((self.scheme, netloc, path, "", sorted_query, ""))
+        return self._normalized
+
+    @property
+    def query_params(self) -> dict[str, list[str]]:
+        """``parse_qs`` of the query string (blank values dropped). Treat as read-only."""
+        if self._query_params is None:
+            self._query_params = parse_qs(self.query)
+        return self._query_params
+
+    def with_query(self, params: dict) -> str:
+        """This URL with its query replaced by ``params`` and the fragment dropped."""
+        return urlunparse((self.scheme, self.netloc, self.path, "", urlencode(params), ""))
+
+    @property
+    def query_template(self) -> "QueryTemplate":
+        """Pre-encoded template of this URL's query, for injecting into its parameters."""
+        if self._query_template is None:
+            self._query_template = QueryTemplate(self)
+        return self._query_template
+
+    def scope_verdict(self, token: int) -> bool | None:
+        return self._scope_verdict if self._scope_token == token else None
+
+    def set_scope_verdict(self, token: int, verdict: bool) -> None:
+        self._scope_token = token
+        self._scope_verdict = verdict
+
+    def __str__(self) -> str:
+        return self.raw
+
+    def __repr__(self) -> str:
+        return f"CanonicalUrl({self.raw!r})"
+
+
+class QueryTemplate:
+    """A URL's query with every original ``name=value`` pair encoded once.
+
+    ``render`` only encodes the injected values, giving the same string as
+    ``with_query`` over the first value of each parameter with some overridden.
+    """
+
+    __slots__ = ("prefix", "names", "pairs", "base")
+
+    def __init__(self, url: CanonicalUrl):
+        self.prefix = urlunparse((url.scheme, url.netloc, url.path, "", "", ""))
+        self.names = list(url.query_params)
+        self.pairs = [f"{quote_plus(name)}={quote_plus(values[0])}" for name, values in url.query_params.items()]
+        self.base = self._join(self.pairs)
+
+    def _join(self, pairs: list[str]) -> str:
+        return f"{self.prefix}?{'&'.join(pairs)}" if pairs else self.prefix
+
+    def render(self, injected: dict[str, str]) -> str:
+        if not injected:
+            return self.base
+        pairs = [
+            f"{quote_plus(name)}={quote_plus(injected[name])}" if name in injected else pair
+            for name, pair in zip(self.names, self.pairs)
+        ]
+        # Injected names the URL didn't have are appended, as a dict merge would
+        pairs.extend(f"{quote_plus(k)}={quote_plus(v)}" for k, v in injected.items() if k not in self.names)
+        return self._join(pairs)
+
+
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def canonical_url(url: str) -> CanonicalUrl:
+    return CanonicalUrl(url)
+
+
+def request_hostname(url: str) -> str:
+    """Lowercased hostname of ``url`` without interning it.
+
+    For per-request bookkeeping (throttle, circuit breaker): probe URLs are
+    one-shot and would only push crawl URLs out of the intern cache.
+    """
+    return (urlsplit(url).hostname or "").lower()
@@ -28,6 +28,7 @@ class VulnerabilityResponse(BaseModel):
     cwe_id: str
     affected_url: str
     affected_parameter: str | None
+    affected_urls: list[str] | None = None
     description: str
     remediation: str
     confidence: str
@@ -26,6 +26,7 @@ class ScanResponse(BaseModel):
     started_at: datetime | None
     completed_at: datetime | None
     error_message: str | None
+    stats: dict | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -51,6 +51,7 @@ def generate_pdf(self, scan_id: str) -> dict:
                 "cwe_id": v.cwe_id,
                 "affected_url": v.affected_url,
                 "affected_parameter": v.affected_parameter,
+                "affected_urls": v.affected_urls or [],
                 "description": v.description,
                 "remediation": v.remediation,
                 "confidence": v.confidence,
@@ -0,0 +1,90 @@
+from app.scanner.aggregation import FingerprintMemo, aggregate_findings, header_fingerprint
+from app.scanner.crawler import CrawledPage
+from app.scanner.modules.base import Finding
+from app.scanner.modules.cookie_security import CookieSecurityModule
+from app.scanner.modules.security_headers import SecurityHeadersModule
+
+
+def make_finding(url: str, vuln_type: str = "Missing Security Header: CSP", fingerprint: str | None = "fp") -> Finding:
+    return Finding(
+        module_name="security_headers", vuln_type=vuln_type, severity="medium", cvss_score=5.4,
+        cvss_vector="", owasp_category="A05", cwe_id="CWE-16", affected_url=url,
+        affected_parameter=None, description="Missing CSP.", remediation="", fingerprint=fingerprint,
+    )
+
+
+def page(url: str, headers: dict) -> CrawledPage:
+    return CrawledPage(url, 200, headers, "<html></html>")
+
+
+def test_header_fingerprint_ignores_order():
+    assert header_fingerprint([("a", "1"), ("b", "2")]) == header_fingerprint([("b", "2"), ("a", "1")])
+    assert header_fingerprint([("a", "1")]) != header_fingerprint([("a", "2")])
+
+
+def test_memo_evaluates_once_per_fingerprint():
+    calls = []
+
+    def evaluate():
+        calls.append(1)
+        return [make_finding("https://example.com/a", fingerprint=None)]
+
+    memo = FingerprintMemo()
+    first = memo.findings_for("fp1", "https://example.com/a", evaluate)
+    second = memo.findings_for("fp1", "https://example.com/b", evaluate)
+    assert len(calls) == 1
+    assert memo.hits == 1
+    assert second[0].affected_url == "https://example.com/b"
+    assert first[0].fingerprint == second[0].fingerprint == "fp1"
+
+
+class TestAggregateFindings:
+    def test_site_wide_finding_becomes_one_with_url_list(self):
+        findings = [make_finding(f"https://example.com/page/{i}") for i in range(100)]
+        findings.append(make_finding("https://example.com/"))
+        aggregated = aggregate_findings(findings)
+        assert len(aggregated) == 1
+        assert aggregated[0].affected_url == "https://example.com/"
+        assert len(aggregated[0].affected_urls) == 101
+        assert "Seen on 101 pages" in aggregated[0].description
+
+    def test_unfingerprinted_and_distinct_findings_are_kept(self):
+        findings = [
+            make_finding("https://example.com/a", fingerprint=None),
+            make_finding("https://example.com/b", fingerprint=None),
+            make_finding("https://example.com/a", vuln_type="Missing Security Header: HSTS"),
+            make_finding("https://example.com/a", fingerprint="other"),
+        ]
+        aggregated = aggregate_findings(findings)
+        assert [f.affected_url for f in aggregated] == [f.affected_url for f in findings]
+        assert all(f.affected_urls == [] for f in aggregated)
+
+    def test_url_list_is_capped(self):
+        findings = [make_finding(f"https://example.com/{i:03}") for i in range(20)]
+        aggregated = aggregate_findings(findings, max_urls=5)
+        assert len(aggregated[0].affected_urls) == 5
+        assert "Seen on 20 pages" in aggregated[0].description
+
+
+def test_missing_header_aggregates_across_different_header_sets():
+    module = SecurityHeadersModule()
+    findings = module.detect(page("https://example.com/", {"x-frame-options": "DENY", "date": "Mon"}))
+    findings += module.detect(page("https://example.com/a", {"x-frame-options": "DENY", "date": "Tue"}))
+    findings += module.detect(page("https://example.com/b", {"server": "nginx"}))
+    assert module._memo.hits == 1  # the Date header doesn't change the evaluation
+    csp = [f for f in aggregate_findings(findings) if f.vuln_type == "Missing Security Header: Content-Security-Policy"]
+    assert len(csp) == 1
+    assert csp[0].affected_urls == ["https://example.com/", "https://example.com/a", "https://example.com/b"]
+    assert "date" not in csp[0].evidence[0]["content"]
+
+
+def test_cookie_findings_ignore_cookie_values():
+    module = CookieSecurityModule()
+    findings = module.detect(page("https://example.com/", {"set-cookie": "sid=abc; Path=/"}))
+    findings += module.detect(page("https://example.com/a", {"set-cookie": "sid=secure-xyz; Path=/"}))
+    assert module._memo.hits == 1
+    aggregated = aggregate_findings(findings)
+    assert sorted(f.vuln_type for f in aggregated) == [
+        "Cookie Missing HttpOnly Flag", "Cookie Missing SameSite Attribute", "Cookie Missing Secure Flag",
+    ]
+    assert all(f.affected_urls == ["https://example.com/", "https://example.com/a"] for f in aggregated)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.scanner.baselines import BaselineService
+from app.scanner.fingerprint import structure_hash
+
+
+def make_client(text: str = "<html><p>ok</p></html>", status_code: int = 200):
+    response = MagicMock()
+    response.text = text
+    response.status_code = status_code
+    response.elapsed = timedelta(seconds=0.25)
+    client = MagicMock()
+    client.get = AsyncMock(return_value=response)
+    return client
+
+
+class TestBaselineService:
+    @pytest.mark.asyncio
+    async def test_fetched_once_per_normalized_url(self):
+        service = BaselineService()
+        client = make_client()
+        first = await service.get(client, "https://Example.com/item?b=2&a=1")
+        second = await service.get(client, "https://example.com/item?a=1&b=2")
+        assert first is second
+        assert client.get.await_count == 1
+        assert (first.status_code, first.length) == (200, len("<html><p>ok</p></html>"))
+        assert service.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_timing_samples_topped_up_on_demand(self):
+        service = BaselineService()
+        client = make_client()
+        await service.get(client, "https://example.com/")
+        baseline = await service.get(client, "https://example.com/", samples=3)
+        assert baseline.latency.samples == [0.25, 0.25, 0.25]
+        assert client.get.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unreachable_url(self):
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=Exception("boom"))
+        assert await BaselineService().get(client, "https://example.com/") is None
+
+    @pytest.mark.asyncio
+    async def test_modules_share_one_baseline(self):
+        from app.scanner.crawler import CrawledPage
+        from app.scanner.modules.idor import IdorModule
+        from app.scanner.modules.ssti import SstiModule
+
+        service = BaselineService()
+        page = CrawledPage(url="https://example.com/orders?id=7", status_code=200, headers={}, body="", forms=[])
+        client = make_client()
+        for module in (SstiModule(), IdorModule()):
+            module.baselines = service
+            await module.active_test_async(page, client)
+        urls = [call.args[0] for call in client.get.await_args_list]
+        assert urls.count(page.url) == 1
+
+
+def test_structure_hash_ignores_text():
+    assert structure_hash("<ul><li>a</li></ul>") == structure_hash("<UL><li>b</li></UL>")
+    assert structure_hash("<ul><li>a</li></ul>") != structure_hash("<ul><li>a</li><li>b</li></ul>")
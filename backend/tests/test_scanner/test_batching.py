@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.scanner.batching import inject_batched
+
+
+class FakeTarget:
+    """Reflects a marker for every vulnerable parameter that received a payload."""
+
+    def __init__(self, vulnerable: set[str]):
+        self.vulnerable = vulnerable
+        self.requests: list[dict[str, str]] = []
+
+    async def send(self, injected: dict[str, str]):
+        self.requests.append(injected)
+        text = " ".join(f"ERR[{name}]" for name in injected if name in self.vulnerable and "'" in injected[name])
+        return SimpleNamespace(text=text), f"/?{sorted(injected)}"
+
+
+def sql_error(response, payload):
+    return "ERR[" in response.text
+
+
+class TestInjectBatched:
+    @pytest.mark.asyncio
+    async def test_clean_params_cost_one_request_per_batch(self):
+        target = FakeTarget(set())
+        params = [f"p{i}" for i in range(16)]
+        hits = await inject_batched(params, ["'", "\""], target.send, sql_error, batch_size=8)
+        assert hits == {}
+        assert len(target.requests) == 4  # 2 payloads x 2 batches
+
+    @pytest.mark.asyncio
+    async def test_bisects_to_every_vulnerable_param(self):
+        target = FakeTarget({"p2", "p6"})
+        params = [f"p{i}" for i in range(8)]
+        hits = await inject_batched(params, ["\"", "'"], target.send, sql_error, batch_size=8)
+        assert set(hits) == {"p2", "p6"}
+        assert hits["p2"].payload == "'"
+        assert hits["p2"].url == "/?['p2']"
+        # Hits are not probed again; per-param testing would have sent 16 requests
+        assert len(target.requests) < 16
+
+    @pytest.mark.asyncio
+    async def test_first_only_and_confirm(self):
+        target = FakeTarget({"a", "b"})
+        hits = await inject_batched(
+            ["a", "b", "c"], ["'"], target.send, sql_error,
+            confirm=lambda r, p: "ERR[b]" in r.text, first_only=True,
+        )
+        assert list(hits) == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_batch_size_one_tests_params_individually(self):
+        target = FakeTarget({"b"})
+        hits = await inject_batched(["a", "b"], ["'"], target.send, sql_error, batch_size=1)
+        assert list(hits) == ["b"]
+        assert target.requests == [{"a": "'"}, {"b": "'"}]
@@ -0,0 +1,153 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.scanner.budget import BudgetedClient, BudgetExceeded, ModuleBudgets
+from app.scanner.insertion_points import InsertionPoint, InsertionPointRegistry
+
+
+def make_client():
+    client = MagicMock()
+    client.get = AsyncMock(return_value=MagicMock(text="ok"))
+    client.client = MagicMock()
+    client.client.request = AsyncMock(return_value=MagicMock(text="ok"))
+    return client
+
+
+async def probe_everything(client, count: int = 10) -> list:
+    """Module-style loop: request errors just skip the probe."""
+    findings = []
+    for i in range(count):
+        try:
+            await client.get(f"https://example.com/?p={i}")
+        except Exception:
+            continue
+        findings.append(i)
+    return findings
+
+
+class TestBudgetedClient:
+    @pytest.mark.asyncio
+    async def test_raw_client_requests_count_too(self):
+        client = BudgetedClient(make_client(), max_requests=2)
+        await client.get("https://example.com/")
+        await client.client.request("GET", "https://example.com/", follow_redirects=False)
+        with pytest.raises(Exception):
+            await client.client.post("https://example.com/")
+        assert client.requests == 2
+        assert client.exhausted
+
+
+class TestModuleBudgets:
+    @pytest.mark.asyncio
+    async def test_request_budget_cuts_invocation_short(self):
+        budgets = ModuleBudgets(max_requests=3)
+        http_client = make_client()
+        findings = await budgets.run("sqli", "https://example.com/", http_client, probe_everything)
+        assert findings == [0, 1, 2]
+        assert http_client.get.await_count == 3
+        summary = budgets.summary()
+        assert summary["modules"]["sqli"]["request_budget_exhausted"] == 1
+        assert summary["exhausted"] == [
+            {"module": "sqli", "url": "https://example.com/", "reason": "requests", "insertion_points_released": 0},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_timeout_recorded_and_scan_continues(self):
+        budgets = ModuleBudgets(timeout=0.05)
+
+        async def stuck(client):
+            await asyncio.sleep(5)
+            return ["never"]
+
+        assert await budgets.run("sqli", "https://example.com/a", make_client(), stuck) == []
+        assert await budgets.run("xss", "https://example.com/a", make_client(), probe_everything) == list(range(10))
+        modules = budgets.summary()["modules"]
+        assert modules["sqli"]["timeouts"] == 1
+        assert modules["xss"] == {**modules["xss"], "invocations": 1, "requests": 10, "timeouts": 0}
+
+
+def point(name: str) -> InsertionPoint:
+    return InsertionPoint("GET", "https://example.com/search", name, "query")
+
+
+class TestInsertionPointRelease:
+    @pytest.mark.asyncio
+    async def test_timed_out_invocation_releases_its_claims(self):
+        registry = InsertionPointRegistry()
+        budgets = ModuleBudgets(timeout=0.05, insertion_points=registry)
+
+        async def claim_then_stall(client):
+            assert registry.claim("sqli", point("q"))
+            assert registry.claim("sqli", point("page"))
+            await asyncio.sleep(5)
+            return []
+
+        await budgets.run("sqli", "https://example.com/search?q=a&page=1", make_client(), claim_then_stall)
+        assert registry.claim("sqli", point("q"))  # a later page attacks it again
+        summary = budgets.summary()
+        assert summary["insertion_points_released"] == 2
+        assert summary["modules"]["sqli"]["insertion_points_released"] == 2
+        assert summary["exhausted"][0]["insertion_points_released"] == 2
+
+    @pytest.mark.asyncio
+    async def test_exhausted_request_budget_releases_claims(self):
+        registry = InsertionPointRegistry()
+        budgets = ModuleBudgets(max_requests=3, insertion_points=registry)
+
+        async def claim_and_probe(client):
+            registry.claim("sqli", point("q"))
+            return await probe_everything(client)
+
+        await budgets.run("sqli", "https://example.com/search?q=a", make_client(), claim_and_probe)
+        assert registry.released == 1
+        assert registry.claim("sqli", point("q"))
+
+    @pytest.mark.asyncio
+    async def test_failed_invocation_releases_claims_and_reraises(self):
+        registry = InsertionPointRegistry()
+        budgets = ModuleBudgets(insertion_points=registry)
+
+        async def claim_then_fail(client):
+            registry.claim("sqli", point("q"))
+            raise ValueError("parser bug")
+
+        with pytest.raises(ValueError):
+            await budgets.run("sqli", "https://example.com/search?q=a", make_client(), claim_then_fail)
+        assert registry.claim("sqli", point("q"))
+        summary = budgets.summary()
+        assert summary["modules"]["sqli"]["errors"] == 1
+        assert summary["exhausted"] == [{
+            "module": "sqli", "url": "https://example.com/search?q=a", "reason": "error",
+            "insertion_points_released": 1,
+        }]
+
+    @pytest.mark.asyncio
+    async def test_uncaught_budget_exceeded_releases_claims(self):
+        registry = InsertionPointRegistry()
+        budgets = ModuleBudgets(max_requests=1, insertion_points=registry)
+
+        async def claim_and_probe_without_catching(client):
+            registry.claim("sqli", point("q"))
+            for i in range(3):
+                await client.get(f"https://example.com/search?q={i}")
+            return []
+
+        with pytest.raises(BudgetExceeded):
+            await budgets.run("sqli", "https://example.com/search?q=a", make_client(), claim_and_probe_without_catching)
+        assert registry.released == 1
+        assert [e["reason"] for e in budgets.summary()["exhausted"]] == ["requests"]
+
+    @pytest.mark.asyncio
+    async def test_completed_invocation_keeps_claims(self):
+        registry = InsertionPointRegistry()
+        budgets = ModuleBudgets(timeout=5, max_requests=100, insertion_points=registry)
+
+        async def claim_and_probe(client):
+            registry.claim("sqli", point("q"))
+            return await probe_everything(client)
+
+        await budgets.run("sqli", "https://example.com/search?q=a", make_client(), claim_and_probe)
+        assert not registry.claim("sqli", point("q"))
+        assert budgets.summary()["insertion_points_released"] == 0
@@ -1,7 +1,13 @@
+import asyncio
+from types import SimpleNamespace
+
 import pytest
 
-from app.scanner.crawler import AsyncCrawler
+from app.scanner.crawler import AsyncCrawler, CrawledPage
+from app.scanner.fingerprint import content_hash, simhash
+from app.scanner.page_analysis import HtmlParsePool, PageAnalysis, extract_structure
 from app.scanner.scope import ScopeValidator
+from app.scanner.url_templates import TemplateQuota, url_template
 
 
 class TestScopeValidator:
@@ -65,3 +71,376 @@ class TestURLNormalization:
     def test_normalize_keeps_nondefault_port(self):
         result = AsyncCrawler._normalize("https://example.com:8080/page")
         assert ":8080" in result
+
+
+class TestPageAnalysis:
+    HTML = """
+        <html><head>
+          <link rel="stylesheet" href="http://example.com/style.css">
+          <script src="/app.js"></script>
+          <script>var x = location.hash;</script>
+        </head><body>
+          <a href="/about">About</a>
+          <a href="/about">About again</a>
+          <a href="#top">Top</a>
+          <img src="http://example.com/logo.png" srcset="/a.png 1x, /b.png 2x">
+          <form action="/login" method="post">
+            <input name="user"><input name="pass" type="password">
+          </form>
+        </body></html>
+    """
+
+    def make_page(self, **kwargs) -> CrawledPage:
+        defaults = {"url": "https://example.com/", "status_code": 200, "headers": {}, "body": self.HTML}
+        defaults.update(kwargs)
+        return CrawledPage(**defaults)
+
+    def test_analysis_is_cached(self):
+        page = self.make_page()
+        assert page.analysis is page.analysis
+        assert page.analysis.soup is page.analysis.soup
+
+    def test_links_deduplicated_and_absolute(self):
+        links = self.make_page().analysis.links
+        assert links.count("https://example.com/about") == 1
+        assert "https://example.com/login" in links
+        assert "https://example.com/b.png" in links
+        assert not any("#top" in link for link in links)
+
+    def test_forms_and_scripts(self):
+        analysis = self.make_page().analysis
+        assert len(analysis.forms) == 1
+        assert analysis.forms[0].method == "POST"
+        assert [i["name"] for i in analysis.forms[0].inputs] == ["user", "pass"]
+        assert analysis.scripts == ["/app.js"]
+        assert "location.hash" in analysis.inline_scripts[0]
+
+    def test_subresources_and_normalized_headers(self):
+        page = self.make_page(headers={"Set-Cookie": "sid=1", "X-Frame-Options": "DENY"})
+        assert "http://example.com/style.css" in page.analysis.subresources
+        assert "http://example.com/logo.png" in page.analysis.subresources
+        assert page.analysis.headers_lower["x-frame-options"] == "DENY"
+        assert page.analysis.set_cookies == ["sid=1"]
+
+
+class TestHtmlParsePool:
+    HTML = TestPageAnalysis.HTML
+
+    def test_extract_structure_matches_inline_analysis(self):
+        structure = extract_structure("https://example.com/", self.HTML.encode())
+        inline = PageAnalysis("https://example.com/", self.HTML, {})
+        assert structure.links == inline.links
+        assert structure.forms[0][0] == inline.forms[0].action
+
+    def test_small_pages_stay_inline(self):
+        pool = HtmlParsePool(workers=1, offload_threshold=10_000_000, use_processes=False)
+        try:
+            assert not pool.should_offload(len(self.HTML))
+        finally:
+            pool.close()
+
+    @pytest.mark.asyncio
+    async def test_offloaded_structure_primes_analysis(self):
+        pool = HtmlParsePool(workers=1, offload_threshold=0, use_processes=False)
+        try:
+            structure = await pool.parse("https://example.com/", self.HTML.encode())
+        finally:
+            pool.close()
+        analysis = PageAnalysis("https://example.com/", self.HTML, {})
+        analysis.prime(structure)
+        assert "soup" not in analysis.__dict__
+        assert "https://example.com/about" in analysis.links
+        assert analysis.forms[0].inputs[1]["type"] == "password"
+        assert "soup" not in analysis.__dict__
+
+    @pytest.mark.asyncio
+    async def test_crawler_fingerprints_offloaded_pages_in_pool(self, monkeypatch):
+        import app.scanner.crawler as crawler_module
+        on_loop = []
+        monkeypatch.setattr(crawler_module, "simhash", lambda body: on_loop.append(body) or 0)
+        monkeypatch.setattr(crawler_module, "content_hash", lambda body: on_loop.append(body) or "")
+        pool = HtmlParsePool(workers=1, offload_threshold=1000, use_processes=False)
+        big = self.HTML + "<p>filler</p>" * 200
+        site = {"/": (big + '<a href="/small">s</a>', 0.0), "/small": ("small page", 0.0)}
+        try:
+            crawler = AsyncCrawler(FakeSiteClient(site), ScopeValidator("https://example.com"), parse_pool=pool)
+            pages = {p.url: p for p in await asyncio.wait_for(crawler.crawl("https://example.com/"), timeout=5)}
+        finally:
+            pool.close()
+        root = pages["https://example.com/"]
+        assert root.content_hash == content_hash(root.body)
+        assert root.simhash == simhash(root.body)
+        assert "small page" in on_loop  # small pages are still hashed inline
+        assert root.body not in on_loop
+
+
+    @pytest.mark.asyncio
+    async def test_offloaded_page_hashed_from_client_decoded_text(self):
+        # The client resolved cp1252 without exposing a charset; the bytes are not valid UTF-8
+        text = self.HTML + "<p>Caf\u00e9 \u2013 \u201cquoted\u201d</p>" * 50
+        response = SimpleNamespace(
+            status_code=200, headers={"content-type": "text/html"},
+            text=text, content=text.encode("cp1252"), encoding=None,
+        )
+        client = SimpleNamespace(get=lambda url, **kwargs: asyncio.sleep(0, result=response))
+        pool = HtmlParsePool(workers=1, offload_threshold=0, use_processes=False)
+        try:
+            crawler = AsyncCrawler(client, ScopeValidator("https://example.com"), parse_pool=pool)
+            page, _ = await crawler._fetch_page("https://example.com/", 0)
+        finally:
+            pool.close()
+        assert page.content_hash == content_hash(text)
+        assert page.simhash == simhash(text)
+
+
+class FakeSiteClient:
+    """Serves a dict of path -> (html, delay) as an HttpClient stand-in."""
+
+    def __init__(self, site: dict[str, tuple[str, float]]):
+        self.site = site
+        self.requested: list[str] = []
+
+    async def get(self, url: str, **kwargs):
+        from urllib.parse import urlparse
+        self.requested.append(url)
+        path = urlparse(url).path or "/"
+        html, delay = self.site.get(path, ("not found", 0.0))
+        if delay:
+            await asyncio.sleep(delay)
+        return SimpleNamespace(
+            status_code=200 if path in self.site else 404,
+            headers={"content-type": "text/html"},
+            text=html,
+            content=html.encode(),
+            encoding="utf-8",
+        )
+
+
+class TestCrawlerWorkers:
+    def make_crawler(self, site, **kwargs) -> tuple[AsyncCrawler, FakeSiteClient]:
+        client = FakeSiteClient(site)
+        crawler = AsyncCrawler(client, ScopeValidator("https://example.com"), **kwargs)
+        return crawler, client
+
+    @pytest.mark.asyncio
+    async def test_crawl_follows_links_and_terminates(self):
+        site = {
+            "/": ('<a href="/a">a</a><a href="/b">b</a>', 0.0),
+            "/a": ('<a href="/c">c</a><a href="/">home</a>', 0.0),
+            "/b": ("leaf", 0.0),
+            "/c": ("leaf", 0.0),
+        }
+        crawler, _ = self.make_crawler(site, max_depth=5, max_pages=50)
+        pages = await asyncio.wait_for(crawler.crawl("https://example.com/"), timeout=5)
+        assert sorted(p.url for p in pages) == [
+            "https://example.com/", "https://example.com/a", "https://example.com/b", "https://example.com/c",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_crawl_uses_given_frontier(self):
+        from app.scanner.frontier import BloomFilter, make_frontier
+        site = {"/": ('<a href="/a">a</a>', 0.0), "/a": ("leaf", 0.0)}
+        # An empty frontier is falsy (it defines __len__); it must still be used
+        frontier = make_frontier(visited="bloom", expected_urls=1000)
+        assert not frontier
+        crawler, _ = self.make_crawler(site, max_depth=2, max_pages=10, frontier=frontier)
+        assert crawler.frontier is frontier
+        pages = await asyncio.wait_for(crawler.crawl("https://example.com/"), timeout=5)
+        assert len(pages) == 2
+        assert isinstance(frontier.seen, BloomFilter)
+        assert not frontier.seen.add("https://example.com/a")  # already recorded by the crawl
+
+    @pytest.mark.asyncio
+    async def test_max_pages_respected(self):
+        links = "".join(f'<a href="/p{i}">p</a>' for i in range(30))
+        site = {"/": (links, 0.0), **{f"/p{i}": ("leaf", 0.0) for i in range(30)}}
+        crawler, _ = self.make_crawler(site, max_depth=2, max_pages=5, concurrency=3)
+        pages = await asyncio.wait_for(crawler.crawl("https://example.com/"), timeout=5)
+        assert len(pages) == 5
+
+    @pytest.mark.asyncio
+    async def test_slow_page_does_not_block_other_slots(self):
+        site = {
+            "/": ('<a href="/slow">s</a><a href="/f1">1</a><a href="/f2">2</a>', 0.0),
+            "/slow": ("slow", 0.5),
+            "/f1": ('<a href="/f3">3</a>', 0.0),
+            "/f2": ("leaf", 0.0),
+            "/f3": ("leaf", 0.0),
+        }
+        crawler, _ = self.make_crawler(site, max_depth=5, max_pages=50, concurrency=2)
+        await asyncio.wait_for(crawler.crawl("https://example.com/"), timeout=5)
+        # /f1, /f2 and /f3 all complete on the free slot while /slow is in flight
+        assert [p.url for p in crawler.pages][-1] == "https://example.com/slow"
+
+
+class TestUrlTemplates:
+    def test_numeric_and_uuid_segments_collapse(self):
+        assert url_template("https://shop.com/product/123") == url_template("https://shop.com/product/124")
+        assert url_template("https://shop.com/u/3f2b8c1e-9d4a-4b7e-8f00-1a2b3c4d5e6f/edit") == "shop.com/u/{uuid}/edit"
+        assert url_template("https://shop.com/about") != url_template("https://shop.com/contact")
+
+    def test_query_values_are_classed(self):
+        a = url_template("https://shop.com/list?page=2&sort=price")
+        b = url_template("https://shop.com/list?sort=name&page=7")
+        assert a == b == "shop.com/list?page={int}&sort={str}"
+        assert url_template("https://shop.com/list?page=2") != a
+
+    def test_quota_limits_pages_per_template(self):
+        quota = TemplateQuota(per_template=2)
+        allowed = [quota.allow(f"https://shop.com/product/{i}") for i in range(5)]
+        assert allowed == [True, True, False, False, False]
+        assert quota.allow("https://shop.com/cart")
+
+    @pytest.mark.asyncio
+    async def test_crawler_spends_budget_on_distinct_templates(self):
+        links = "".join(f'<a href="/product/{i}">p</a>' for i in range(20)) + '<a href="/cart">c</a>'
+        site = {"/": (links, 0.0), "/cart": ("cart", 0.0), **{f"/product/{i}": ("item", 0.0) for i in range(20)}}
+        client = FakeSiteClient(site)
+        crawler = AsyncCrawler(
+            client, ScopeValidator("https://example.com"), max_depth=2, max_pages=50,
+            template_quota=TemplateQuota(per_template=2),
+        )
+        pages = await crawler.crawl("https://example.com/")
+        assert sum("/product/" in p.url for p in pages) == 2
+        assert any(p.url.endswith("/cart") for p in pages)
+
+    def test_frontier_rejection_returns_quota_slot(self):
+        crawler = AsyncCrawler(
+            FakeSiteClient({}), ScopeValidator("https://example.com"), template_quota=TemplateQuota(per_template=1),
+        )
+        push = crawler.frontier.push
+        crawler.frontier.push = lambda *args, **kwargs: False
+        assert not crawler._enqueue("https://example.com/product/1", 1)
+        crawler.frontier.push = push
+        assert crawler._enqueue("https://example.com/product/2", 1)
+        assert not crawler._enqueue("https://example.com/product/3", 1)
+
+
+class ConditionalSiteClient(FakeSiteClient):
+    """FakeSiteClient that honours If-None-Match against a fixed ETag per path."""
+
+    async def get(self, url: str, headers: dict | None = None, **kwargs):
+        response = await super().get(url)
+        response.headers = {**response.headers, "ETag": '"v1"'}
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return SimpleNamespace(status_code=304, headers={"ETag": '"v1"'}, text="", content=b"", encoding="utf-8")
+        return response
+
+
+class TestConditionalRecrawl:
+    @pytest.mark.asyncio
+    async def test_unchanged_pages_reuse_stored_parse(self):
+        from app.scanner.page_state import PageStateCache
+
+        site = {
+            "/": ('<a href="/a">a</a><form action="/login" method="post"><input name="user"></form>', 0.0),
+            "/a": ("leaf", 0.0),
+        }
+        state = PageStateCache()
+        first = AsyncCrawler(ConditionalSiteClient(site), ScopeValidator("https://example.com"), page_state=state)
+        first_pages = await first.crawl("https://example.com/")
+        assert len(state) == len(first_pages) and state.not_modified == 0
+
+        second = AsyncCrawler(ConditionalSiteClient(site), ScopeValidator("https://example.com"), page_state=state)
+        second_pages = await second.crawl("https://example.com/")
+        assert state.not_modified == len(first_pages)
+        home = next(p for p in second_pages if p.url == "https://example.com/")
+        assert home.not_modified
+        assert home.body == next(p for p in first_pages if p.url == "https://example.com/").body
+        assert home.links == ["https://example.com/a", "https://example.com/login"]
+        assert home.forms[0].inputs[0]["name"] == "user"
+
+    def test_no_conditional_headers_without_stored_body(self):
+        from app.scanner.page_state import PageStateCache
+
+        state = PageStateCache(max_body_bytes=4)
+        page = CrawledPage(url="https://example.com/", status_code=200, headers={"ETag": "x"}, body="too long")
+        state.record("https://example.com/", page, page.analysis.structure())
+        assert state.conditional_headers("https://example.com/") == {}
+
+
+class TestLinkScoring:
+    def test_parameters_forms_and_apis_outrank_plain_pages(self):
+        from app.scanner.link_scoring import LinkContext, default_link_score
+
+        plain = default_link_score(LinkContext("https://example.com/about", depth=1))
+        assert default_link_score(LinkContext("https://example.com/search?q=1", depth=1)) > plain
+        assert default_link_score(LinkContext("https://example.com/api/users", depth=1)) > plain
+        assert default_link_score(LinkContext("https://example.com/login", depth=1, from_form=True)) > plain
+        assert default_link_score(LinkContext("https://example.com/x", depth=1, new_template=True)) > plain
+        assert default_link_score(LinkContext("https://example.com/about", depth=3)) < plain
+
+    def test_destructive_links_rank_last(self):
+        from app.scanner.link_scoring import LinkContext, default_link_score
+
+        plain = default_link_score(LinkContext("https://example.com/about", depth=1))
+        assert default_link_score(LinkContext("https://example.com/logout", depth=1)) < plain
+        assert default_link_score(LinkContext("https://example.com/item?action=delete&id=1", depth=1)) < plain
+
+    @pytest.mark.asyncio
+    async def test_small_budget_prefers_parameterised_pages(self):
+        site = {
+            "/": (
+                '<a href="/about">a</a><a href="/team">t</a><a href="/logout">out</a>'
+                '<a href="/search?q=x">s</a><a href="/api/items">api</a>',
+                0.0,
+            ),
+            "/about": ("leaf", 0.0),
+            "/team": ("leaf", 0.0),
+            "/logout": ("leaf", 0.0),
+            "/search": ("leaf", 0.0),
+            "/api/items": ("leaf", 0.0),
+        }
+        client = FakeSiteClient(site)
+        crawler = AsyncCrawler(client, ScopeValidator("https://example.com"), max_pages=3, concurrency=1)
+        pages = await crawler.crawl("https://example.com/")
+        assert [p.url for p in pages] == [
+            "https://example.com/",
+            "https://example.com/search?q=x",
+            "https://example.com/api/items",
+        ]
+
+
+class TestPageStore:
+    def test_bodies_round_trip_through_memory_and_spill(self):
+        from app.scanner.page_store import PageStore
+
+        store = PageStore(memory_limit=200)
+        try:
+            bodies = [f"<html>{i} " + "x" * 5000 + "é</html>" for i in range(20)]
+            handles = [store.put(body) for body in bodies]
+            assert store.spilled_bytes > 0 and store.memory_bytes <= 200
+            assert [store.get(h) for h in handles] == bodies
+        finally:
+            store.close()
+
+    def test_offloaded_page_reloads_body_lazily_and_releases_it(self):
+        from app.scanner.page_store import PageStore
+
+        store = PageStore()
+        page = CrawledPage(url="https://example.com/", status_code=200, headers={}, body='<a href="/x">x</a>')
+        assert page.analysis.links == ["https://example.com/x"]
+        page.offload(store)
+        assert page._body is None and page._analysis is None
+        assert page.body == '<a href="/x">x</a>'
+        assert page.analysis.links == ["https://example.com/x"]
+        page.release()
+        assert page._body is None
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_crawler_offloads_bodies_but_keeps_links_and_forms(self):
+        from app.scanner.page_store import PageStore
+
+        site = {
+            "/": ('<a href="/a">a</a><form action="/f"><input name="q"></form>', 0.0),
+            "/a": ("leaf", 0.0),
+        }
+        store = PageStore()
+        crawler = AsyncCrawler(FakeSiteClient(site), ScopeValidator("https://example.com"), page_store=store)
+        pages = await crawler.crawl("https://example.com/")
+        home = next(p for p in pages if p.url == "https://example.com/")
+        assert home._body is None
+        assert "https://example.com/a" in home.links and home.forms[0].inputs[0]["name"] == "q"
+        assert "<form" in home.body
+        store.close()
@@ -0,0 +1,64 @@
+from app.scanner.crawler import CrawledPage
+from app.scanner.page_analysis import FormData
+from app.scanner.fingerprint import content_hash, collapse_duplicates, hamming, simhash
+
+ARTICLE = " ".join(f"<p>Paragraph {i} about web security scanning and crawling</p>" for i in range(40))
+
+
+def make_page(url: str, body: str, forms: list[FormData] | None = None) -> CrawledPage:
+    return CrawledPage(
+        url=url, status_code=200, headers={}, body=body, forms=forms,
+        content_hash=content_hash(body), simhash=simhash(body),
+    )
+
+
+class TestSimHash:
+    def test_identical_bodies_match(self):
+        assert simhash(ARTICLE) == simhash(ARTICLE)
+
+    def test_small_change_is_near(self):
+        changed = ARTICLE + '<input name="csrf" value="a81f3c">'
+        assert hamming(simhash(ARTICLE), simhash(changed)) <= 3
+
+    def test_different_pages_are_far(self):
+        other = " ".join(f"<li>Order {i} shipped to customer account</li>" for i in range(40))
+        assert hamming(simhash(ARTICLE), simhash(other)) > 10
+
+
+class TestCollapseDuplicates:
+    def test_exact_and_near_duplicates_become_aliases(self):
+        pages = [
+            make_page("https://example.com/post", ARTICLE),
+            make_page("https://example.com/post/", ARTICLE),
+            make_page("https://example.com/post;jsessionid=1", ARTICLE + "<span>ts 1712</span>"),
+            make_page("https://example.com/orders", "<ul><li>nothing alike here at all</li></ul>"),
+        ]
+        primaries = collapse_duplicates(pages, threshold=3)
+        assert [p.url for p in primaries] == ["https://example.com/post", "https://example.com/orders"]
+        assert primaries[0].aliases == [
+            "https://example.com/post/", "https://example.com/post;jsessionid=1",
+        ]
+
+    def test_pages_with_other_insertion_points_are_kept(self):
+        # Same site chrome, but each page has something different to attack
+        login = FormData("https://example.com/login", "post", [{"name": "user"}, {"name": "password"}])
+        pages = [
+            make_page("https://example.com/", ARTICLE),
+            make_page("https://example.com/login", ARTICLE, forms=[login]),
+            make_page("https://example.com/item?id=1", ARTICLE),
+            make_page("https://example.com/item?id=2", ARTICLE),
+        ]
+        primaries = collapse_duplicates(pages, threshold=3)
+        assert [p.url for p in primaries] == [
+            "https://example.com/", "https://example.com/login", "https://example.com/item?id=1",
+        ]
+        assert primaries[2].aliases == ["https://example.com/item?id=2"]
+
+    def test_distinct_pages_are_kept(self):
+        pages = [
+            make_page("https://example.com/a", ARTICLE),
+            make_page("https://example.com/b", " ".join(f"<li>Order {i} shipped</li>" for i in range(40))),
+        ]
+        primaries = collapse_duplicates(pages, threshold=3)
+        assert len(primaries) == 2
+        assert all(not p.aliases for p in primaries)
@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+import pytest
+
+from app.scanner.frontier import (
+    BloomFilter,
+    FingerprintSet,
+    HostInterleavedQueue,
+    MemoryQueue,
+    SqliteSpillQueue,
+    UrlFrontier,
+    make_frontier,
+)
+from app.scanner.scheduler import HostScheduler
+
+
+class FakeThrottle:
+    """Throttle whose windows are opened and closed by hand."""
+
+    def __init__(self, delay: float = 2.0, closed: dict[str, float] | None = None):
+        self.delay = delay
+        self.closed = closed or {}
+
+    def ready_in(self, host: str) -> float:
+        return self.closed.get(host, 0.0)
+
+
+class TestVisitedStructures:
+    def test_fingerprint_set_dedups(self):
+        seen = FingerprintSet()
+        assert seen.add("https://example.com/a")
+        assert not seen.add("https://example.com/a")
+        assert "https://example.com/a" in seen
+        assert "https://example.com/b" not in seen
+        assert len(seen) == 1
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1_000, fp_rate=0.01)
+        keys = [f"https://example.com/p/{i}" for i in range(1_000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+
+    def test_bloom_filter_false_positive_rate_is_bounded(self):
+        bloom = BloomFilter(capacity=2_000, fp_rate=0.01)
+        for i in range(2_000):
+            bloom.add(f"https://example.com/seen/{i}")
+        false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(5_000))
+        assert false_positives / 5_000 < 0.03
+
+
+class TestPendingStores:
+    def test_spill_queue_preserves_fifo_order_across_disk(self):
+        queue = SqliteSpillQueue(memory_limit=3, chunk_size=2)
+        try:
+            for i in range(10):
+                queue.push((f"/p{i}", i))
+            assert len(queue) == 10
+            popped = [queue.pop() for _ in range(6)]
+            for i in range(10, 13):
+                queue.push((f"/p{i}", i))
+            popped += [queue.pop() for _ in range(len(queue))]
+        finally:
+            queue.close()
+        assert [depth for _, depth in popped] == list(range(13))
+
+    def test_spill_queue_pops_highest_priority_across_disk(self):
+        queue = SqliteSpillQueue(memory_limit=4, chunk_size=3)
+        try:
+            priorities = [0.1, 0.9, 0.5, 0.3, 0.7, 0.2, 0.8, 0.4, 0.6, 0.0]
+            for i, priority in enumerate(priorities):
+                queue.push((f"/p{i}", i), priority)
+            popped = [queue.pop() for _ in range(len(queue))]
+        finally:
+            queue.close()
+        assert [priorities[depth] for _, depth in popped] == sorted(priorities, reverse=True)
+
+    def test_memory_queue_orders_by_priority_then_fifo(self):
+        queue = MemoryQueue()
+        queue.push(("/low", 0), 0.1)
+        queue.push(("/a", 0))
+        queue.push(("/high", 0), 0.9)
+        queue.push(("/b", 0))
+        assert [queue.pop()[0] for _ in range(4)] == ["/high", "/a", "/b", "/low"]
+
+    def test_memory_queue_fifo(self):
+        queue = MemoryQueue()
+        queue.push(("/a", 0))
+        queue.push(("/b", 1))
+        assert queue.pop() == ("/a", 0)
+        assert len(queue) == 1
+
+
+class TestUrlFrontier:
+    def test_push_dedups_on_key(self):
+        frontier = UrlFrontier()
+        assert frontier.push("https://example.com/a/", 0, key="https://example.com/a")
+        assert not frontier.push("https://example.com/a", 1, key="https://example.com/a")
+        assert len(frontier) == 1
+
+    @pytest.mark.asyncio
+    async def test_join_resolves_when_all_items_done(self):
+        frontier = make_frontier(visited="bloom", expected_urls=100, spill_after=1)
+        frontier.push("/a", 0)
+        frontier.push("/b", 0)
+        assert await frontier.get() == ("/a", 0)
+        frontier.task_done()
+        assert await frontier.get() == ("/b", 0)
+        frontier.task_done()
+        await frontier.join()
+        frontier.close()
+
+    @pytest.mark.asyncio
+    async def test_join_waits_for_producer(self):
+        frontier = UrlFrontier()
+        frontier.add_producer()
+        frontier.task_done()
+        await frontier.join()
+
+
+class TestHostInterleaving:
+    def test_round_robins_hosts_keeping_per_host_priority(self):
+        queue = HostInterleavedQueue()
+        queue.push(("https://a.example.com/1", 0), 0.1)
+        queue.push(("https://a.example.com/2", 0), 0.9)
+        queue.push(("https://a.example.com/3", 0))
+        queue.push(("https://b.example.com/1", 0))
+        assert [queue.pop()[0] for _ in range(4)] == [
+            "https://a.example.com/2",
+            "https://b.example.com/1",
+            "https://a.example.com/3",
+            "https://a.example.com/1",
+        ]
+        assert len(queue) == 0 and queue.hosts == 0
+
+    def test_skips_hosts_whose_window_is_closed(self):
+        throttle = FakeThrottle(closed={"a.example.com": 1.5})
+        queue = HostInterleavedQueue(throttle)
+        queue.push(("https://a.example.com/1", 0))
+        queue.push(("https://b.example.com/1", 0))
+        queue.push(("https://b.example.com/2", 0))
+        assert queue.pop()[0] == "https://b.example.com/1"
+        # b is now reserved for a full delay, so a (open sooner) goes next
+        assert queue.ready_in() == pytest.approx(1.5, abs=0.1)
+        assert queue.pop()[0] == "https://a.example.com/1"
+        assert queue.pop(exclude={"b.example.com"}) is None
+
+    @pytest.mark.asyncio
+    async def test_frontier_get_waits_for_an_open_window(self):
+        throttle = FakeThrottle(delay=0.05)
+        frontier = make_frontier(throttle=throttle)
+        frontier.push("https://a.example.com/1", 0)
+        frontier.push("https://a.example.com/2", 0)
+        frontier.push("https://b.example.com/1", 0)
+        start = time.monotonic()
+        urls = [(await frontier.get())[0] for _ in range(3)]
+        assert urls == ["https://a.example.com/1", "https://b.example.com/1", "https://a.example.com/2"]
+        assert time.monotonic() - start >= 0.04
+        frontier.close()
+
+    @pytest.mark.asyncio
+    async def test_scheduler_runs_hosts_in_parallel_and_each_host_in_order(self):
+        running: set[str] = set()
+        overlap = False
+        order: list[str] = []
+
+        async def handler(url: str) -> None:
+            nonlocal overlap
+            host = url.split("/")[2]
+            assert host not in running
+            running.add(host)
+            overlap = overlap or len(running) > 1
+            await asyncio.sleep(0.01)
+            order.append(url)
+            running.discard(host)
+
+        urls = [f"https://{h}.example.com/{i}" for i in range(3) for h in ("a", "b")]
+        await HostScheduler(concurrency=4).run([(u, u) for u in urls], handler)
+        assert overlap
+        assert [u for u in order if "//a." in u] == [f"https://a.example.com/{i}" for i in range(3)]
+        assert len(order) == 6
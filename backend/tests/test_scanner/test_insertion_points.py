@@ -0,0 +1,28 @@
+from app.scanner.insertion_points import InsertionPointRegistry, form_point, query_point
+from app.scanner.page_analysis import FormData
+from app.scanner.urls import canonical_url
+
+
+class TestInsertionPointKeys:
+    def test_get_form_matches_query_parameter(self):
+        form = FormData(action="https://Example.com/search/", method="get", inputs=[{"name": "q"}])
+        assert form_point(form, "q") == query_point(canonical_url("https://example.com/search?q=shoes&page=2"), "q")
+
+    def test_location_and_method_distinguish_points(self):
+        post = FormData(action="https://example.com/login", method="POST", inputs=[{"name": "user"}])
+        api = FormData(
+            action="https://example.com/login", method="POST", enctype="application/json",
+            inputs=[{"name": "user", "in": "body"}],
+        )
+        assert form_point(post, "user").location == "body"
+        assert form_point(api, "user").location == "json"
+        assert form_point(post, "user") != query_point(canonical_url("https://example.com/login?user=a"), "user")
+
+    def test_registry_claims_once_per_module(self):
+        registry = InsertionPointRegistry()
+        point = query_point(canonical_url("https://example.com/s?q=1"), "q")
+        assert registry.claim("sqli", point)
+        assert not registry.claim("sqli", point)
+        assert registry.claim("xss", point)
+        assert registry.skipped == 1
+
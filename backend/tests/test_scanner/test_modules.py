@@ -6,7 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from dataclasses import dataclass, field
 
 from app.scanner.modules.base import Finding
-from app.scanner.crawler import CrawledPage, Form, FormInput
+from app.scanner.crawler import CrawledPage
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
@@ -97,6 +97,11 @@ class TestXssModule:
         baseline_resp.text = "Normal response without canary"
         baseline_resp.status_code = 200
 
+        # Pre-flight: the harmless canary is reflected in HTML text
+        canary_resp = MagicMock()
+        canary_resp.text = "<html><body>scntmrf0x</body></html>"
+        canary_resp.status_code = 200
+
         # Reflected response: canary appears unencoded
         reflected_payload = f'<script>{XSS_CANARY}()</script>'
         reflected_resp = MagicMock()
@@ -104,7 +109,7 @@ class TestXssModule:
         reflected_resp.status_code = 200
 
         client = make_http_client()
-        client.get = AsyncMock(side_effect=[baseline_resp, reflected_resp])
+        client.get = AsyncMock(side_effect=[baseline_resp, canary_resp, reflected_resp])
 
         findings = await module.active_test_async(page, client)
         assert len(findings) >= 1
@@ -129,6 +134,31 @@ class TestXssModule:
         confirmed = [f for f in findings if f.confidence == "confirmed"]
         assert len(confirmed) == 0
 
+    @pytest.mark.asyncio
+    async def test_unreflected_param_costs_one_probe(self):
+        from app.scanner.modules.xss import XssModule
+        module = XssModule()
+        page = make_page(url="https://example.com/search?q=test&page=2")
+        client = make_http_client(text="<html><body>Nothing echoed</body></html>")
+
+        findings = await module.active_test_async(page, client)
+        assert findings == []
+        assert client.get.await_count == 3  # baseline + one canary per parameter
+
+    @pytest.mark.parametrize("body, contexts", [
+        ("<p>scntmrf0x</p>", ["html"]),
+        ('<a href="scntmrf0x">x</a>', ["url"]),
+        ("<input value='scntmrf0x'>", ["attr"]),
+        ('<div onclick="go(scntmrf0x)">', ["js"]),
+        ('<script>var q = "scntmrf0x";</script><b>scntmrf0x</b>', ["js", "html"]),
+        ("<!-- scntmrf0x -->", ["comment"]),
+        ("<textarea>scntmrf0x</textarea>", ["textarea"]),
+        ("<p>nothing</p>", []),
+    ])
+    def test_reflection_contexts(self, body, contexts):
+        from app.scanner.modules.xss import reflection_contexts
+        assert reflection_contexts(body, "scntmrf0x") == contexts
+
     @pytest.mark.asyncio
     async def test_no_url_params_no_active_test(self):
         from app.scanner.modules.xss import XssModule
@@ -145,6 +175,22 @@ class TestXssModule:
 # ── SQLi Module ───────────────────────────────────────────────────────────────
 
 class TestSqliModule:
+    @pytest.mark.asyncio
+    async def test_site_wide_form_attacked_once_per_scan(self):
+        from app.scanner.insertion_points import InsertionPointRegistry
+        from app.scanner.modules.sqli import SqliModule
+        from app.scanner.page_analysis import FormData
+        module = SqliModule()
+        module.insertion_points = InsertionPointRegistry()
+        newsletter = FormData(action="https://example.com/subscribe", method="POST", inputs=[{"name": "email"}])
+        client = make_http_client(text="<html>ok</html>")
+
+        await module.active_test_async(make_page(url="https://example.com/a", forms=[newsletter]), client)
+        sent = client.post.await_count
+        assert sent > 0
+        await module.active_test_async(make_page(url="https://example.com/b", forms=[newsletter]), client)
+        assert client.post.await_count == sent
+
     @pytest.mark.asyncio
     async def test_mysql_error_detected(self):
         from app.scanner.modules.sqli import SqliModule
@@ -180,6 +226,26 @@ class TestSqliModule:
         findings = await module.active_test_async(page, client)
         assert len(findings) == 0
 
+    @pytest.mark.asyncio
+    async def test_batched_params_bisected_to_vulnerable_one(self):
+        from urllib.parse import parse_qs, urlparse
+        from app.scanner.modules.sqli import SqliModule
+        module = SqliModule()
+        page = make_page(url="https://example.com/list?a=1&b=2&id=3&sort=asc")
+
+        async def get(url, **kwargs):
+            r = MagicMock()
+            r.status_code = 200
+            injected = parse_qs(urlparse(url).query).get("id", [""])[0]
+            r.text = "You have an error in your SQL syntax" if "'" in injected else "ok"
+            return r
+
+        client = make_http_client()
+        client.get = AsyncMock(side_effect=get)
+        findings = await module.active_test_async(page, client)
+        error_based = [f for f in findings if "Error Based" in f.vuln_type]
+        assert [f.affected_parameter for f in error_based] == ["id"]
+
     @pytest.mark.asyncio
     async def test_no_params_no_test(self):
         from app.scanner.modules.sqli import SqliModule
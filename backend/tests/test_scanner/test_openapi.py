@@ -0,0 +1,198 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.scanner.modules.sqli import SqliModule
+from app.scanner.openapi import ingest_openapi, load_spec, operation_pages, parse_operations
+from app.scanner.page_analysis import FormData
+from app.scanner.scope import ScopeValidator
+
+SWAGGER_2 = {
+    "swagger": "2.0",
+    "host": "api.example.com",
+    "basePath": "/v1",
+    "schemes": ["https"],
+    "definitions": {
+        "User": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "example": "alice"},
+                "age": {"type": "integer"},
+                "id": {"type": "integer", "readOnly": True},
+                "tags": {"type": "array", "items": {"type": "string"}},
+            },
+        }
+    },
+    "paths": {
+        "/users/{id}": {
+            "parameters": [{"name": "id", "in": "path", "type": "integer"}],
+            "get": {"parameters": [{"name": "fields", "in": "query", "type": "string"}]},
+            "put": {"parameters": [{"name": "body", "in": "body", "schema": {"$ref": "#/definitions/User"}}]},
+            "delete": {},
+        }
+    },
+}
+
+OPENAPI_3_YAML = """
+openapi: 3.0.0
+servers:
+  - url: /api
+components:
+  schemas:
+    Login:
+      type: object
+      properties:
+        email: {type: string, format: email}
+        password: {type: string}
+paths:
+  /login:
+    post:
+      parameters:
+        - name: next
+          in: query
+          schema: {type: string, enum: [home]}
+      requestBody:
+        content:
+          application/json:
+            schema: {$ref: '#/components/schemas/Login'}
+  /search:
+    get:
+      parameters:
+        - name: q
+          in: query
+          schema: {type: string}
+"""
+
+
+class TestSpecParsing:
+    def test_load_spec_accepts_json_and_yaml_only_for_api_documents(self):
+        assert load_spec(json.dumps(SWAGGER_2))["swagger"] == "2.0"
+        assert load_spec(OPENAPI_3_YAML)["openapi"] == "3.0.0"
+        assert load_spec('{"paths": {}}') is None
+        assert load_spec("<html>not a spec</html>") is None
+
+    def test_swagger_2_operations_resolve_refs_and_skip_delete(self):
+        ops = parse_operations(SWAGGER_2, "https://api.example.com/swagger.json")
+        assert [op.method for op in ops] == ["GET", "PUT"]
+        get, put = ops
+        assert get.base_url == "https://api.example.com/v1"
+        assert [p["name"] for p in get.path_params] == ["id"]
+        assert [p["name"] for p in get.query_params] == ["fields"]
+        assert put.body_fields == [
+            {"name": "name", "type": "string", "value": "alice"},
+            {"name": "age", "type": "integer", "value": 1},
+        ]
+
+    def test_openapi_3_servers_and_json_request_body(self):
+        ops = parse_operations(load_spec(OPENAPI_3_YAML), "https://example.com/openapi.yaml")
+        login = next(op for op in ops if op.path == "/login")
+        assert login.base_url == "https://example.com/api"
+        assert login.body_type == "application/json"
+        assert [f["name"] for f in login.body_fields] == ["email", "password"]
+        assert login.body_fields[0]["value"] == "test@example.com"
+        assert login.query_params[0]["value"] == "home"
+
+
+MALFORMED_SPECS = [
+    {"openapi": "3.0.0", "paths": {"/a": {"parameters": "id", "get": {"parameters": {"name": "q"}}}}},
+    {"openapi": "3.0.0", "paths": {"/a": {"post": {"requestBody": {"content": {"application/json": "x"}}}}}},
+    {"openapi": "3.0.0", "paths": {"/a": {"post": {"requestBody": {"content": ["application/json"]}}}}},
+    {"openapi": "3.0.0", "paths": {"/a": {"get": {"parameters": [{"name": "q", "in": "query", "schema": "string"}]}}}},
+    {"openapi": "3.0.0", "servers": [{"url": 42}], "paths": {"/a": {"get": {}}}},
+    {"swagger": "2.0", "host": ["x"], "basePath": 1, "schemes": "https", "paths": {"/a": {"get": {}}}},
+    {"openapi": "3.0.0", "paths": {"/a": {"get": {"parameters": [
+        {"name": 7, "in": "query"},
+        {"name": "q", "in": "query", "schema": {"type": ["string", "null"], "enum": {"a": 1}, "format": ["x"]}},
+        {"name": "b", "in": "body", "schema": {"properties": ["x"]}},
+    ]}}}},
+]
+
+
+class TestMalformedSpecs:
+    @pytest.mark.parametrize("spec", MALFORMED_SPECS)
+    def test_bad_nodes_are_skipped(self, spec):
+        ops = parse_operations(spec, "https://example.com/openapi.json")
+        assert [op.path for op in ops] == ["/a"]
+        assert ops[0].base_url.startswith("https://example.com")
+
+    async def test_unusable_spec_yields_no_pages(self):
+        client = SimpleNamespace(get=AsyncMock())
+        with patch("app.scanner.openapi.parse_operations", side_effect=TypeError("boom")):
+            pages = await ingest_openapi(
+                client, ScopeValidator("https://example.com"), "https://example.com/",
+                {"openapi_spec": OPENAPI_3_YAML}, [],
+            )
+        assert pages == []
+
+
+class TestOperationPages:
+    def test_insertion_points_and_scope(self):
+        scope = ScopeValidator("https://example.com")
+        ops = parse_operations(load_spec(OPENAPI_3_YAML), "https://example.com/openapi.yaml")
+        ops += parse_operations(SWAGGER_2, "https://api.example.com/swagger.json")  # other host
+        pages = {p.url: p for p in operation_pages(ops, scope)}
+
+        assert set(pages) == {"https://example.com/api/login", "https://example.com/api/search?q=test"}
+        search = pages["https://example.com/api/search?q=test"]
+        assert search.synthetic and search.forms == []
+        login = pages["https://example.com/api/login"]
+        form = login.forms[0]
+        assert form.method == "POST" and form.enctype == "application/json"
+        assert {i["name"]: i["in"] for i in form.inputs} == {"next": "query", "email": "body", "password": "body"}
+        assert login.template.startswith("POST ")
+
+    async def test_uploaded_spec_takes_precedence_over_discovery(self):
+        client = SimpleNamespace(get=AsyncMock())
+        pages = await ingest_openapi(
+            client, ScopeValidator("https://example.com"), "https://example.com/",
+            {"openapi_spec": OPENAPI_3_YAML}, ["/openapi.json"],
+        )
+        assert len(pages) == 2
+        client.get.assert_not_called()
+
+    async def test_discovers_spec_at_well_known_path(self):
+        responses = {
+            "https://example.com/openapi.json": SimpleNamespace(status_code=404, text=""),
+            "https://example.com/swagger.json": SimpleNamespace(
+                status_code=200, text=json.dumps({**SWAGGER_2, "host": "example.com"})
+            ),
+        }
+        client = SimpleNamespace(get=AsyncMock(side_effect=lambda url: responses[url]))
+        pages = await ingest_openapi(
+            client, ScopeValidator("https://example.com"), "https://example.com/app",
+            None, ["/openapi.json", "/swagger.json"],
+        )
+        assert [p.url for p in pages] == ["https://example.com/v1/users/1?fields=test", "https://example.com/v1/users/1"]
+
+
+class TestSubmitForm:
+    async def test_path_query_and_json_body(self):
+        client = SimpleNamespace(request=AsyncMock(return_value="resp"))
+        form = FormData(
+            action="https://example.com/v1/users/{id}",
+            method="PUT",
+            inputs=[
+                {"name": "id", "in": "path"},
+                {"name": "dry", "in": "query"},
+                {"name": "name", "in": "body"},
+            ],
+            enctype="application/json",
+        )
+        response, url = await SqliModule().submit_form(client, form, {"id": "1'", "dry": "1", "name": "x"})
+        assert response == "resp"
+        assert url == "https://example.com/v1/users/1%27?dry=1"
+        client.request.assert_awaited_once_with("PUT", url, json={"name": "x"})
+
+    async def test_plain_html_forms_keep_get_and_urlencoded_post(self):
+        client = SimpleNamespace(get=AsyncMock(return_value="g"), post=AsyncMock(return_value="p"))
+        module = SqliModule()
+        _, url = await module.submit_form(
+            client, FormData(action="https://example.com/s", method="GET", inputs=[{"name": "q"}]), {"q": "a b"}
+        )
+        assert url == "https://example.com/s?q=a+b"
+        await module.submit_form(
+            client, FormData(action="https://example.com/p", method="POST", inputs=[{"name": "q"}]), {"q": "1"}
+        )
+        client.post.assert_awaited_once_with("https://example.com/p", data={"q": "1"})
@@ -0,0 +1,105 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.config import settings
+from app.scanner.orchestrator import ScanOrchestrator
+from app.scanner.page_store import PageStore
+from app.scanner.rate_limiter import PerDomainThrottle
+
+SITE = {
+    "/": '<a href="/a">a</a><a href="/b">b</a>',
+    "/a": '<a href="/">home</a><a href="/c">c</a>',
+    "/b": "leaf",
+    "/c": "leaf",  # duplicate of /b, collapsed before the module phase
+}
+
+
+class FakeHttpClient:
+    """Stands in for HttpClient: serves SITE and 404s everything else."""
+
+    def __init__(self, **kwargs):
+        self.requested: list[str] = []
+
+    async def get(self, url: str, **kwargs):
+        from urllib.parse import urlparse
+        self.requested.append(url)
+        path = urlparse(url).path or "/"
+        html = SITE.get(path, "not found")
+        return SimpleNamespace(
+            status_code=200 if path in SITE else 404,
+            headers={"content-type": "text/html"},
+            text=html,
+            content=html.encode(),
+            encoding="utf-8",
+            url=url,
+        )
+
+    async def close(self) -> None:
+        pass
+
+
+def make_scan():
+    return SimpleNamespace(
+        id=uuid.uuid4(), user_id=uuid.uuid4(), target_url="https://example.com/", scan_mode="quick",
+        config={}, status="pending", progress_percent=0, pages_found=0, pages_scanned=0,
+        started_at=None, completed_at=None, error_message=None, stats=None,
+    )
+
+
+def test_run_crawls_target_and_completes(monkeypatch):
+    monkeypatch.setattr(settings, "SCANNER_REQUEST_DELAY", 0.0)
+    monkeypatch.setattr(PerDomainThrottle, "HARD_FLOOR", 0.0)
+    scan = make_scan()
+    db = MagicMock()
+    db.get.return_value = scan
+    clients: list[FakeHttpClient] = []
+
+    def make_client(**kwargs):
+        clients.append(FakeHttpClient(**kwargs))
+        return clients[-1]
+
+    with patch("app.scanner.orchestrator.HttpClient", side_effect=make_client), \
+            patch("app.scanner.orchestrator._publish_progress"), \
+            patch("app.scanner.orchestrator.ModuleRegistry.get_for_mode", return_value=[]):
+        ScanOrchestrator(str(scan.id), db).run()
+
+    assert scan.status == "completed", scan.error_message
+    assert {"https://example.com/", "https://example.com/a", "https://example.com/b"} <= set(clients[0].requested)
+    assert scan.pages_found >= 3
+
+
+class RecordingPageStore(PageStore):
+    """PageStore that remembers how many bodies were still held when the scan closed it."""
+
+    instances: list["RecordingPageStore"] = []
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.left_at_close: int | None = None
+        self.instances.append(self)
+
+    def close(self) -> None:
+        self.left_at_close = len(self)
+        super().close()
+
+
+def test_page_bodies_discarded_once_scanned(monkeypatch):
+    monkeypatch.setattr(settings, "SCANNER_REQUEST_DELAY", 0.0)
+    monkeypatch.setattr(PerDomainThrottle, "HARD_FLOOR", 0.0)
+    monkeypatch.setattr(settings, "SCANNER_PAGE_STORE_MEMORY_BYTES", 0)  # every body spills to the temp file
+    scan = make_scan()
+    db = MagicMock()
+    db.get.return_value = scan
+    RecordingPageStore.instances.clear()
+
+    with patch("app.scanner.orchestrator.HttpClient", side_effect=FakeHttpClient), \
+            patch("app.scanner.orchestrator._publish_progress"), \
+            patch("app.scanner.orchestrator.PageStore", RecordingPageStore), \
+            patch("app.scanner.orchestrator.ModuleRegistry.get_for_mode", return_value=[]):
+        ScanOrchestrator(str(scan.id), db).run()
+
+    assert scan.status == "completed", scan.error_message
+    [store] = RecordingPageStore.instances
+    assert store.left_at_close == 0
+    assert store.spilled_bytes == 0
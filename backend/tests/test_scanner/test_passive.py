@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+
+from app.scanner.crawler import CrawledPage
+from app.scanner.modules.registry import ModuleRegistry
+from app.scanner.page_analysis import FormData
+from app.scanner.passive import PageRecord, PassiveAnalysisStage, analyze_batch, passive_module_names
+
+PAGE_HEADERS = {"content-type": "text/html", "set-cookie": "sid=1; Path=/"}
+
+
+def make_page(url: str = "http://example.com/", synthetic: bool = False) -> CrawledPage:
+    forms = [FormData(action=f"{url}login", method="POST", inputs=[{"name": "user", "type": "text"}])]
+    return CrawledPage(url, 200, dict(PAGE_HEADERS), "<html><body>Index of /</body></html>",
+                       forms=forms, synthetic=synthetic)
+
+
+def inline_findings(page: CrawledPage, names: list[str]) -> list[tuple]:
+    modules = ModuleRegistry.get_all()
+    return sorted(
+        (f.module_name, f.vuln_type, f.affected_url)
+        for name in names for f in modules[name]().detect(page)
+    )
+
+
+class TestPageRecord:
+    def test_round_trips_through_pickle(self):
+        record = pickle.loads(pickle.dumps(PageRecord.from_page(make_page())))
+        page = record.to_page()
+        assert page.url == "http://example.com/"
+        assert page.body.startswith("<html>")
+        assert page.forms[0].method == "POST"
+        assert page.analysis.set_cookies == ["sid=1; Path=/"]
+
+
+def test_passive_module_names_covers_detect_overrides():
+    names = passive_module_names(ModuleRegistry.get_for_mode("full"))
+    assert {"security_headers", "cookie_security", "jwt_analysis", "csrf", "https_check",
+            "directory_exposure"} <= set(names)
+    assert "sqli" not in names
+
+
+def test_analyze_batch_matches_inline_detect():
+    names = passive_module_names(ModuleRegistry.get_for_mode("full"))
+    page = make_page()
+    findings = analyze_batch(tuple(names), [PageRecord.from_page(page)])
+    assert sorted((f.module_name, f.vuln_type, f.affected_url) for f in findings) == inline_findings(page, names)
+    assert {"csrf", "cookie_security", "directory_exposure", "https_check"} <= {f.module_name for f in findings}
+
+
+class TestPassiveAnalysisStage:
+    @pytest.mark.asyncio
+    async def test_pages_are_analysed_in_batches(self):
+        stage = PassiveAnalysisStage(["https_check"], workers=1, batch_size=2, use_processes=False)
+        try:
+            for i in range(5):
+                await stage.submit(make_page(f"http://example.com/{i}/"))
+            await stage.submit(make_page("http://example.com/api/", synthetic=True))
+            findings = await stage.drain()
+        finally:
+            stage.close()
+        assert stage.pages == 5
+        assert stage.batches == 3
+        assert sorted(f.affected_url for f in findings) == [f"http://example.com/{i}/" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_released_page_body_is_already_captured(self):
+        stage = PassiveAnalysisStage(["directory_exposure"], workers=1, batch_size=10, use_processes=False)
+        page = make_page()
+        try:
+            await stage.submit(page)
+            page.release()
+            findings = await stage.drain()
+        finally:
+            stage.close()
+        assert [f.vuln_type for f in findings] == ["Directory Listing Enabled"]
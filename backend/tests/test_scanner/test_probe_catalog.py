@@ -0,0 +1,73 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.scanner.probe_catalog import CatalogError, load_catalog, parse_catalog
+
+CATALOG = {
+    "name": "demo",
+    "params": ["file"],
+    "probes": [
+        {
+            "id": "passwd",
+            "confidence": "tentative",
+            "payloads": ["../etc/passwd"],
+            "encodings": ["raw", "url", "double_url"],
+            "form_payloads": 1,
+            "matchers": [
+                {"regex": "root:.*:/bin/", "label": "passwd", "confidence": "confirmed"},
+                {"literal": "daemon:"},
+            ],
+        },
+        {"id": "hosts", "contexts": ["query"], "payloads": ["/etc/hosts"], "matchers": [{"literal": "localhost"}]},
+    ],
+}
+
+
+class FakeTarget:
+    def __init__(self, responses: dict[str, str]):
+        self.responses = responses
+        self.requests: list[dict[str, str]] = []
+
+    async def send(self, injected: dict[str, str]):
+        self.requests.append(injected)
+        text = " ".join(self.responses.get(value, "") for value in injected.values())
+        return SimpleNamespace(text=text), "/"
+
+
+class TestProbeCatalog:
+    def test_compiles_variants_and_params(self):
+        catalog = parse_catalog(json.dumps(CATALOG), "json")
+        probe = catalog.probes[0]
+        assert probe.variants == ["../etc/passwd", "..%2Fetc%2Fpasswd", "..%252Fetc%252Fpasswd"]
+        assert probe.variants_for("form") == ["../etc/passwd"]
+        assert catalog.select(["File", "q"]) == ["File"]
+
+    @pytest.mark.asyncio
+    async def test_run_stops_at_first_probe_hit_per_param(self):
+        catalog = parse_catalog(json.dumps(CATALOG), "json")
+        target = FakeTarget({"..%2Fetc%2Fpasswd": "root:x:0:0:root:/root:/bin/bash", "/etc/hosts": "localhost"})
+        hits = await catalog.run(target.send, ["a", "b"])
+        assert set(hits) == {"a", "b"}
+        assert hits["a"].probe.id == "passwd"
+        assert hits["a"].hit.payload == "..%2Fetc%2Fpasswd"
+        assert hits["a"].confidence == "confirmed"  # matcher override
+        assert not any("/etc/hosts" in request.values() for request in target.requests)
+
+    @pytest.mark.asyncio
+    async def test_query_only_probe_skipped_for_forms(self):
+        catalog = parse_catalog(json.dumps(CATALOG), "json")
+        target = FakeTarget({"/etc/hosts": "localhost"})
+        assert await catalog.run(target.send, ["file"], context="form") == {}
+        assert len(target.requests) == 1  # passwd capped to one form variant; hosts not sent
+
+    def test_malformed_catalog_rejected(self):
+        with pytest.raises(CatalogError):
+            parse_catalog(json.dumps({"probes": [{"id": "x", "payloads": ["a"], "matchers": [{"regex": "a|b"}]}]}), "json")
+        with pytest.raises(CatalogError):
+            parse_catalog("probes:\n  - {id: x, payloads: [a], encodings: [rot13], matchers: [{literal: abc}]}")
+
+    def test_bundled_catalogs_load_once(self):
+        assert load_catalog("ssrf") is load_catalog("ssrf")
+        assert [probe.id for probe in load_catalog("ssrf").probes] == ["cloud-metadata", "internal", "filter-bypass"]
@@ -0,0 +1,62 @@
+import pytest
+
+from app.scanner.modules.command_injection import COMMAND_OUTPUT
+from app.scanner.modules.sqli import SQL_ERRORS
+from app.scanner.signatures import Signature, SignatureSet, required_literal
+
+
+class TestRequiredLiteral:
+    @pytest.mark.parametrize("pattern, literal", [
+        (r"ORA-\d{5}", "ORA-"),
+        (r"pg_query\(\)", "pg_query()"),
+        (r"ERROR:\s+syntax error at or near", "syntax error at or near"),
+        (r"root:.*:/bin/", ":/bin/"),
+        (r"colou?r mismatch", "r mismatch"),
+        (r"[abc]xyz", "xyz"),
+    ])
+    def test_longest_required_run(self, pattern, literal):
+        assert required_literal(pattern) == literal
+
+    def test_alternation_needs_explicit_literal(self):
+        with pytest.raises(ValueError):
+            required_literal(r"foo|bar")
+        SignatureSet([Signature(r"foo|bar", literal="foo")])  # explicit literal is accepted
+
+
+class TestSignatureSet:
+    def test_declaration_order_wins_and_case_is_ignored(self):
+        body = "<p>Warning: mysql_fetch() ... You have an error in your SQL syntax</p>"
+        match = SQL_ERRORS.search(body)
+        assert match.label == "MySQL"
+        assert match.signature.pattern == r"you have an error in your sql syntax"
+        assert SQL_ERRORS.search("<html>all good</html>") is None
+
+    def test_regex_only_confirmed_inside_window(self):
+        sigs = SignatureSet([Signature(r"warning.*mysql", "MySQL")], window=50)
+        assert sigs.search("warning: mysql died").label == "MySQL"
+        assert sigs.search("warning" + " " * 500 + "mysql") is None
+
+    def test_overlapping_and_prefix_literals(self):
+        sigs = SignatureSet.from_literals(["sqlite3.operationalerror", "sqlite3", "operational"])
+        match = sigs.search("x SQLite3.OperationalError y")
+        assert match.label == "sqlite3.operationalerror"
+        assert sigs.search("SQLITE3 only").label == "sqlite3"
+        assert sigs.search("operational").label == "operational"
+
+    def test_case_sensitive_signature_and_excerpt(self):
+        sigs = SignatureSet([Signature(r"\[extensions\]", "ini", flags=0)])
+        assert sigs.search("[EXTENSIONS]") is None
+        body = "; for 16-bit app support\n[extensions]\n"
+        match = sigs.search(body)
+        assert match.text == "[extensions]"
+        assert "[extensions]" in match.excerpt(body, 5)
+
+    def test_offsets_survive_lowercase_length_changes(self):
+        # "İ".lower() is two characters, so offsets into the lowered copy shift
+        body = "İ" * 10 + " ORA-01756: quoted string not properly terminated"
+        assert SQL_ERRORS.search(body).label == "Oracle"
+
+    def test_command_output_prefers_canary(self):
+        body = "[extensions]\nscntm_cmd_7x9z"
+        assert COMMAND_OUTPUT.search(body).label == "canary"
+        assert COMMAND_OUTPUT.search("[Extensions]").label == "windows"
@@ -0,0 +1,162 @@
+from unittest.mock import AsyncMock, MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.scanner.baselines import BaselineService
+from app.scanner.crawler import CrawledPage
+from app.scanner.similarity import DYNAMIC, DynamicMask, ResponseProfile, similar, tokenize
+
+ARTICLE = " ".join(f"word{i}" for i in range(60))
+
+
+def render(body: str, ad: str = "Buy shoes", served: str = "12:00:01", csrf: str = "a1b2c3d4e5f6g7h8i9j0k1l2m3") -> str:
+    return (
+        f'<html><body><form><input name="csrf" value="{csrf}"></form>'
+        f'<div class="ad"> {ad} today only </div><main>{body}</main>'
+        f"<footer> Served at {served} </footer></body></html>"
+    )
+
+
+def response(text: str, status_code: int = 200):
+    r = MagicMock()
+    r.text = text
+    r.status_code = status_code
+    return r
+
+
+class TestTokenize:
+    def test_per_request_values_normalized(self):
+        first = tokenize(render(ARTICLE, csrf="a1b2c3d4e5f6g7h8i9j0k1l2m3", served="12:00:01"))
+        second = tokenize(render(ARTICLE, csrf="zz99yy88xx77ww66vv55uu44tt", served="12:00:07"))
+        assert first == second
+
+    def test_tag_whitespace_ignored(self):
+        assert tokenize('<a\n  href="/x">link</a>') == tokenize('<a href="/x">link</a>')
+
+
+class TestDynamicMask:
+    def test_rotating_region_masked_in_new_responses(self):
+        first = tokenize(render(ARTICLE, ad="Buy shoes"))
+        second = tokenize(render(ARTICLE, ad="Cheap flights to Lisbon"))
+        mask = DynamicMask.learn(first, second)
+        third = tokenize(render(ARTICLE, ad="Win a phone"))
+        assert mask.apply(third) == mask.apply(first)
+        assert DYNAMIC in mask.apply(third)
+
+    def test_real_change_survives_mask(self):
+        mask = DynamicMask.learn(tokenize(render(ARTICLE, ad="Buy shoes")), tokenize(render(ARTICLE, ad="Sale")))
+        other = tokenize(render("No results found", ad="Win a phone"))
+        assert not similar(mask.apply(tokenize(render(ARTICLE))), mask.apply(other))
+
+
+class TestResponseProfile:
+    def test_learned_profile_matches_noisy_refetch(self):
+        profile = ResponseProfile(render(ARTICLE, ad="Buy shoes"))
+        noisy = render(ARTICLE, ad="Win a brand new phone now")
+        assert not profile.similar(noisy)
+        profile.learn(render(ARTICLE, ad="Cheap flights"))
+        assert profile.similar(noisy)
+        assert not profile.similar(render("Access denied"))
+
+
+class TestBaselineProfile:
+    @pytest.mark.asyncio
+    async def test_second_fetch_teaches_cached_profile(self):
+        service = BaselineService()
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=[response(render(ARTICLE, ad="A")), response(render(ARTICLE, ad="B b"))])
+        baseline = await service.get(client, "https://example.com/")
+        assert not baseline.profile.learned
+        assert await service.get(client, "https://example.com/", samples=2) is baseline
+        assert baseline.profile.learned
+
+
+class TestIdorDifferential:
+    @staticmethod
+    def make_client(pages: dict[str, list[str]]):
+        served = {url: iter(bodies) for url, bodies in pages.items()}
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=lambda url, **kw: response(next(served[url])))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_rotating_ads_not_reported(self):
+        from app.scanner.modules.idor import IdorModule
+        module = IdorModule()
+        module.baselines = BaselineService()
+        client = self.make_client({
+            "https://example.com/orders/7": [render(ARTICLE, ad="Buy shoes"), render(ARTICLE, ad="Cheap flights")],
+            "https://example.com/orders/8": [render(ARTICLE, ad="Win a brand new phone")],
+        })
+        page = CrawledPage(url="https://example.com/orders/7", status_code=200, headers={}, body="", forms=[])
+        assert await module.active_test_async(page, client) == []
+        assert client.get.await_count == 3  # baseline, probe, one extra fetch to learn the mask
+
+    @pytest.mark.asyncio
+    async def test_other_users_order_reported(self):
+        from app.scanner.modules.idor import IdorModule
+        module = IdorModule()
+        module.baselines = BaselineService()
+        client = self.make_client({
+            "https://example.com/orders/7": [render(ARTICLE)] * 2,
+            "https://example.com/orders/8": [render("Order for Mallory: " + ARTICLE[::-1])],
+        })
+        page = CrawledPage(url="https://example.com/orders/7", status_code=200, headers={}, body="", forms=[])
+        findings = await module.active_test_async(page, client)
+        assert [f.vuln_type for f in findings] == ["Potential IDOR"]
+        assert any(e["title"] == "Token Similarity" for e in findings[0].evidence)
+
+
+@pytest.mark.asyncio
+async def test_boolean_sqli_decided_on_masked_content():
+    from app.scanner.modules.sqli import SqliModule
+    module = SqliModule()
+    module.baselines = BaselineService()
+    ads = iter(f"ad {i}" for i in range(1000))
+
+    async def get(url, **kwargs):
+        value = parse_qs(urlparse(url).query).get("id", [""])[0]
+        body = "No such item" if "1=2" in value else ARTICLE
+        return response(render(body, ad=next(ads)))
+
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=get)
+    page = CrawledPage(url="https://example.com/item?id=3", status_code=200, headers={}, body="", forms=[])
+    findings = await module.active_test_async(page, client)
+    assert [f.vuln_type for f in findings] == ["SQL Injection - Boolean Blind (Content Length)"]
+
+
+@pytest.mark.asyncio
+async def test_boolean_sqli_ignores_rotating_content_of_any_size():
+    from app.scanner.modules.sqli import SqliModule
+    module = SqliModule()
+    module.baselines = BaselineService()
+    ads = iter(("short ad", "a much longer advert " * 10) * 100)
+
+    async def get(url, **kwargs):
+        return response(render(ARTICLE, ad=next(ads)))
+
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=get)
+    page = CrawledPage(url="https://example.com/item?id=3", status_code=200, headers={}, body="", forms=[])
+    assert await module.active_test_async(page, client) == []
+
+
+@pytest.mark.asyncio
+async def test_boolean_sqli_ignores_reflected_payload():
+    import html
+    from app.scanner.modules.sqli import SqliModule
+    module = SqliModule()
+    module.baselines = BaselineService()
+    results = " ".join(f"result{i}" for i in range(15))
+
+    async def get(url, **kwargs):
+        # A search page that echoes the query; the payload never reaches SQL
+        query = html.escape(parse_qs(urlparse(url).query).get("q", [""])[0])
+        return response(render(f'<h1>Results for {query}</h1><input name="q" value="{query}"> {results}'))
+
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=get)
+    page = CrawledPage(url="https://example.com/search?q=shoes", status_code=200, headers={}, body="", forms=[])
+    assert await module.active_test_async(page, client) == []
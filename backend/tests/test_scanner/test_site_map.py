@@ -0,0 +1,63 @@
+from app.scanner.crawler import CrawledPage
+from app.scanner.page_analysis import FormData
+from app.scanner.page_store import PageStore
+from app.scanner.site_map import (
+    decode_site_map,
+    encode_site_map,
+    site_map_scope_key,
+    site_map_target_key,
+)
+
+
+def make_page(url: str, body: str = "<html></html>") -> CrawledPage:
+    return CrawledPage(
+        url=url,
+        status_code=200,
+        headers={"Content-Type": "text/html"},
+        body=body,
+        forms=[FormData(action=f"{url}/login", method="POST", inputs=[{"name": "user", "type": "text", "value": ""}])],
+        links=[f"{url}/next"],
+        template="example.com/",
+        content_hash="abc",
+        simhash=2**63 + 5,
+    )
+
+
+class TestSiteMapKeys:
+    def test_scope_key_ignores_trailing_slash_and_order(self):
+        a = site_map_scope_key("https://example.com/", {"exclude_patterns": ["/b", "/a"]})
+        b = site_map_scope_key("https://EXAMPLE.com", {"exclude_patterns": ["/a", "/b"]})
+        assert a == b
+
+    def test_scope_key_changes_with_credentials_and_scope(self):
+        base = site_map_scope_key("https://example.com", None)
+        assert site_map_scope_key("https://example.com", {"custom_headers": {"Cookie": "s=1"}}) != base
+        assert site_map_scope_key("https://example.com", {"include_subdomains": True}) != base
+
+    def test_target_key_is_origin(self):
+        assert site_map_target_key("https://Example.com:8443/app?x=1") == "https://example.com:8443"
+
+
+class TestSiteMapPayload:
+    def test_round_trip_preserves_pages(self):
+        pages = [make_page("https://example.com"), make_page("https://example.com/a", "<p>é</p>")]
+        restored = decode_site_map(encode_site_map(pages))
+        assert [p.url for p in restored] == [p.url for p in pages]
+        assert restored[1].body == "<p>é</p>"
+        assert restored[0].forms[0].inputs[0]["name"] == "user"
+        assert restored[0].links == ["https://example.com/next"]
+        assert restored[0].simhash == 2**63 + 5
+
+    def test_encoding_releases_stored_bodies(self):
+        store = PageStore()
+        page = make_page("https://example.com")
+        page.offload(store)
+        encode_site_map([page])
+        assert page._body is None
+        store.close()
+
+    def test_other_format_is_ignored(self):
+        import json
+        import zlib
+
+        assert decode_site_map(zlib.compress(json.dumps({"format": 999, "pages": []}).encode())) is None
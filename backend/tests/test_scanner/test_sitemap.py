@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.scanner.crawler import AsyncCrawler
+from app.scanner.scope import ScopeValidator
+from app.scanner.sitemap import SitemapSeeder, SitemapStreamParser, parse_robots_sitemaps
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(urls: list[tuple[str, str | None]]) -> bytes:
+    items = "".join(
+        f"<url><loc>{loc}</loc>{f'<priority>{p}</priority>' if p else ''}</url>" for loc, p in urls
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{items}</urlset>'.encode()
+
+
+def sitemap_index(locs: list[str]) -> bytes:
+    items = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f"<sitemapindex {NS}>{items}</sitemapindex>".encode()
+
+
+class FakeSitemapClient:
+    """Serves text via get() and bytes in small chunks via stream()."""
+
+    def __init__(self, files: dict[str, bytes], chunk_size: int = 64):
+        self.files = files
+        self.chunk_size = chunk_size
+        self.streamed: list[str] = []
+
+    def _response(self, url: str):
+        from urllib.parse import urlparse
+        path = urlparse(url).path or "/"
+        body = self.files.get(path)
+        return path, body
+
+    async def get(self, url: str, **kwargs):
+        path, body = self._response(url)
+        text = (body or b"not found").decode(errors="replace")
+        return SimpleNamespace(
+            status_code=200 if body is not None else 404,
+            headers={"content-type": "text/html"},
+            text=text,
+            content=text.encode(),
+            encoding="utf-8",
+        )
+
+    @asynccontextmanager
+    async def stream(self, url: str, method: str = "GET", **kwargs):
+        self.streamed.append(url)
+        _, body = self._response(url)
+
+        async def aiter_bytes():
+            for i in range(0, len(body or b""), self.chunk_size):
+                yield body[i:i + self.chunk_size]
+
+        yield SimpleNamespace(status_code=200 if body is not None else 404, aiter_bytes=aiter_bytes)
+
+
+class TestSitemapParsing:
+    def test_robots_sitemap_lines(self):
+        robots = "User-agent: *\nDisallow: /admin\nSitemap: https://example.com/sm.xml\nsitemap: /other.xml # comment\n"
+        assert parse_robots_sitemaps(robots, "https://example.com/") == [
+            "https://example.com/sm.xml",
+            "https://example.com/other.xml",
+        ]
+
+    def test_stream_parser_handles_split_chunks_and_priorities(self):
+        data = urlset([("https://example.com/a", "0.9"), ("https://example.com/b", None)])
+        parser = SitemapStreamParser()
+        entries = []
+        for i in range(0, len(data), 7):
+            found, _ = parser.feed(data[i:i + 7])
+            entries.extend(found)
+        assert [(e.url, e.priority) for e in entries] == [
+            ("https://example.com/a", 0.9),
+            ("https://example.com/b", 0.5),
+        ]
+
+    def test_stream_parser_inflates_gzip_and_drops_finished_elements(self):
+        data = gzip.compress(urlset([(f"https://example.com/p/{i}", None) for i in range(5_000)]))
+        parser = SitemapStreamParser()
+        count = 0
+        for i in range(0, len(data), 512):
+            found, _ = parser.feed(data[i:i + 512])
+            count += len(found)
+            assert len(parser._root or []) <= 1
+        assert count == 5_000
+
+    def test_stream_parser_reports_child_sitemaps(self):
+        _, children = SitemapStreamParser().feed(sitemap_index(["https://example.com/s1.xml.gz"]))
+        assert children == ["https://example.com/s1.xml.gz"]
+
+
+class TestSitemapSeeder:
+    @pytest.mark.asyncio
+    async def test_follows_index_and_skips_out_of_scope_sitemaps(self):
+        client = FakeSitemapClient({
+            "/robots.txt": b"Sitemap: https://example.com/index.xml\nSitemap: https://cdn.other.com/x.xml\n",
+            "/index.xml": sitemap_index(["https://example.com/pages.xml.gz"]),
+            "/pages.xml.gz": gzip.compress(urlset([("https://example.com/deep/1", "0.8")])),
+        })
+        seeder = SitemapSeeder(client, ScopeValidator("https://example.com"))
+        entries = [e async for e in seeder.entries("https://example.com/")]
+        assert [(e.url, e.priority) for e in entries] == [("https://example.com/deep/1", 0.8)]
+        assert "https://cdn.other.com/x.xml" not in client.streamed
+
+    @pytest.mark.asyncio
+    async def test_max_urls_caps_entries(self):
+        client = FakeSitemapClient({
+            "/sitemap.xml": urlset([(f"https://example.com/p/{i}", None) for i in range(100)]),
+        })
+        seeder = SitemapSeeder(client, ScopeValidator("https://example.com"), max_urls=10)
+        entries = [e async for e in seeder.entries("https://example.com/")]
+        assert len(entries) == 10
+
+    @pytest.mark.asyncio
+    async def test_crawler_reaches_unlinked_sitemap_pages(self):
+        client = FakeSitemapClient({
+            "/": b"<p>no links</p>",
+            "/sitemap.xml": urlset([("https://example.com/hidden", "1.0")]),
+            "/hidden": b"<p>deep</p>",
+        })
+        scope = ScopeValidator("https://example.com")
+        crawler = AsyncCrawler(client, scope, max_pages=10, sitemap_seeder=SitemapSeeder(client, scope))
+        pages = await asyncio.wait_for(crawler.crawl("https://example.com/"), timeout=5)
+        assert "https://example.com/hidden" in {p.url for p in pages}
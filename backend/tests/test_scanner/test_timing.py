@@ -0,0 +1,115 @@
+import asyncio
+import re
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.scanner.timing import LatencyBaseline, TimePayload, detect_time_based
+
+PAYLOADS = [TimePayload("' OR SLEEP({delay})--", "MySQL"), TimePayload("'; WAITFOR DELAY '0:0:{delay}'--", "MSSQL")]
+
+
+class FakeTarget:
+    """Sleeps for the requested SLEEP(n) on vulnerable parameters; ``response.elapsed`` carries the latency."""
+
+    def __init__(self, vulnerable: set[str], base: float = 0.2, jitter: float = 0.02, flat: float | None = None):
+        self.vulnerable = vulnerable
+        self.base = base
+        self.jitter = jitter
+        self.flat = flat  # a delay that doesn't scale with the payload
+        self.requests: list[dict[str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, injected: dict[str, str]):
+        self.requests.append(injected)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        latency = self.base + self.jitter * (len(self.requests) % 2)
+        for name, value in injected.items():
+            match = re.search(r"SLEEP\((\d+)\)", value)
+            if match and name in self.vulnerable:
+                latency += self.flat if self.flat is not None else int(match.group(1))
+        return SimpleNamespace(elapsed=timedelta(seconds=latency)), f"/?{sorted(injected)}"
+
+
+class SerialTarget:
+    """Serves one request at a time on a virtual clock: concurrent requests queue behind each other."""
+
+    def __init__(self, vulnerable: set[str], base: float = 0.2):
+        self.vulnerable = vulnerable
+        self.base = base
+        self.now = 0.0
+        self.free_at = 0.0
+        self.in_flight = 0
+        self.requests: list[dict[str, str]] = []
+
+    async def send(self, injected: dict[str, str]):
+        self.requests.append(injected)
+        arrival = self.now
+        service = self.base
+        for name, value in injected.items():
+            match = re.search(r"SLEEP\((\d+)\)", value)
+            if match and name in self.vulnerable:
+                service += int(match.group(1))
+        self.free_at = max(arrival, self.free_at) + service
+        latency = self.free_at - arrival
+        self.in_flight += 1
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self.now = self.free_at
+        return SimpleNamespace(elapsed=timedelta(seconds=latency)), f"/?{sorted(injected)}"
+
+
+class TestLatencyBaseline:
+    def test_stdev_floor_keeps_z_scores_sane(self):
+        baseline = LatencyBaseline([0.2, 0.2, 0.2])
+        assert baseline.stdev == pytest.approx(0.05)
+        assert baseline.z_score(0.3) == pytest.approx(2.0)
+
+
+class TestDetectTimeBased:
+    @pytest.mark.asyncio
+    async def test_scaling_delay_confirmed(self):
+        target = FakeTarget({"id"})
+        hits = await detect_time_based(target.send, ["id", "q"], PAYLOADS, delay=2)
+        assert set(hits) == {"id"}
+        hit = hits["id"]
+        assert hit.payload.label == "MySQL"
+        assert hit.rendered == "' OR SLEEP(2)--"
+        assert hit.latency == pytest.approx(2.2, abs=0.05)
+        assert hit.confirm_latency == pytest.approx(4.2, abs=0.05)
+        assert {"id": "' OR SLEEP(4)--"} in target.requests
+
+    @pytest.mark.asyncio
+    async def test_delay_that_does_not_scale_is_rejected(self):
+        # A slow error path adds the same latency whatever the sleep is
+        target = FakeTarget({"id"}, flat=2.0)
+        assert await detect_time_based(target.send, ["id"], PAYLOADS, delay=2) == {}
+
+    @pytest.mark.asyncio
+    async def test_params_probed_concurrently_after_one_baseline(self):
+        target = FakeTarget(set())
+        params = [f"p{i}" for i in range(4)]
+        await detect_time_based(target.send, params, PAYLOADS, delay=2, concurrency=4)
+        assert target.requests.count({}) == 3  # baseline sampled once for the endpoint
+        assert target.max_in_flight > 1
+        assert len(target.requests) == 3 + len(params) * len(PAYLOADS)
+
+    @pytest.mark.asyncio
+    async def test_neighbour_queued_behind_real_sleep_not_reported(self):
+        target = SerialTarget({"id"})
+        hits = await detect_time_based(target.send, ["id", "q"], PAYLOADS, delay=2, concurrency=2)
+        assert set(hits) == {"id"}
+        assert hits["id"].confirm_latency == pytest.approx(4.2)
+        assert {"q": "' OR SLEEP(4)--"} in target.requests  # q looked delayed while probed alongside id
+
+    @pytest.mark.asyncio
+    async def test_no_params_no_requests(self):
+        target = FakeTarget(set())
+        assert await detect_time_based(target.send, [], PAYLOADS) == {}
+        assert target.requests == []
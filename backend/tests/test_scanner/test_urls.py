@@ -0,0 +1,72 @@
+import pytest
+
+from app.scanner.crawler import AsyncCrawler
+from app.scanner.rate_limiter import PerDomainThrottle
+from app.scanner.scope import ScopeValidator, compile_exclude_patterns
+from app.scanner.urls import CanonicalUrl, canonical_url, request_hostname
+
+
+class TestCanonicalUrl:
+    def test_interned_per_string(self):
+        assert canonical_url("https://example.com/a?x=1") is canonical_url("https://example.com/a?x=1")
+
+    def test_parsed_parts_mirror_urlparse(self):
+        url = canonical_url("HTTPS://Example.COM:8443/path/?b=2&a=1#frag")
+        assert (url.scheme, url.hostname, url.port, url.path) == ("https", "example.com", 8443, "/path/")
+        assert url.query_params == {"b": ["2"], "a": ["1"]}
+
+    def test_normalized_matches_crawler_rules(self):
+        url = canonical_url("https://EXAMPLE.com:443/a/?b=2&a=1#x")
+        assert url.normalized == "https://example.com/a?a=1&b=2"
+        assert AsyncCrawler._normalize("https://EXAMPLE.com:443/a/?b=2&a=1#x") == url.normalized
+
+    def test_with_query_replaces_query_and_drops_fragment(self):
+        url = canonical_url("https://example.com/s?q=1#top")
+        assert url.with_query({"q": "'"}) == "https://example.com/s?q=%27"
+
+    def test_invalid_port_does_not_raise(self):
+        assert canonical_url("http://example.com:99999999/").port is None
+
+    def test_query_template_matches_with_query(self):
+        url = canonical_url("https://example.com/s?q=a+b&page=2&path=%2Fx#top")
+        base = {k: v[0] for k, v in url.query_params.items()}
+        for injected in ({}, {"q": "' OR 1=1--"}, {"page": "<x>", "extra": "a&b"}):
+            assert url.query_template.render(injected) == url.with_query({**base, **injected})
+        assert canonical_url("https://example.com/p").query_template.render({}) == "https://example.com/p"
+
+
+    @pytest.mark.asyncio
+    async def test_request_path_does_not_intern_probe_urls(self):
+        probe = "https://Example.com/search?q=%27%20OR%201%3D1--"
+        assert request_hostname(probe) == "example.com"
+        before = canonical_url.cache_info().currsize
+        await PerDomainThrottle().wait(probe)
+        assert canonical_url.cache_info().currsize == before
+
+
+class TestScopeVerdictCache:
+    def test_verdict_cached_per_validator(self):
+        scope_a = ScopeValidator("https://example.com")
+        scope_b = ScopeValidator("https://example.com", exclude_patterns=[r"/private"])
+        url = canonical_url("https://example.com/private/x")
+        assert scope_a.is_in_scope(url)
+        assert url.scope_verdict(scope_a.token) is True
+        assert not scope_b.is_in_scope(url)
+        assert scope_a.is_in_scope("https://example.com/private/x")
+
+    def test_exclude_patterns_compile_to_one_alternation(self):
+        assert len(compile_exclude_patterns([r"/logout", r"/admin.*", r"\?delete="])) == 1
+
+    def test_uncombinable_patterns_fall_back_to_separate_regexes(self):
+        regexes = compile_exclude_patterns([r"(?P<x>a)", r"(?P<x>b)"])
+        assert len(regexes) == 2
+
+    def test_backreferences_keep_their_groups(self):
+        regexes = compile_exclude_patterns([r"/logout", r"/(\w+)/\1/", r"/admin"])
+        assert len(regexes) == 2
+        scope = ScopeValidator("https://example.com", exclude_patterns=[r"/logout", r"/(\w+)/\1/"])
+        assert not scope.is_in_scope("https://example.com/loop/loop/page")
+        assert scope.is_in_scope("https://example.com/loop/other/page")
+        scope = ScopeValidator("https://example.com", exclude_patterns=[r"(?P<x>/a)", r"(?P<x>/b)"])
+        assert not scope.is_in_scope("https://example.com/b")
+        assert isinstance(canonical_url("https://example.com/b"), CanonicalUrl)
@@ -123,6 +123,27 @@ export function VulnDetailDialog({ vuln, onClose }: Props) {
             >
               {vuln.affected_url}
             </p>
+            {vuln.affected_urls && vuln.affected_urls.length > 1 && (
+              <details className="mt-1">
+                <summary
+                  className="text-[10px] cursor-pointer"
+                  style={{ fontFamily: "JetBrains Mono, monospace", color: "#4a4440" }}
+                >
+                  Seen on {vuln.affected_urls.length} pages
+                </summary>
+                <ul className="mt-1 space-y-0.5">
+                  {vuln.affected_urls.map((url) => (
+                    <li
+                      key={url}
+                      className="text-[10px] break-all"
+                      style={{ fontFamily: "JetBrains Mono, monospace", color: "#6b6259" }}
+                    >
+                      {url}
+                    </li>
+                  ))}
+                </ul>
+              </details>
+            )}
             {vuln.affected_parameter && (
               <p
                 className="text-[10px] mt-1"
@@ -12,6 +12,7 @@ export interface Scan {
   started_at: string | null;
   completed_at: string | null;
   error_message: string | null;
+  stats?: Record<string, unknown> | null;
   created_at: string;
   updated_at: string;
 }
@@ -18,6 +18,7 @@ export interface Vulnerability {
   cwe_id: string;
   affected_url: string;
   affected_parameter: string | null;
+  affected_urls?: string[] | null;
   description: string;
   remediation: string;
   confidence: string;